@@ -0,0 +1,269 @@
+"""
+Benchmark suite for the MCP call path, from gating helpers up to full stdio round-trips.
+
+Cases:
+
+- ``gate``, ``envelope.success``, ``errors.err``: hot-path helpers in isolation;
+- ``http.call_tool``: ``_call_tool_http`` in-process (echo, and runtime.probe proxied to
+  the mock runtime);
+- ``http.route``: the ``POST /call`` route through the ASGI app;
+- ``ws.call``: tool calls over one ``/ws`` connection through the ASGI app, one at a time
+  (``window`` 1) and 16 in flight (figures are per window);
+- ``stdio.round_trip``: a ``ClientSession`` talking to ``python -m mvp.server``;
+- ``scene.*``: list/diff/find against synthetic scenes served by a local mock runtime.
+
+Results are written to ``benchmarks/results/<timestamp>-<commit>.json`` and compared with
+the previous result file, so throughput regressions show up across commits.
+
+Run: ``python benchmarks/bench_call_path.py [--scene-sizes 10 1000 100000 1000000]
+[--only scene] [--baseline results/....json] [--fail-on-regression]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+import anyio
+import httpx
+from harness import Result, compare, latest, measure, save
+from mcp.client.session import ClientSession
+from mcp.client.stdio import StdioServerParameters, stdio_client
+from mock_runtime import MockRuntime, synthetic_scene
+
+from mvp import tools
+from mvp.errors import MvpErrorCode, err
+from mvp.http_transport import _call_tool_http
+from mvp.runtime import AsyncExternalHttpRuntimeAdapter, set_runtime
+from mvp.scene_cache import get_scene_cache
+from mvp.server import _http_app, build_server
+from mvp.sessions import SessionStore, set_session_store
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CONTRACT = {"host_profile": "bench", "runtime_profile": "bench", "capabilities": ["DATA_ONLY"]}
+
+
+async def _helpers(results: list[Result], duration: float) -> None:
+    objects = synthetic_scene(1000)
+    success = tools._success_payload
+    cases = [
+        ("gate", lambda: tools._maybe_gate("runtime.probe"), {"tool": "runtime.probe"}),
+        ("gate", lambda: tools._maybe_gate("echo"), {"tool": "echo"}),
+        ("envelope.success", lambda: success({"text": "hi"}), {"objects": 0}),
+        ("envelope.success", lambda: success({"objects": objects}), {"objects": 1000}),
+        ("errors.err", lambda: err(MvpErrorCode.runtime_unavailable, "down", retryable=True), None),
+    ]
+    for name, fn, params in cases:
+        results.append(await measure(name, fn, params=params, duration=duration))
+
+
+async def _http(results: list[Result], server, duration: float) -> None:
+    async def echo():
+        await _call_tool_http(server, "echo", {"text": "hi"})
+
+    async def probe():
+        await _call_tool_http(server, "runtime.probe", {})
+
+    for fn, tool in ((echo, "echo"), (probe, "runtime.probe")):
+        result = await measure("http.call_tool", fn, params={"tool": tool}, duration=duration)
+        results.append(result)
+
+    transport = httpx.ASGITransport(app=_http_app(server))
+    async with httpx.AsyncClient(transport=transport, base_url="http://mvp") as client:
+        for tool, params in (("echo", {"text": "hi"}), ("runtime.probe", {})):
+            async def route(tool=tool, params=params):
+                response = await client.post("/call", json={"name": tool, "params": params})
+                response.raise_for_status()
+
+            result = await measure("http.route", route, params={"tool": tool}, duration=duration)
+            results.append(result)
+
+
+class _AsgiWebSocket:
+    """Minimal in-process WebSocket client for an ASGI app (``ASGITransport`` for ``/ws``)."""
+
+    def __init__(self, app, path: str):
+        self.app, self.path = app, path
+
+    async def __aenter__(self) -> "_AsgiWebSocket":
+        self._to_app, self._app_receive = anyio.create_memory_object_stream(64)
+        self._app_send, self._from_app = anyio.create_memory_object_stream(64)
+        scope = {
+            "type": "websocket",
+            "path": self.path,
+            "raw_path": self.path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "subprotocols": [],
+            "scheme": "ws",
+            "client": ("127.0.0.1", 1),
+            "server": ("mvp", 80),
+        }
+        self._tg = await anyio.create_task_group().__aenter__()
+        self._tg.start_soon(self.app, scope, self._app_receive.receive, self._app_send.send)
+        await self._to_app.send({"type": "websocket.connect"})
+        assert (await self._from_app.receive())["type"] == "websocket.accept"
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._to_app.send({"type": "websocket.disconnect", "code": 1000})
+        await self._tg.__aexit__(None, None, None)
+
+    async def send(self, frame: dict) -> None:
+        await self._to_app.send({"type": "websocket.receive", "text": json.dumps(frame)})
+
+    async def receive(self) -> dict:
+        return json.loads((await self._from_app.receive())["text"])
+
+
+async def _ws(results: list[Result], server, duration: float) -> None:
+    async with _AsgiWebSocket(_http_app(server), "/ws") as ws:
+        for tool, params in (("echo", {"text": "hi"}), ("runtime.probe", {})):
+            for window in (1, 16):
+                async def calls(tool=tool, params=params, window=window):
+                    for i in range(window):
+                        await ws.send({"id": i, "name": tool, "params": params})
+                    for _ in range(window):
+                        assert (await ws.receive())["ok"]
+
+                case = {"tool": tool, "window": window}
+                results.append(await measure("ws.call", calls, params=case, duration=duration))
+
+
+async def _stdio(results: list[Result], runtime_url: str, duration: float) -> None:
+    env = {**os.environ, "MVP_RUNTIME": "external_http", "MVP_RUNTIME_URL": runtime_url}
+    params = StdioServerParameters(
+        command=sys.executable, args=["-m", "mvp.server"], cwd=str(PROJECT_ROOT), env=env
+    )
+    # Keep the server's per-request INFO lines off the report.
+    with open(os.devnull, "w") as server_log:
+        async with stdio_client(params, errlog=server_log) as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as client:
+                await client.initialize()
+                contract = {**CONTRACT, "runtime_profile": "mcpblender_http"}
+                await client.call_tool("contract.create", contract)
+                for tool, arguments in (("echo", {"text": "hi"}), ("runtime.probe", {})):
+                    async def call(tool=tool, arguments=arguments):
+                        await client.call_tool(tool, arguments)
+
+                    result = await measure(
+                        "stdio.round_trip", call, params={"tool": tool}, duration=duration
+                    )
+                    results.append(result)
+
+
+async def _scenes(
+    results: list[Result],
+    server,
+    adapter,
+    runtime: MockRuntime,
+    sizes: list[int],
+    duration: float,
+) -> None:
+    cache = get_scene_cache(adapter)
+    for size in sizes:
+        runtime.set_scene(synthetic_scene(size))
+        cache.invalidate()
+        params = {"objects": size}
+
+        async def page_streamed():
+            cache.invalidate()
+            await _call_tool_http(server, "scene.list_objects", {"limit": 100, "type": "MESH"})
+
+        async def snapshot_cold():
+            cache.invalidate()
+            await _call_tool_http(server, "scene.list_objects", {})
+
+        for name, fn in (
+            ("scene.page_streamed", page_streamed),
+            ("scene.snapshot_cold", snapshot_cold),
+        ):
+            results.append(
+                await measure(name, fn, params=params, duration=duration, min_rounds=1)
+            )
+
+        listed = await _call_tool_http(server, "scene.list_objects", {"limit": 1})
+        fingerprint = listed["result"]["fingerprint"]
+        cache.max_age = 0.0  # every call revalidates with If-None-Match and gets a 304
+
+        async def revalidate():
+            await _call_tool_http(server, "scene.diff", {"since": fingerprint})
+
+        results.append(
+            await measure("scene.diff_revalidate", revalidate, params=params, duration=duration)
+        )
+        cache.max_age = 3600.0
+
+        async def find():
+            query = {"type": "MESH", "near": [0, 0, 0], "radius": 50, "limit": 50}
+            await _call_tool_http(server, "scenegraph.find", query)
+
+        results.append(await measure("scenegraph.find", find, params=params, duration=duration))
+        cache.max_age = 1.0
+
+
+async def _run(args: argparse.Namespace) -> list[Result]:
+    results: list[Result] = []
+    selected = lambda group: not args.only or any(group.startswith(prefix) for prefix in args.only)  # noqa: E731
+    with MockRuntime() as runtime:
+        runtime.set_scene(synthetic_scene(10))
+        adapter = AsyncExternalHttpRuntimeAdapter(runtime.url)
+        set_runtime(adapter)
+        set_session_store(SessionStore())
+        server = build_server()
+        logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request otherwise
+        await _call_tool_http(server, "contract.create", CONTRACT)
+        try:
+            if selected("helpers"):
+                await _helpers(results, args.duration)
+            if selected("http"):
+                await _http(results, server, args.duration)
+            if selected("ws"):
+                await _ws(results, server, args.duration)
+            if selected("stdio"):
+                await _stdio(results, runtime.url, args.duration)
+            if selected("scene"):
+                await _scenes(results, server, adapter, runtime, args.scene_sizes, args.duration)
+        finally:
+            await adapter.aclose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--duration", type=float, default=1.0, help="Seconds per case.")
+    parser.add_argument("--scene-sizes", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument(
+        "--only", nargs="+", help="Case groups to run: helpers, http, ws, stdio, scene."
+    )
+    parser.add_argument(
+        "--output", type=Path, help="Result file (default: results/<timestamp>-<commit>.json)."
+    )
+    parser.add_argument(
+        "--baseline", type=Path, help="Result file to compare with (default: the latest one)."
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed ops/sec loss before flagging."
+    )
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    results = anyio.run(_run, args)
+    baseline = args.baseline or latest()
+    path = save(results, args.output)
+    print(f"\nsaved {path}")
+    if baseline is not None and baseline.resolve() != path.resolve():
+        regressions = compare(results, baseline, tolerance=args.tolerance)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
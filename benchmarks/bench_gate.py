@@ -0,0 +1,101 @@
+"""
+Microbenchmark: calls/sec through ``gated_call_tool`` with the compiled gate table
+versus the previous per-call evaluation, for large tool allowlists.
+
+Run: ``python benchmarks/bench_gate.py --allowlist 1000 5000 20000``
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import anyio
+from mcp import types
+
+from mvp import tools
+from mvp.contracts import SessionContract
+from mvp.runtime import InMemoryRuntimeAdapter, set_runtime
+from mvp.server import build_server
+from mvp.sessions import Session, SessionStore, get_current_session, set_session_store
+
+
+def _legacy_maybe_gate(tool_name: str) -> types.CallToolResult | None:
+    """The pre-compilation gate: set rebuild + linear allowlist scan on every call."""
+    if tool_name in tools._TOOLS_ALWAYS_ALLOWED:
+        return None
+    session = get_current_session()
+    if session is None:
+        return tools._contract_error("contract_required", "An active session contract is required.")
+    contract = session.contract
+    if contract.tool_allowlist is not None and tool_name not in contract.tool_allowlist:
+        return tools._contract_error(
+            "tool_not_allowed", f"Tool '{tool_name}' is not allowed by the active contract."
+        )
+    if required_cap := tools._CAPABILITY_REQUIREMENTS.get(tool_name):
+        if required_cap not in {cap.value for cap in contract.capabilities}:
+            return tools._contract_error(
+                "capability_required", f"Capability '{required_cap}' is required by this tool."
+            )
+    return None
+
+
+async def _calls_per_second(handler, request: types.CallToolRequest, duration: float) -> float:
+    calls = 0
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            await handler(request)
+        calls += 100
+    return calls / (time.perf_counter() - start)
+
+
+async def _run(allowlist_sizes: list[int], duration: float) -> None:
+    set_runtime(InMemoryRuntimeAdapter())
+    server = build_server()
+    handler = server._mcp_server.request_handlers[types.CallToolRequest]
+    tool_names = [tool.name for tool in server._tool_manager.list_tools()]
+    requests = {
+        verdict: types.CallToolRequest(params=types.CallToolRequestParams(name=name, arguments={}))
+        for verdict, name in (("allowed", "runtime.probe"), ("denied", "scene.list_objects"))
+    }
+
+    print(f"{'allowlist':>10} {'verdict':>8} {'legacy/s':>12} {'compiled/s':>12} {'speedup':>8}")
+    for size in allowlist_sizes:
+        # Padding entries first so the allowed tool sits at the end of the list.
+        allowlist = [f"custom.tool_{i}" for i in range(size)] + ["runtime.probe"]
+        contract = SessionContract.create(
+            host_profile="bench",
+            runtime_profile="inmemory",
+            capabilities=["DATA_ONLY"],
+            tool_allowlist=allowlist,
+        )
+        store = SessionStore()
+        session = Session(contract.contract_id, contract)
+        session.gate = tools._compile_gate(contract, tool_names)
+        store.put(session, make_default=True)
+        set_session_store(store)
+
+        for verdict, request in requests.items():
+            compiled_gate = tools._maybe_gate
+            tools._maybe_gate = _legacy_maybe_gate
+            try:
+                legacy = await _calls_per_second(handler, request, duration)
+            finally:
+                tools._maybe_gate = compiled_gate
+            compiled = await _calls_per_second(handler, request, duration)
+            speedup = compiled / legacy
+            print(f"{size:>10} {verdict:>8} {legacy:>12.0f} {compiled:>12.0f} {speedup:>7.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--allowlist", type=int, nargs="+", default=[10, 1000, 5000, 20000])
+    parser.add_argument("--duration", type=float, default=1.0, help="Seconds per measurement.")
+    args = parser.parse_args()
+    anyio.run(_run, args.allowlist, args.duration)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Cold-start benchmark: import cost of ``mvp.server`` as measured by ``python -X importtime``.
+
+Each run spawns a fresh interpreter, so the numbers include everything an MCP host pays
+before the stdio server can answer ``initialize``. Reported per run set (median):
+
+- total: cumulative import time of the target module,
+- mvp: self time of the ``mvp.*`` modules (the part this repo controls),
+- the heaviest ``mvp.*`` modules and whether any transport-only module was loaded.
+
+Run: ``python benchmarks/bench_startup.py --runs 7 [--module mvp.server]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Modules that only the HTTP transport / external runtime should pull in.
+DEFERRED = ("mvp.http_transport",)
+
+
+def import_times(module: str) -> tuple[dict[str, tuple[int, int]], set[str]]:
+    """Return ``{module: (self_us, cumulative_us)}`` and the deferred modules that got loaded."""
+    probe = f"import sys, {module}; print(','.join(m for m in {DEFERRED!r} if m in sys.modules))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    loaded = {name for name in proc.stdout.strip().split(",") if name}
+    return times, loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="mvp.server")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=8, help="Heaviest mvp modules to list.")
+    args = parser.parse_args()
+
+    totals, owned = [], []
+    per_module: dict[str, list[int]] = {}
+    loaded: set[str] = set()
+    for _ in range(args.runs):
+        times, run_loaded = import_times(args.module)
+        loaded |= run_loaded
+        totals.append(times[args.module][1])
+        mvp_times = [self_us for name, (self_us, _) in times.items() if name.split(".")[0] == "mvp"]
+        owned.append(sum(mvp_times))
+        for name, (self_us, _) in times.items():
+            if name.split(".")[0] == "mvp":
+                per_module.setdefault(name, []).append(self_us)
+
+    print(f"{args.module}: total {statistics.median(totals) / 1000:.1f} ms, "
+          f"mvp-owned {statistics.median(owned) / 1000:.1f} ms (median of {args.runs})")
+    heaviest = sorted(per_module.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, samples in heaviest[: args.top]:
+        print(f"  {name:<28} {statistics.median(samples) / 1000:>7.2f} ms")
+    print(f"deferred modules loaded: {', '.join(sorted(loaded)) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Minimal benchmark harness: timed rounds, JSON result files, and run-to-run comparison.
+
+Kept dependency-free (no pytest-benchmark) so the suite runs anywhere the package does.
+"""
+
+from __future__ import annotations
+
+import inspect
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+_MIN_SAMPLE = 1e-4
+
+
+@dataclass
+class Result:
+    name: str
+    params: dict[str, Any] = field(default_factory=dict)
+    rounds: int = 0
+    calls: int = 0
+    ops_per_sec: float = 0.0
+    mean_us: float = 0.0
+    p50_us: float = 0.0
+    p99_us: float = 0.0
+
+    @property
+    def key(self) -> str:
+        params = ",".join(f"{k}={v}" for k, v in sorted(self.params.items()))
+        return f"{self.name}[{params}]" if params else self.name
+
+
+async def measure(
+    name: str,
+    fn: Callable[[], Any] | Callable[[], Awaitable[Any]],
+    *,
+    params: dict[str, Any] | None = None,
+    duration: float = 1.0,
+    min_rounds: int = 3,
+    warmup: int = 1,
+) -> Result:
+    """
+    Call ``fn`` (sync or async) repeatedly for ``duration`` seconds, at least ``min_rounds`` times.
+
+    Fast functions are timed in batches (calibrated during warmup to >= 100 us per sample)
+    so timer overhead does not dominate; reported figures are per call.
+    """
+    is_async = inspect.iscoroutinefunction(fn)
+
+    async def sample(number: int) -> float:
+        started = time.perf_counter()
+        if is_async:
+            for _ in range(number):
+                await fn()
+        else:
+            for _ in range(number):
+                fn()
+        return (time.perf_counter() - started) / number
+
+    number = 1
+    for _ in range(warmup):
+        elapsed = await sample(1)
+        number = max(number, min(10_000, int(_MIN_SAMPLE / elapsed) if elapsed else 10_000))
+    samples: list[float] = []
+    deadline = time.perf_counter() + duration
+    while len(samples) < min_rounds or time.perf_counter() < deadline:
+        samples.append(await sample(number))
+    samples.sort()
+    total = sum(samples)
+    result = Result(
+        name=name,
+        params=params or {},
+        rounds=len(samples),
+        calls=len(samples) * number,
+        ops_per_sec=len(samples) / total if total else float("inf"),
+        mean_us=1e6 * total / len(samples),
+        p50_us=1e6 * statistics.median(samples),
+        p99_us=1e6 * samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    )
+    print(
+        f"{result.key:<58} {result.ops_per_sec:>12.1f} ops/s  "
+        f"p50 {result.p50_us:>10.1f} us  p99 {result.p99_us:>10.1f} us"
+    )
+    return result
+
+
+def _git_commit() -> str | None:
+    try:
+        proc = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return proc.stdout.strip() or None
+
+
+def save(results: list[Result], path: Path | None = None) -> Path:
+    """Write ``results`` plus run metadata (default ``results/<utc timestamp>-<commit>.json``)."""
+    commit = _git_commit()
+    stamp = datetime.now(timezone.utc)
+    if path is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{stamp:%Y%m%dT%H%M%SZ}-{commit or 'nogit'}.json"
+    payload = {
+        "meta": {
+            "commit": commit,
+            "timestamp": stamp.isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "results": [asdict(result) for result in results],
+    }
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return path
+
+
+def latest(exclude: Path | None = None) -> Path | None:
+    candidates = sorted(p for p in RESULTS_DIR.glob("*.json") if p != exclude)
+    return candidates[-1] if candidates else None
+
+
+def compare(results: list[Result], baseline_path: Path, *, tolerance: float = 0.2) -> list[str]:
+    """
+    Print throughput deltas against ``baseline_path`` and return the keys that regressed,
+    i.e. lost more than ``tolerance`` (fraction) of their ops/sec.
+    """
+    data = json.loads(baseline_path.read_text(encoding="utf-8"))
+    baseline = {result.key: result for result in (Result(**entry) for entry in data["results"])}
+    print(f"\nvs {baseline_path.name} (commit {data['meta'].get('commit')}):")
+    regressions = []
+    for result in results:
+        before = baseline.get(result.key)
+        if before is None or not before.ops_per_sec:
+            continue
+        ratio = result.ops_per_sec / before.ops_per_sec
+        flag = ""
+        if ratio < 1.0 - tolerance:
+            flag = "  REGRESSION"
+            regressions.append(result.key)
+        print(
+            f"{result.key:<58} {before.ops_per_sec:>12.1f} -> {result.ops_per_sec:>12.1f} ops/s "
+            f"({ratio:>5.2f}x){flag}"
+        )
+    return regressions
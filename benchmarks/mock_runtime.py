@@ -0,0 +1,101 @@
+"""
+Local MCPBLENDER stand-in for benchmarks: serves synthetic scenes of configurable size.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_TYPES = ("MESH", "MESH", "MESH", "LIGHT", "CAMERA", "EMPTY")
+
+
+def synthetic_scene(count: int) -> list[dict]:
+    """Deterministic scene of ``count`` objects spread over a 1 km cube."""
+    objects = []
+    for i in range(count):
+        objects.append(
+            {
+                "name": f"Obj_{i:07d}",
+                "type": _TYPES[i % len(_TYPES)],
+                "collections": [f"Collection_{i % 50}"],
+                "materials": [f"Mat_{i % 200}"] if i % 3 else [],
+                "transform": {
+                    "location": [
+                        (i * 7919) % 1000 - 500.0,
+                        (i * 104729) % 1000 - 500.0,
+                        (i * 31) % 100 * 1.0,
+                    ],
+                    "rotation": [0.0, 0.0, (i % 360) * 0.0174533],
+                    "scale": [1.0, 1.0, 1.0],
+                },
+            }
+        )
+    return objects
+
+
+class MockRuntime:
+    """Threaded HTTP runtime on a free localhost port; ``set_scene`` swaps the served scene."""
+
+    def __init__(self):
+        self.body = b"{}"
+        self.etag = '"empty"'
+        runtime = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the pooled async adapter expects
+            # One buffered write per response and no Nagle: otherwise header and body go out as
+            # separate segments and delayed ACKs add ~40 ms to every request.
+            wbufsize = 1 << 16
+            disable_nagle_algorithm = True
+
+            def log_message(self, *_):
+                pass
+
+            def _send(self, body: bytes, status: int = 200, etag: str | None = None):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path in ("/health", "/runtime/probe"):
+                    self._send(b'{"ok":true,"result":{"name":"mock-runtime","version":"0.0.0"}}')
+                elif path == "/scene/objects":
+                    if self.headers.get("If-None-Match") == runtime.etag:
+                        self._send(b"", status=304, etag=runtime.etag)
+                    else:
+                        self._send(runtime.body, etag=runtime.etag)
+                else:
+                    self._send(b'{"ok":false}', status=404)
+
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            self.port = probe.getsockname()[1]
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def set_scene(self, objects: list[dict]) -> None:
+        payload = {"ok": True, "result": {"objects": objects}}
+        self.body = json.dumps(payload, separators=(",", ":")).encode()
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=8).hexdigest() + '"'
+
+    def __enter__(self) -> "MockRuntime":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._server.shutdown()
+        self._server.server_close()
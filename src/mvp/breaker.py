@@ -0,0 +1,226 @@
+"""
+Circuit breaker and retry budget for remote runtimes.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable
+
+
+class BreakerState(str, Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the runtime while its breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(
+            f"Runtime '{name}' is unavailable (circuit open); retry in {retry_after:.1f}s"
+        )
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker.
+
+    Outcomes of the last ``window`` calls are kept; once at least ``min_calls`` were seen
+    and the failure rate reaches ``failure_rate`` the breaker opens and every call fails
+    fast for ``open_for`` seconds. Then a single trial call (or a successful health probe)
+    is let through in the half-open state: success closes the breaker, failure reopens it.
+    A failed health probe never extends the open period.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        open_for: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_for = open_for
+        self._clock = clock
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._state = BreakerState.closed
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.opened = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls, name: str) -> "CircuitBreaker":
+        return cls(
+            name,
+            window=int(os.getenv("MVP_BREAKER_WINDOW", "20")),
+            min_calls=int(os.getenv("MVP_BREAKER_MIN_CALLS", "5")),
+            failure_rate=float(os.getenv("MVP_BREAKER_FAILURE_RATE", "0.5")),
+            open_for=float(os.getenv("MVP_BREAKER_OPEN_FOR", "5")),
+        )
+
+    @property
+    def state(self) -> BreakerState:
+        if self._state is BreakerState.open and self.retry_after() == 0.0:
+            self._state = BreakerState.half_open
+        return self._state
+
+    def retry_after(self) -> float:
+        if self._state is not BreakerState.open:
+            return 0.0
+        return max(0.0, self._opened_at + self.open_for - self._clock())
+
+    def before_call(self) -> None:
+        """Admit a call or raise ``CircuitOpenError`` without touching the network."""
+        state = self.state
+        if state is BreakerState.closed:
+            return
+        if state is BreakerState.half_open and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        self.rejected += 1
+        raise CircuitOpenError(self.name, self.retry_after() or self.open_for)
+
+    def record_success(self) -> None:
+        if self._state is not BreakerState.closed:
+            self._state = BreakerState.closed
+            self._outcomes.clear()
+        self._trial_in_flight = False
+        self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        self._trial_in_flight = False
+        if self._state is not BreakerState.closed:
+            self._trip()
+            return
+        self._outcomes.append(False)
+        calls, failures = len(self._outcomes), self._outcomes.count(False)
+        if calls >= self.min_calls and failures / calls >= self.failure_rate:
+            self._trip()
+
+    def record_probe_failure(self) -> None:
+        """A failed health probe: reopens a half-open breaker, leaves an open one's timer alone."""
+        if self.state is BreakerState.half_open and not self._trial_in_flight:
+            self._trip()
+
+    def abandon(self) -> None:
+        """Forget a call that ended without an outcome (e.g. cancelled), freeing the trial slot."""
+        self._trial_in_flight = False
+
+    def _trip(self) -> None:
+        self._state = BreakerState.open
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self.opened += 1
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "state": self.state.value,
+            "retry_after_s": round(self.retry_after(), 3),
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class RetryBudget:
+    """
+    Token bucket capping retries to a fraction of regular traffic.
+
+    Every call deposits ``ratio`` tokens (up to ``capacity``) and each retry spends one,
+    so retries add at most ``ratio`` extra load; ``min_per_second`` keeps a trickle of
+    retries available when traffic is low.
+    """
+
+    def __init__(
+        self,
+        *,
+        ratio: float = 0.2,
+        capacity: float = 10.0,
+        min_per_second: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ratio = ratio
+        self.capacity = capacity
+        self.min_per_second = min_per_second
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self.retries = 0
+        self.exhausted = 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        refilled = (now - self._updated) * self.min_per_second
+        self._tokens = min(self.capacity, self._tokens + refilled)
+        self._updated = now
+
+    def deposit(self) -> None:
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self.retries += 1
+            return True
+        self.exhausted += 1
+        return False
+
+    def stats(self) -> dict[str, float | int]:
+        self._refill()
+        return {
+            "tokens": round(self._tokens, 3),
+            "retries": self.retries,
+            "exhausted": self.exhausted,
+        }
+
+
+def backoff_delay(attempt: int, *, base: float = 0.05, cap: float = 1.0) -> float:
+    """Full-jitter exponential backoff for retry ``attempt`` (0-based)."""
+    return random.uniform(0.0, min(cap, base * (2**attempt)))
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_budgets: dict[str, RetryBudget] = {}
+
+
+def breaker_for(name: str) -> CircuitBreaker:
+    """Breaker shared by every adapter talking to the runtime ``name`` (its base URL)."""
+    if (breaker := _breakers.get(name)) is None:
+        breaker = _breakers[name] = CircuitBreaker.from_env(name)
+    return breaker
+
+
+def retry_budget_for(name: str) -> RetryBudget:
+    if (budget := _budgets.get(name)) is None:
+        ratio = float(os.getenv("MVP_RETRY_BUDGET_RATIO", "0.2"))
+        budget = _budgets[name] = RetryBudget(ratio=ratio)
+    return budget
+
+
+def breaker_stats() -> dict[str, dict]:
+    return {
+        name: {
+            **breaker.stats(),
+            "retry_budget": _budgets[name].stats() if name in _budgets else None,
+        }
+        for name, breaker in _breakers.items()
+    }
+
+
+def reset_breakers() -> None:
+    _breakers.clear()
+    _budgets.clear()
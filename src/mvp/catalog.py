@@ -0,0 +1,133 @@
+"""
+Tool catalog built once per server and published as immutable, fingerprinted views.
+
+Following versioning_policy_v1, a published catalog never changes: its content is hashed
+together with ``CATALOG_VERSION`` and the server version, and any change to the tool
+surface yields a new catalog with a new fingerprint. Each view keeps its envelope
+pre-serialized, so serving it (MCP result text or ``GET /tools`` body) is a lookup.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import weakref
+from collections import OrderedDict
+from typing import Iterable, Mapping
+
+from mcp.server.fastmcp import FastMCP
+
+from . import __version__
+from .contracts import SessionContract
+from .envelope import dumps, text_block
+from .fingerprint import canonical_bytes
+
+CATALOG_VERSION = "1.0.0"
+# Distinct (allowlist, capabilities) combinations kept per catalog.
+_MAX_VIEWS = 64
+
+_ViewKey = tuple[frozenset[str] | None, frozenset[str]]
+
+
+class CatalogView:
+    """One immutable catalog listing: entries, fingerprint and the encoded envelope."""
+
+    __slots__ = ("tools", "fingerprint", "etag", "result", "body", "text", "compact_text")
+
+    def __init__(self, tools: list[dict]):
+        self.tools = tools
+        digest = hashlib.sha256(f"{CATALOG_VERSION}|{__version__}|".encode("utf-8"))
+        digest.update(canonical_bytes(tools))
+        self.fingerprint = digest.hexdigest()
+        self.etag = f'"{self.fingerprint}"'
+        self.result = {
+            "catalog_version": CATALOG_VERSION,
+            "version": __version__,
+            "fingerprint": self.fingerprint,
+            "tools": tools,
+        }
+        envelope = {"ok": True, "result": self.result}
+        self.body = dumps(envelope)
+        self.text = text_block(envelope)
+        self.compact_text = self.body.decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self.tools)
+
+
+def _allowed(entry: dict, key: _ViewKey) -> bool:
+    gating = entry["gating"]
+    if not gating["requires_contract"]:
+        return True
+    allowlist, capabilities = key
+    if allowlist is not None and entry["name"] not in allowlist:
+        return False
+    return capabilities.issuperset(gating["required_capabilities"])
+
+
+class ToolCatalog:
+    """The full catalog of a server plus per-contract filtered views, built lazily and cached."""
+
+    def __init__(self, tools: list[dict]):
+        self.full = CatalogView(tools)
+        self._views: OrderedDict[_ViewKey, CatalogView] = OrderedDict()
+
+    @classmethod
+    def build(
+        cls,
+        server: FastMCP,
+        *,
+        always_allowed: Iterable[str],
+        capability_requirements: Mapping[str, str],
+    ) -> "ToolCatalog":
+        always_allowed = set(always_allowed)
+        tools = []
+        for tool in sorted(server._tool_manager.list_tools(), key=lambda tool: tool.name):
+            name = tool.name
+            tools.append(
+                {
+                    "name": name,
+                    "description": tool.description,
+                    "gating": {
+                        "requires_contract": name not in always_allowed,
+                        "required_capabilities": [capability_requirements[name]]
+                        if name in capability_requirements
+                        else [],
+                        "allowlist_respected": name not in always_allowed,
+                    },
+                    "input_schema": tool.parameters,
+                    "output_schema": tool.output_schema,
+                }
+            )
+        return cls(tools)
+
+    @staticmethod
+    def view_key(contract: SessionContract) -> _ViewKey:
+        allowlist = None if contract.tool_allowlist is None else frozenset(contract.tool_allowlist)
+        return allowlist, frozenset(cap.value for cap in contract.capabilities)
+
+    def view(self, contract: SessionContract | None) -> CatalogView:
+        """The tools ``contract`` may call (the full catalog without a contract)."""
+        if contract is None:
+            return self.full
+        key = self.view_key(contract)
+        view = self._views.get(key)
+        if view is None:
+            entries = [entry for entry in self.full.tools if _allowed(entry, key)]
+            view = self._views[key] = CatalogView(entries)
+            if len(self._views) > _MAX_VIEWS:
+                self._views.popitem(last=False)
+        else:
+            self._views.move_to_end(key)
+        return view
+
+
+_catalogs: "weakref.WeakKeyDictionary[FastMCP, ToolCatalog]" = weakref.WeakKeyDictionary()
+
+
+def publish_catalog(server: FastMCP, catalog: ToolCatalog) -> None:
+    """Make ``catalog`` the published catalog of ``server``, replacing any earlier one."""
+    _catalogs[server] = catalog
+
+
+def get_tool_catalog(server: FastMCP) -> ToolCatalog | None:
+    return _catalogs.get(server)
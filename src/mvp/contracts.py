@@ -4,6 +4,7 @@ Session contract model used to gate tool execution.
 
 from __future__ import annotations
 
+import os
 from datetime import datetime, timezone
 from enum import Enum
 from typing import Iterable, Set
@@ -17,6 +18,66 @@ class Capability(str, Enum):
     UI_LIVE = "UI_LIVE"
 
 
+class ContractLimits(BaseModel):
+    tool_timeout_s: float | None = Field(
+        default=None,
+        gt=0,
+        description=(
+            "Default deadline for each tool call, in seconds (MVP_TOOL_TIMEOUT when unset)."
+        ),
+    )
+    tool_timeouts: dict[str, float] = Field(
+        default_factory=dict,
+        description="Per-tool deadline overrides, in seconds.",
+    )
+    max_concurrent_calls: int | None = Field(
+        default=None,
+        gt=0,
+        description=(
+            "Runtime-bound calls this session may run at once "
+            "(MVP_SESSION_CONCURRENCY when unset)."
+        ),
+    )
+
+    @field_validator("tool_timeouts")
+    @classmethod
+    def _validate_timeouts(cls, value: dict[str, float]) -> dict[str, float]:
+        if any(timeout <= 0 for timeout in value.values()):
+            raise ValueError("Tool timeouts must be positive.")
+        return value
+
+    def timeout_for(self, tool_name: str) -> float | None:
+        return self.tool_timeouts.get(tool_name, self.tool_timeout_s)
+
+
+def negotiate_limits(offered: dict | None, requested: dict | None) -> dict:
+    """
+    Combine the host profile's ``limits`` with the client's: each limit, and each
+    per-tool timeout, is the tighter of the two, so a client can never loosen what the
+    host allows. Invalid values raise ``ValueError``.
+    """
+    host = ContractLimits.model_validate(offered or {})
+    client = ContractLimits.model_validate(requested or {})
+
+    def tighter(a, b):
+        return b if a is None else a if b is None else min(a, b)
+
+    tools = sorted(host.tool_timeouts.keys() | client.tool_timeouts.keys())
+    return ContractLimits(
+        tool_timeout_s=tighter(host.tool_timeout_s, client.tool_timeout_s),
+        tool_timeouts={
+            tool: tighter(host.timeout_for(tool), client.timeout_for(tool)) for tool in tools
+        },
+        max_concurrent_calls=tighter(host.max_concurrent_calls, client.max_concurrent_calls),
+    ).model_dump()
+
+
+def default_tool_timeout() -> float | None:
+    """Deadline applied when no contract limit is set (``MVP_TOOL_TIMEOUT``, 0 disables)."""
+    timeout = float(os.getenv("MVP_TOOL_TIMEOUT", "30"))
+    return timeout if timeout > 0 else None
+
+
 class SessionContract(BaseModel):
     contract_id: str = Field(description="Unique identifier for the session contract (uuid4).")
     contract_version: str = Field(default="1.0", description="Contract schema version.")
@@ -28,6 +89,17 @@ class SessionContract(BaseModel):
         default=None,
         description="Optional list of allowed tool names. If set, only these tools may run.",
     )
+    structured_only: bool = Field(
+        default=False,
+        description="Omit the JSON text block from results; hosts read structuredContent only.",
+    )
+    compact_text: bool = Field(
+        default=False,
+        description="Render the JSON text block compactly instead of indented.",
+    )
+    limits: ContractLimits = Field(
+        default_factory=ContractLimits, description="Negotiated call limits."
+    )
 
     @field_validator("capabilities")
     @classmethod
@@ -45,6 +117,9 @@ class SessionContract(BaseModel):
         runtime_profile: str,
         capabilities: Iterable[str] | None = None,
         tool_allowlist: list[str] | None = None,
+        structured_only: bool = False,
+        compact_text: bool = False,
+        limits: dict | None = None,
     ) -> "SessionContract":
         return cls(
             contract_id=str(uuid4()),
@@ -54,4 +129,7 @@ class SessionContract(BaseModel):
             runtime_profile=runtime_profile,
             capabilities=set(capabilities or []),
             tool_allowlist=tool_allowlist,
+            structured_only=structured_only,
+            compact_text=compact_text,
+            limits=ContractLimits.model_validate(limits or {}),
         )
@@ -0,0 +1,59 @@
+"""
+Response envelope encoding: compact JSON via orjson when available, and MCP text blocks.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Any
+
+from mcp import types
+
+from .metrics import observe
+
+try:  # Optional fast encoder (``pip install -e ".[fast]"``).
+    import orjson
+except ImportError:  # pragma: no cover - depends on installed extras
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # Non-string keys, oversized ints, ...: the stdlib encoder handles these.
+            pass
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def text_block(payload: object, *, compact: bool = False) -> str:
+    """The MCP text block for ``payload``: indented JSON, or the compact encoding if asked."""
+    if compact:
+        return dumps(payload).decode("utf-8")
+    return json.dumps(payload, indent=2)
+
+
+def success_result(
+    data: object, *, include_text: bool = True, compact: bool = False, text: str | None = None
+) -> types.CallToolResult:
+    """
+    Build a success ``CallToolResult``.
+
+    The text block repeats the envelope as indented JSON, or as compact JSON (the HTTP
+    encoding) when ``compact`` is set; structured-only hosts skip it with
+    ``include_text=False``. The MCP layer serializes ``structuredContent`` on its own.
+    Callers holding a pre-rendered text block pass it as ``text``.
+    """
+    payload = {"ok": True, "result": data}
+    content: list[types.ContentBlock] = []
+    if include_text and text is not None:
+        content.append(types.TextContent(type="text", text=text))
+    elif include_text:
+        started = time.perf_counter()
+        text = text_block(payload, compact=compact)
+        observe("mvp_serialize_seconds", "result_text", time.perf_counter() - started)
+        content.append(types.TextContent(type="text", text=text))
+    return types.CallToolResult(content=content, structuredContent=payload, isError=False)
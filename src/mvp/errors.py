@@ -16,6 +16,8 @@ class MvpErrorCode(str, Enum):
     capability_required = "capability_required"
     runtime_unavailable = "runtime_unavailable"
     invalid_request = "invalid_request"
+    execution_failed = "execution_failed"
+    timeout = "timeout"
     internal_error = "internal_error"
 
 
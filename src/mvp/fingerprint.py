@@ -0,0 +1,242 @@
+"""
+Canonical scene fingerprints (scene_state_v1 / determinism_rules_v1).
+
+Objects are hashed from canonical bytes: sorted keys, floats rounded to ``FLOAT_DIGITS``
+and transform vectors quantized to integer micro-units (vectorized with NumPy when it is
+installed; the pure-Python path yields identical integers). Per-object hashes are the
+leaves of a keyed Merkle tree, so a snapshot that differs by one object re-hashes one
+bucket and ``log2(buckets)`` nodes instead of the whole scene.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import zlib
+from itertools import chain
+from typing import Any, Mapping, Sequence
+
+try:  # Optional vectorized quantization (``pip install -e ".[fast]"``).
+    import numpy
+except ImportError:  # pragma: no cover - depends on installed extras
+    numpy = None
+
+SNAPSHOT_VERSION = "1.0.0"
+FLOAT_DIGITS = 6
+
+_SCALE = 10.0**FLOAT_DIGITS
+# Largest magnitude whose micro-units fit an int64; larger transforms take the generic path.
+_QUANT_LIMIT = 9.0e12
+_NUMERIC = frozenset((float, int, bool))
+_VECTOR = frozenset((list, tuple))
+_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+# Domain tags keep quantized and generic encodings of an object from ever colliding.
+_QUANTIZED_TAG = b"q|"
+_GENERIC_TAG = b"j|"
+
+
+def canonicalize(value: Any) -> Any:
+    """
+    Normalize floats to fixed precision, recursively.
+
+    Values that compare equal canonicalize identically (``1 == 1.0 == True``): integral
+    floats and booleans become ints. Snapshot builds rely on this to reuse the hash of an
+    object equal to its previous version.
+    """
+    kind = type(value)
+    if kind is str or kind is int or value is None:
+        return value
+    if kind is float:
+        rounded = round(value, FLOAT_DIGITS)
+        return int(rounded) if rounded.is_integer() else rounded
+    if kind is dict:
+        return {key: canonicalize(item) for key, item in value.items()}
+    if kind is list or kind is tuple:
+        return [canonicalize(item) for item in value]
+    if kind is bool:
+        return int(value)
+    # Subclasses (str enums, ...): normalize as their base type.
+    for base in (bool, str, int, float, dict):
+        if isinstance(value, base):
+            return canonicalize(base(value))
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(item) for item in value]
+    return value
+
+
+def canonical_bytes(value: Any) -> bytes:
+    return _ENCODER.encode(canonicalize(value)).encode("utf-8")
+
+
+def quantize(values: Sequence[float]) -> list[int]:
+    """Round ``values`` to integer units of ``10**-FLOAT_DIGITS`` (half to even)."""
+    if numpy is not None and len(values) >= 64:
+        scaled = numpy.asarray(values, dtype=numpy.float64) * _SCALE
+        return numpy.rint(scaled).astype(numpy.int64).tolist()
+    return [round(value * _SCALE) for value in values]
+
+
+def _transform_values(obj: dict) -> list | None:
+    """Flattened values of a numeric ``transform`` (dict of number vectors), or None."""
+    transform = obj.get("transform")
+    if type(transform) is not dict or not _VECTOR.issuperset(map(type, transform.values())):
+        return None
+    values = list(chain.from_iterable(transform.values()))
+    if values and not (
+        _NUMERIC.issuperset(map(type, values))
+        and math.isfinite(sum(values))  # NaN or inf anywhere makes the sum non-finite
+        and -_QUANT_LIMIT < min(values)
+        and max(values) < _QUANT_LIMIT
+    ):
+        return None
+    return values
+
+
+def _quantized_hash(obj: dict, units: list[int]) -> str:
+    transform = {}
+    offset = 0
+    for key, vector in obj["transform"].items():
+        transform[key] = units[offset : offset + len(vector)]
+        offset += len(vector)
+    canonical = {
+        key: transform if key == "transform" else canonicalize(item) for key, item in obj.items()
+    }
+    return hashlib.sha256(_QUANTIZED_TAG + _ENCODER.encode(canonical).encode("utf-8")).hexdigest()
+
+
+def _generic_hash(obj: dict) -> str:
+    return hashlib.sha256(_GENERIC_TAG + canonical_bytes(obj)).hexdigest()
+
+
+def object_fingerprint(obj: dict) -> str:
+    """Hash of one canonicalized object."""
+    values = _transform_values(obj)
+    if values is None:
+        return _generic_hash(obj)
+    return _quantized_hash(obj, quantize(values))
+
+
+def object_fingerprints(objects: Sequence[dict]) -> list[str]:
+    """``object_fingerprint`` of each object, quantizing all transforms in one batch."""
+    vectors = [_transform_values(obj) for obj in objects]
+    units = quantize(list(chain.from_iterable(values for values in vectors if values is not None)))
+    hashes = []
+    offset = 0
+    for obj, values in zip(objects, vectors):
+        if values is None:
+            hashes.append(_generic_hash(obj))
+            continue
+        hashes.append(_quantized_hash(obj, units[offset : offset + len(values)]))
+        offset += len(values)
+    return hashes
+
+
+# Target leaves per bucket; the bucket count is the smallest power of two reaching it.
+_LEAVES_PER_BUCKET = 32
+
+
+def _bucket_count(size: int) -> int:
+    count = 1
+    while count * _LEAVES_PER_BUCKET < size:
+        count *= 2
+    return count
+
+
+def _bucket_of(key: str, count: int) -> int:
+    return zlib.crc32(key.encode("utf-8", "surrogatepass")) & (count - 1)
+
+
+def _bucket_digest(bucket: Mapping[str, str]) -> bytes:
+    preimage = "".join(
+        f"{len(key)}:{key}{len(bucket[key])}:{bucket[key]}" for key in sorted(bucket)
+    )
+    return hashlib.sha256(preimage.encode("utf-8", "surrogatepass")).digest()
+
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(left + right).digest()
+
+
+class MerkleTree:
+    """
+    Keyed Merkle tree over leaf hashes (object name -> object hash).
+
+    Leaves are spread over a power-of-two number of buckets by CRC32 of the key, and
+    hashed in key order within a bucket; buckets are the leaves of a binary hash tree.
+    The layout depends only on the set of keys, so the root is a pure function of the
+    leaves. Trees are immutable: ``update`` returns a new tree sharing untouched buckets.
+    """
+
+    __slots__ = ("_buckets", "_levels", "size")
+
+    def __init__(self, buckets: list[dict[str, str]], levels: list[list[bytes]], size: int):
+        self._buckets = buckets
+        self._levels = levels
+        self.size = size
+
+    @classmethod
+    def build(cls, leaves: Mapping[str, str]) -> "MerkleTree":
+        count = _bucket_count(len(leaves))
+        buckets: list[dict[str, str]] = [{} for _ in range(count)]
+        for key, leaf in leaves.items():
+            buckets[_bucket_of(key, count)][key] = leaf
+        levels = [[_bucket_digest(bucket) for bucket in buckets]]
+        while len(levels[-1]) > 1:
+            below = levels[-1]
+            levels.append([_node(below[i], below[i + 1]) for i in range(0, len(below), 2)])
+        return cls(buckets, levels, len(leaves))
+
+    @property
+    def root(self) -> bytes:
+        return self._levels[-1][0]
+
+    def leaves(self) -> dict[str, str]:
+        merged: dict[str, str] = {}
+        for bucket in self._buckets:
+            merged.update(bucket)
+        return merged
+
+    def update(self, changes: Mapping[str, str | None]) -> "MerkleTree":
+        """Return a tree with ``changes`` applied (``None`` removes a key)."""
+        if not changes:
+            return self
+        count = len(self._buckets)
+        buckets = list(self._buckets)
+        touched: dict[int, dict[str, str]] = {}
+        size = self.size
+        for key, leaf in changes.items():
+            index = _bucket_of(key, count)
+            bucket = touched.get(index)
+            if bucket is None:
+                bucket = touched[index] = buckets[index] = dict(buckets[index])
+            if leaf is None:
+                if bucket.pop(key, None) is not None:
+                    size -= 1
+            else:
+                if key not in bucket:
+                    size += 1
+                bucket[key] = leaf
+        if _bucket_count(size) != count:
+            merged: dict[str, str] = {}
+            for bucket in buckets:
+                merged.update(bucket)
+            return MerkleTree.build(merged)
+
+        levels = [list(level) for level in self._levels]
+        for index, bucket in touched.items():
+            levels[0][index] = _bucket_digest(bucket)
+        dirty = set(touched)
+        for depth in range(1, len(levels)):
+            dirty = {index // 2 for index in dirty}
+            below = levels[depth - 1]
+            for index in dirty:
+                levels[depth][index] = _node(below[2 * index], below[2 * index + 1])
+        return MerkleTree(buckets, levels, size)
+
+
+def snapshot_fingerprint(root: bytes, *, blender_version: str = "") -> str:
+    """Hash of a canonicalized snapshot from the Merkle root of its object hashes."""
+    digest = hashlib.sha256(f"{SNAPSHOT_VERSION}|{blender_version}|".encode("utf-8"))
+    digest.update(root)
+    return digest.hexdigest()
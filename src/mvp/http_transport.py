@@ -0,0 +1,407 @@
+"""
+HTTP transport: JSON envelope routes, and a multiplexed WebSocket endpoint, over the
+gated tool handler.
+
+Imported only when ``MVP_TRANSPORT=http`` (or by tests), so the stdio server never pays
+for the Starlette routing stack.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from contextlib import AbstractAsyncContextManager
+from typing import Any, AsyncIterator, Callable
+
+import anyio
+import anyio.abc
+from mcp import types
+from mcp.server.fastmcp import FastMCP
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket
+
+from .catalog import get_tool_catalog
+from .envelope import dumps
+from .errors import MvpErrorCode, err
+from .metrics import observe, render_prometheus
+from .sessions import SESSION_HEADER, current_session_id, get_session_store
+from .streaming import ResultStream, get_stream_opener
+from .tools import is_read_only_tool
+
+logger = logging.getLogger(__name__)
+
+
+async def _call_tool_http(
+    server: FastMCP,
+    name: str,
+    params: dict | None,
+    session_id: str | None = None,
+) -> dict:
+    token = current_session_id.set(session_id)
+    try:
+        request = types.CallToolRequest(
+            params=types.CallToolRequestParams(name=name, arguments=params or {}),
+        )
+        handler = server._mcp_server.request_handlers.get(types.CallToolRequest)
+        if handler is None:
+            return err(MvpErrorCode.internal_error, "CallTool handler not available")
+        server_result = await handler(request)
+        result = server_result.root
+        if isinstance(result, types.CallToolResult) and result.structuredContent:
+            return result.structuredContent
+        return err(MvpErrorCode.internal_error, "Unexpected tool result")
+    except Exception as exc:
+        return err(MvpErrorCode.internal_error, str(exc))
+    finally:
+        current_session_id.reset(token)
+
+
+async def _ndjson(stream: ResultStream) -> AsyncIterator[bytes]:
+    """One line per chunk, then the final envelope (or an error envelope if a chunk fails)."""
+    try:
+        async for chunk in stream:
+            yield dumps(chunk) + b"\n"
+    except Exception as exc:
+        yield dumps(err(MvpErrorCode.internal_error, str(exc))) + b"\n"
+        return
+    yield dumps({"ok": True, "result": stream.result()}) + b"\n"
+
+
+class EnvelopeResponse(JSONResponse):
+    """JSON response rendered with the envelope encoder (orjson when available)."""
+
+    def render(self, content: object) -> bytes:
+        started = time.perf_counter()
+        body = dumps(content)
+        observe("mvp_serialize_seconds", "http_body", time.perf_counter() - started)
+        return body
+
+
+def _bad_request(message: str, details: dict | None = None) -> EnvelopeResponse:
+    return EnvelopeResponse(
+        err(MvpErrorCode.invalid_request, message, details=details), status_code=400
+    )
+
+
+def _valid_frame_id(value: Any) -> bool:
+    """Frame ids key the subscription table, so only JSON strings, integers and null qualify."""
+    if isinstance(value, bool):
+        return False
+    return value is None or isinstance(value, (str, int))
+
+
+class _WebSocketConnection:
+    """
+    One ``/ws`` connection: multiplexed tool calls and scene-change subscriptions.
+
+    Client frames are JSON objects carrying an ``id``:
+
+    - ``{"id", "name", "params"}`` calls a tool; the reply is the call's envelope plus
+      ``id``. Calls run concurrently (up to ``concurrency`` per connection, after which
+      the connection stops reading), so replies come back in completion order.
+      ``"stream": true`` sends ``{"id", "chunk"}`` frames before the final envelope.
+    - ``{"id", "subscribe": "scene", "since"?}`` polls ``scene.diff`` every
+      ``scene_poll`` seconds and pushes ``{"event": "scene.changed", "subscription",
+      "result"}`` whenever the fingerprint moves. ``{"id", "unsubscribe": <id>}`` stops it.
+
+    Every call, including subscription polls, goes through the gated handler for the
+    connection's session.
+    """
+
+    def __init__(
+        self,
+        server: FastMCP,
+        websocket: WebSocket,
+        session_id: str | None,
+        *,
+        concurrency: int,
+        scene_poll: float,
+    ):
+        self.server = server
+        self.websocket = websocket
+        self.session_id = session_id
+        self.scene_poll = scene_poll
+        self._slots = anyio.Semaphore(concurrency)
+        self._send_lock = anyio.Lock()
+        self._subscriptions: dict[Any, anyio.CancelScope] = {}
+        self._tg: anyio.abc.TaskGroup | None = None
+
+    async def serve(self) -> None:
+        async with anyio.create_task_group() as tg:
+            self._tg = tg
+            while True:
+                message = await self.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                await self._dispatch(message.get("text") or message.get("bytes") or "")
+            # The peer is gone: abandon in-flight calls (cancelling their runtime requests).
+            tg.cancel_scope.cancel()
+
+    async def _send(self, frame: dict) -> None:
+        try:
+            async with self._send_lock:
+                await self.websocket.send_text(dumps(frame).decode())
+        except Exception:  # peer disconnected mid-send; the receive loop ends the connection
+            if self._tg is not None:
+                self._tg.cancel_scope.cancel()
+
+    async def _send_error(self, request_id: Any, code: MvpErrorCode, message: str) -> None:
+        await self._send({"id": request_id, **err(code, message)})
+
+    async def _dispatch(self, raw: str | bytes) -> None:
+        try:
+            frame = json.loads(raw)
+        except ValueError:
+            frame = None
+        if not isinstance(frame, dict):
+            message = "Frames must be JSON objects"
+            await self._send_error(None, MvpErrorCode.invalid_request, message)
+            return
+        request_id = frame.get("id")
+        if not _valid_frame_id(request_id):
+            message = "Frame ids must be strings or integers"
+            await self._send_error(None, MvpErrorCode.invalid_request, message)
+            return
+        assert self._tg is not None
+        if "subscribe" in frame:
+            await self._subscribe(request_id, frame)
+        elif "unsubscribe" in frame:
+            scope = None
+            if _valid_frame_id(frame["unsubscribe"]):
+                scope = self._subscriptions.pop(frame["unsubscribe"], None)
+            if scope is None:
+                message = "Unknown subscription"
+                await self._send_error(request_id, MvpErrorCode.invalid_request, message)
+                return
+            scope.cancel()
+            result = {"unsubscribed": frame["unsubscribe"]}
+            await self._send({"id": request_id, "ok": True, "result": result})
+        elif name := frame.get("name"):
+            params = frame.get("params")
+            if params is None:
+                params = {}
+            elif not isinstance(params, dict):
+                message = "Params must be a JSON object"
+                await self._send_error(request_id, MvpErrorCode.invalid_request, message)
+                return
+            await self._slots.acquire()
+            self._tg.start_soon(self._call, request_id, name, params, bool(frame.get("stream")))
+        else:
+            await self._send_error(request_id, MvpErrorCode.invalid_request, "Missing tool name")
+
+    async def _call(self, request_id: Any, name: str, params: dict, stream: bool) -> None:
+        try:
+            if stream:
+                await self._stream(request_id, name, params)
+            else:
+                payload = await _call_tool_http(self.server, name, params, self.session_id)
+                await self._send({"id": request_id, **payload})
+        except Exception as exc:
+            # One failing call must not tear down the task group and its sibling calls.
+            logger.exception("WebSocket call %r failed", name)
+            await self._send_error(request_id, MvpErrorCode.internal_error, str(exc))
+        finally:
+            self._slots.release()
+
+    async def _stream(self, request_id: Any, name: str, params: dict) -> None:
+        opener = get_stream_opener(self.server)
+        if opener is None:
+            message = "Streaming not available"
+            await self._send_error(request_id, MvpErrorCode.internal_error, message)
+            return
+        token = current_session_id.set(self.session_id)
+        try:
+            opened = await opener(name, params)
+        finally:
+            current_session_id.reset(token)
+        if not isinstance(opened, ResultStream):
+            await self._send({"id": request_id, **(opened.structuredContent or {})})
+            return
+        try:
+            async for chunk in opened:
+                await self._send({"id": request_id, "chunk": chunk})
+        except Exception as exc:
+            await self._send_error(request_id, MvpErrorCode.internal_error, str(exc))
+            return
+        await self._send({"id": request_id, "ok": True, "result": opened.result()})
+
+    async def _subscribe(self, request_id: Any, frame: dict) -> None:
+        if frame["subscribe"] != "scene":
+            message = "Unknown subscription topic"
+            await self._send_error(request_id, MvpErrorCode.invalid_request, message)
+        elif request_id is None or request_id in self._subscriptions:
+            message = "Subscriptions need a new, unique id"
+            await self._send_error(request_id, MvpErrorCode.invalid_request, message)
+        else:
+            scope = self._subscriptions[request_id] = anyio.CancelScope()
+            assert self._tg is not None
+            self._tg.start_soon(self._watch_scene, request_id, str(frame.get("since") or ""), scope)
+
+    async def _scene_diff(self, since: str) -> dict:
+        return await _call_tool_http(self.server, "scene.diff", {"since": since}, self.session_id)
+
+    async def _watch_scene(self, subscription: Any, since: str, scope: anyio.CancelScope) -> None:
+        with scope:
+            payload = await self._scene_diff(since)
+            if not payload.get("ok"):
+                self._subscriptions.pop(subscription, None)
+                await self._send({"id": subscription, **payload})
+                return
+            last = payload["result"]["to"]
+            ack = {"subscription": subscription, "topic": "scene", "fingerprint": last}
+            await self._send({"id": subscription, "ok": True, "result": ack})
+            failing = False
+            while True:
+                if since != last:
+                    # Changed since the client's fingerprint (or a full reset when it was unknown).
+                    event = {"event": "scene.changed", "subscription": subscription}
+                    await self._send({**event, **payload})
+                    since = last
+                await anyio.sleep(self.scene_poll)
+                payload = await self._scene_diff(since)
+                if not payload.get("ok"):
+                    if not failing:
+                        event = {"event": "scene.error", "subscription": subscription}
+                        await self._send({**event, **payload})
+                    failing = True
+                    continue
+                failing = False
+                last = payload["result"]["to"]
+
+
+def create_app(
+    server: FastMCP, *, lifespan: Callable[[Any], AbstractAsyncContextManager[None]]
+) -> Starlette:
+    """Build the Starlette app serving ``server``'s tools as JSON envelopes."""
+    batch_max = int(os.getenv("MVP_BATCH_MAX", "100"))
+    limiter = anyio.CapacityLimiter(int(os.getenv("MVP_BATCH_CONCURRENCY", "8")))
+    ws_concurrency = int(os.getenv("MVP_WS_CONCURRENCY", "16"))
+    ws_scene_poll = float(os.getenv("MVP_WS_SCENE_POLL", "1.0"))
+
+    async def health(_: Request):
+        payload = await _call_tool_http(server, "system.health", {})
+        return EnvelopeResponse(payload)
+
+    async def metrics(_: Request):
+        return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+    async def tools(request: Request):
+        catalog = get_tool_catalog(server)
+        if catalog is None:
+            return EnvelopeResponse(await _call_tool_http(server, "system.tools_catalog", {}))
+        session = get_session_store().get(request.headers.get(SESSION_HEADER))
+        view = catalog.view(session.contract if session else None)
+        # The listing depends on the session's contract; caches must key on the header too.
+        headers = {"ETag": view.etag, "Vary": SESSION_HEADER}
+        if_none_match = request.headers.get("if-none-match", "")
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        if view.etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+        return Response(view.body, media_type="application/json", headers=headers)
+
+    async def contract_create(request: Request):
+        body = await request.json()
+        session_id = request.headers.get(SESSION_HEADER)
+        payload = await _call_tool_http(server, "contract.create", body or {}, session_id)
+        return EnvelopeResponse(payload)
+
+    async def call(request: Request):
+        body = await request.json()
+        name = body.get("name")
+        params = body.get("params") or {}
+        if not name:
+            return _bad_request("Missing tool name")
+        payload = await _call_tool_http(server, name, params, request.headers.get(SESSION_HEADER))
+        return EnvelopeResponse(payload)
+
+    async def call_stream(request: Request):
+        body = await request.json()
+        name = body.get("name")
+        if not name:
+            return _bad_request("Missing tool name")
+        params = body.get("params")
+        if params is None:
+            params = {}
+        elif not isinstance(params, dict):
+            return _bad_request("Params must be a JSON object")
+        opener = get_stream_opener(server)
+        if opener is None:
+            return EnvelopeResponse(err(MvpErrorCode.internal_error, "Streaming not available"))
+        token = current_session_id.set(request.headers.get(SESSION_HEADER))
+        try:
+            opened = await opener(name, params)
+        finally:
+            current_session_id.reset(token)
+        if not isinstance(opened, ResultStream):
+            return EnvelopeResponse(opened.structuredContent)
+        return StreamingResponse(_ndjson(opened), media_type="application/x-ndjson")
+
+    async def ws(websocket: WebSocket):
+        await websocket.accept()
+        session_id = websocket.headers.get(SESSION_HEADER) or websocket.query_params.get("session")
+        connection = _WebSocketConnection(
+            server, websocket, session_id, concurrency=ws_concurrency, scene_poll=ws_scene_poll
+        )
+        await connection.serve()
+
+    async def call_batch(request: Request):
+        body = await request.json()
+        calls = body.get("calls") if isinstance(body, dict) else None
+        if not isinstance(calls, list) or not calls:
+            return _bad_request("Missing calls array")
+        if len(calls) > batch_max:
+            return _bad_request(f"Batch exceeds {batch_max} calls")
+        for index, item in enumerate(calls):
+            if not isinstance(item, dict) or not item.get("name"):
+                return _bad_request("Missing tool name", details={"index": index})
+        session_id = request.headers.get(SESSION_HEADER)
+        items: list[dict | None] = [None] * len(calls)
+
+        async def call_item(item: dict) -> dict:
+            return await _call_tool_http(server, item["name"], item.get("params"), session_id)
+
+        if body.get("concurrent"):
+            if mutating := [item["name"] for item in calls if not is_read_only_tool(item["name"])]:
+                return _bad_request(
+                    "Concurrent batches may only contain read-only tools",
+                    details={"tools": mutating},
+                )
+
+            async def run(index: int, item: dict) -> None:
+                async with limiter:
+                    items[index] = await call_item(item)
+
+            async with anyio.create_task_group() as tg:
+                for index, item in enumerate(calls):
+                    tg.start_soon(run, index, item)
+            return EnvelopeResponse({"ok": True, "result": {"items": items, "stopped_at": None}})
+
+        stopped_at = None
+        for index, item in enumerate(calls):
+            items[index] = payload = await call_item(item)
+            if not payload.get("ok"):
+                stopped_at = index
+                break
+        executed = items if stopped_at is None else items[: stopped_at + 1]
+        result = {"items": executed, "stopped_at": stopped_at}
+        return EnvelopeResponse({"ok": True, "result": result})
+
+    return Starlette(
+        debug=False,
+        lifespan=lifespan,
+        routes=[
+            Route("/health", health, methods=["GET"]),
+            Route("/tools", tools, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+            Route("/contract/create", contract_create, methods=["POST"]),
+            Route("/call", call, methods=["POST"]),
+            Route("/call/batch", call_batch, methods=["POST"]),
+            Route("/call/stream", call_stream, methods=["POST"]),
+            WebSocketRoute("/ws", ws),
+        ],
+    )
@@ -0,0 +1,129 @@
+"""
+Incremental parsing of JSON arrays from a byte stream.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from typing import AsyncIterator
+
+_SKIP = " \t\r\n,"
+_NO_ARRAY = -1
+_decoder = json.JSONDecoder()
+
+
+class ArrayNotFound(ValueError):
+    """Raised when the stream does not contain the expected array; carries the raw text."""
+
+    def __init__(self, text: str):
+        super().__init__("No JSON array found in stream")
+        self.text = text
+
+
+class ArrayTruncated(ValueError):
+    """Raised when the stream ends before the array's closing ``]``."""
+
+    def __init__(self, items: int):
+        super().__init__(f"JSON array truncated after {items} items")
+        self.items = items
+
+
+def _skip(text: str, index: int) -> int:
+    while index < len(text) and text[index] in _SKIP:
+        index += 1
+    return index
+
+
+def _array_in_object(text: str, index: int, keys: tuple[str, ...]) -> int | None:
+    """
+    Scan the members of the object whose ``{`` precedes ``index`` for an array under one
+    of ``keys`` (or under ``result.objects``) without descending into other values.
+    """
+    while True:
+        index = _skip(text, index)
+        if index >= len(text):
+            return None
+        if text[index] == "}":
+            return _NO_ARRAY
+        try:
+            key, index = _decoder.raw_decode(text, index)
+        except json.JSONDecodeError:
+            return None
+        index = _skip(text, index)
+        if not isinstance(key, str) or (index < len(text) and text[index] != ":"):
+            return _NO_ARRAY
+        index = _skip(text, index + 1)
+        if index >= len(text):
+            return None
+        if key in keys and text[index] == "[":
+            return index + 1
+        if key == "result" and "result" in keys and text[index] == "{":
+            return _array_in_object(text, index + 1, ("objects",))
+        try:
+            _, index = _decoder.raw_decode(text, index)
+        except json.JSONDecodeError:
+            return None
+        if index >= len(text):
+            return None  # a number may continue in the next chunk
+
+
+def _array_start(text: str) -> int | None:
+    """
+    Index just past the ``[`` of the items array in a body prefix: the top-level array,
+    or ``objects``, ``result`` or ``result.objects`` of the top-level object. ``None``
+    means more bytes are needed and ``_NO_ARRAY`` that the body has no such array.
+    """
+    index = _skip(text, 0)
+    if index >= len(text):
+        return None
+    if text[index] == "[":
+        return index + 1
+    if text[index] != "{":
+        return _NO_ARRAY
+    return _array_in_object(text, index + 1, ("objects", "result"))
+
+
+async def iter_array_items(chunks: AsyncIterator[bytes]) -> AsyncIterator[object]:
+    """
+    Yield the items of the ``objects`` (or ``result``/top-level) array in a JSON body.
+
+    Only the item being decoded is buffered, so memory stays flat however long the array
+    is. A body without such an array raises ``ArrayNotFound`` once fully read, and one
+    that ends before the array is closed raises ``ArrayTruncated``.
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    start: int | None = None
+    items = 0
+    async for chunk in chunks:
+        buffer += utf8.decode(chunk)
+        if start is None:
+            start = _array_start(buffer)
+            if start is None:
+                continue
+            if start != _NO_ARRAY:
+                buffer = buffer[start:]
+        if start == _NO_ARRAY:
+            continue  # keep reading: the caller parses the whole body instead
+        index = 0
+        while True:
+            index = _skip(buffer, index)
+            if index >= len(buffer):
+                break
+            if buffer[index] == "]":
+                return
+            try:
+                item, end = _decoder.raw_decode(buffer, index)
+            except json.JSONDecodeError:
+                break  # incomplete item: wait for more bytes
+            if end >= len(buffer) and not isinstance(item, (dict, list, str)):
+                break  # a number may continue in the next chunk
+            index = end
+            items += 1
+            yield item
+        buffer = buffer[index:]
+    buffer += utf8.decode(b"", final=True)
+    if start is None or start == _NO_ARRAY:
+        raise ArrayNotFound(buffer)
+    raise ArrayTruncated(items)
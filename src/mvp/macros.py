@@ -0,0 +1,333 @@
+"""
+Macro registry and executor (macro_registry_v1).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable
+
+from pydantic import BaseModel, Field, field_validator
+
+from .errors import MvpErrorCode, err
+
+# Executes one tool call through the gated handler and returns its envelope.
+CallFn = Callable[[str, dict], Awaitable[dict]]
+
+_TEMPLATE = re.compile(r"\{\{\s*([\w.]+)\s*\}\}")
+
+
+class MacroStep(BaseModel):
+    tool: str
+    args: dict[str, Any] = Field(default_factory=dict)
+
+
+class MacroCheck(BaseModel):
+    tool: str
+    args: dict[str, Any] = Field(default_factory=dict)
+    expect: dict[str, Any] = Field(
+        default_factory=dict, description="Subset the step result must match."
+    )
+
+
+class MacroRollbackStep(MacroStep):
+    after_step: int | None = Field(
+        default=None,
+        description="Only undo if this step index completed (e.g. delete only what was created).",
+    )
+
+
+class MacroInput(BaseModel):
+    type: str = "string"
+    required: bool = True
+    default: Any = None
+
+
+class MacroPreconditions(BaseModel):
+    tools: list[str] = Field(default_factory=list)
+    capabilities: list[str] = Field(default_factory=list)
+
+
+class MacroDefinition(BaseModel):
+    macro_name: str
+    version: str
+    inputs: dict[str, MacroInput] = Field(default_factory=dict)
+    preconditions: MacroPreconditions = Field(default_factory=MacroPreconditions)
+    steps: list[MacroStep]
+    postconditions: list[MacroCheck] = Field(default_factory=list)
+    rollback: list[MacroRollbackStep] = Field(default_factory=list)
+    determinism: str
+
+    @field_validator("steps")
+    @classmethod
+    def _validate_steps(cls, value: list[MacroStep]) -> list[MacroStep]:
+        if not value:
+            raise ValueError("A macro needs at least one step.")
+        if any(step.tool == "macro.run" for step in value):
+            raise ValueError("Macros cannot call macro.run.")
+        return value
+
+    @property
+    def fingerprint(self) -> str:
+        spec = json.dumps(self.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(spec.encode("utf-8")).hexdigest()
+
+
+class MacroError(Exception):
+    """Raised when a macro cannot be started (bad inputs, missing tools)."""
+
+
+def _lookup(context: dict, path: str) -> Any:
+    parts = path.split(".")
+    if parts[0] not in context:
+        parts.insert(0, "inputs")
+    value: Any = context
+    for part in parts:
+        if isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        elif isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            raise MacroError(f"Unresolved template reference '{path}'")
+    return value
+
+
+def render(template: Any, context: dict) -> Any:
+    """
+    Substitute ``{{ path }}`` references from ``context``.
+
+    A string that is exactly one reference keeps the referenced value's type; references
+    embedded in longer strings are interpolated as text. Paths resolve against
+    ``inputs`` by default, or ``steps.<index>.result...`` for earlier step results.
+    """
+    if isinstance(template, str):
+        match = _TEMPLATE.fullmatch(template.strip())
+        if match:
+            return _lookup(context, match.group(1))
+        return _TEMPLATE.sub(lambda m: str(_lookup(context, m.group(1))), template)
+    if isinstance(template, dict):
+        return {key: render(value, context) for key, value in template.items()}
+    if isinstance(template, list):
+        return [render(item, context) for item in template]
+    return template
+
+
+def _matches(actual: Any, expected: Any) -> bool:
+    if isinstance(expected, dict):
+        return isinstance(actual, dict) and all(
+            key in actual and _matches(actual[key], value) for key, value in expected.items()
+        )
+    return actual == expected
+
+
+def _resolve_inputs(macro: MacroDefinition, inputs: dict) -> dict:
+    unknown = sorted(set(inputs) - set(macro.inputs))
+    if unknown:
+        raise MacroError(f"Unknown inputs: {', '.join(unknown)}")
+    resolved = {}
+    for name, spec in macro.inputs.items():
+        if name in inputs:
+            resolved[name] = inputs[name]
+        elif spec.required:
+            raise MacroError(f"Missing required input '{name}'")
+        else:
+            resolved[name] = spec.default
+    return resolved
+
+
+async def run_macro(
+    macro: MacroDefinition,
+    inputs: dict,
+    call: CallFn,
+    *,
+    available_tools: Iterable[str] | None = None,
+    capabilities: Iterable[str] | None = None,
+) -> dict:
+    """
+    Execute ``macro`` step by step through ``call`` and return an envelope.
+
+    Preconditions are checked before any step runs: ``MacroError`` is raised when a
+    required tool is not in ``available_tools`` or a required capability is not in
+    ``capabilities`` (the active contract's).
+
+    Steps stop at the first failure (including an unresolvable template); the rollback
+    steps whose ``after_step`` completed are then run, and the failing step's error is
+    propagated with ``details.context``.
+    """
+    if available_tools is not None:
+        missing = sorted(set(macro.preconditions.tools) - set(available_tools))
+        if missing:
+            raise MacroError(f"Macro requires unavailable tools: {', '.join(missing)}")
+    if capabilities is not None:
+        lacking = sorted(set(macro.preconditions.capabilities) - set(capabilities))
+        if lacking:
+            raise MacroError(f"Macro requires missing capabilities: {', '.join(lacking)}")
+    context: dict[str, Any] = {"inputs": _resolve_inputs(macro, inputs), "steps": []}
+
+    failure: tuple[int, dict] | None = None
+    for index, step in enumerate(macro.steps):
+        try:
+            args = render(step.args, context)
+        except MacroError as exc:  # earlier steps may have changed state: roll them back
+            failure = (index, err(MvpErrorCode.invalid_request, str(exc)))
+            break
+        envelope = await call(step.tool, args)
+        context["steps"].append(envelope)
+        if not envelope.get("ok"):
+            failure = (index, envelope)
+            break
+
+    if failure is None:
+        for check in macro.postconditions:
+            try:
+                args, expect = render(check.args, context), render(check.expect, context)
+            except MacroError as exc:
+                failure = (len(macro.steps), err(MvpErrorCode.invalid_request, str(exc)))
+                break
+            envelope = await call(check.tool, args)
+            if not envelope.get("ok") or not _matches(envelope.get("result"), expect):
+                error = err(
+                    MvpErrorCode.execution_failed,
+                    f"Postcondition '{check.tool}' not met",
+                    details={"expected": check.expect, "actual": envelope.get("result")},
+                )
+                failure = (len(macro.steps), error)
+                break
+
+    summary = {
+        "macro": macro.macro_name,
+        "version": macro.version,
+        "fingerprint": macro.fingerprint,
+        "determinism": macro.determinism,
+    }
+    if failure is None:
+        steps = [
+            {"tool": step.tool, "result": envelope.get("result")}
+            for step, envelope in zip(macro.steps, context["steps"])
+        ]
+        return {"ok": True, "result": {**summary, "steps": steps}}
+
+    failed_index, envelope = failure
+    completed = len(context["steps"]) if failed_index == len(macro.steps) else failed_index
+    rolled_back = []
+    for undo in macro.rollback:
+        if undo.after_step is not None and undo.after_step >= completed:
+            continue
+        try:
+            undo_envelope = await call(undo.tool, render(undo.args, context))
+        except MacroError as exc:
+            undo_envelope = err(MvpErrorCode.invalid_request, str(exc))
+        rolled_back.append({"tool": undo.tool, "ok": bool(undo_envelope.get("ok"))})
+
+    error = dict(envelope["error"])
+    details = dict(error.get("details") or {})
+    details["context"] = {
+        **summary,
+        "failed_step": failed_index,
+        "tool": macro.steps[failed_index].tool if failed_index < len(macro.steps) else None,
+        "rollback": rolled_back,
+    }
+    error["details"] = details
+    return {"ok": False, "error": error}
+
+
+_BUILTIN_MACROS = [
+    {
+        "macro_name": "demo.snapshot_and_find",
+        "version": "1.0.0",
+        "inputs": {
+            "name_pattern": {"type": "string", "required": False},
+            "collection": {"type": "string", "required": False},
+            "limit": {"type": "integer", "required": False, "default": 50},
+        },
+        "preconditions": {
+            "tools": ["scene.list_objects", "scenegraph.find"],
+            "capabilities": ["DATA_ONLY"],
+        },
+        "steps": [
+            {"tool": "scene.list_objects", "args": {"limit": 1}},
+            {
+                "tool": "scenegraph.find",
+                "args": {
+                    "name_pattern": "{{ name_pattern }}",
+                    "collection": "{{ collection }}",
+                    "limit": "{{ limit }}",
+                },
+            },
+        ],
+        "determinism": "deterministic; pure read",
+    },
+    {
+        "macro_name": "demo.move_cube_abs",
+        "version": "1.0.0",
+        "inputs": {"name": {"type": "string"}, "location": {"type": "array"}},
+        "preconditions": {"tools": ["object.create", "object.move", "object.delete"]},
+        "steps": [
+            {
+                "tool": "object.create",
+                "args": {"name": "{{ name }}", "primitive": "cube", "location": "{{ location }}"},
+            },
+            {
+                "tool": "object.move",
+                "args": {"name": "{{ name }}", "mode": "set", "location": "{{ location }}"},
+            },
+        ],
+        "rollback": [{"tool": "object.delete", "args": {"name": "{{ name }}"}, "after_step": 0}],
+        "determinism": "deterministic given inputs; idempotent",
+    },
+    {
+        "macro_name": "demo.assign_basic_material",
+        "version": "1.0.0",
+        "inputs": {
+            "object": {"type": "string"},
+            "material": {"type": "string"},
+            "base_color": {"type": "array", "required": False, "default": [0.8, 0.8, 0.8, 1.0]},
+        },
+        "preconditions": {"tools": ["material.ensure_principled", "mesh.assign_material"]},
+        "steps": [
+            {
+                "tool": "material.ensure_principled",
+                "args": {"name": "{{ material }}", "base_color": "{{ base_color }}"},
+            },
+            {
+                "tool": "mesh.assign_material",
+                "args": {"object": "{{ object }}", "material": "{{ material }}"},
+            },
+        ],
+        "determinism": "deterministic; idempotent on repeat",
+    },
+]
+
+_MACROS: Dict[str, MacroDefinition] = {}
+
+
+def register_macro(macro: MacroDefinition) -> None:
+    _MACROS[macro.macro_name] = macro
+
+
+def load_macros(path: Path) -> list[MacroDefinition]:
+    """Register every ``*.json`` macro definition found in ``path``."""
+    loaded = []
+    for file in sorted(path.glob("*.json")):
+        macro = MacroDefinition.model_validate_json(file.read_text(encoding="utf-8"))
+        register_macro(macro)
+        loaded.append(macro)
+    return loaded
+
+
+def get_macro(name: str) -> MacroDefinition | None:
+    return _MACROS.get(name)
+
+
+def list_macros() -> Iterable[MacroDefinition]:
+    return _MACROS.values()
+
+
+for _spec in _BUILTIN_MACROS:
+    register_macro(MacroDefinition.model_validate(_spec))
+if _macro_path := os.getenv("MVP_MACRO_PATH"):
+    load_macros(Path(_macro_path))
@@ -0,0 +1,166 @@
+"""
+In-process metrics: call counters and log-bucketed latency histograms.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+# Each power of two is split into 2**_SUB_BITS linear sub-buckets (<= 6.25% relative error).
+_SUB_BITS = 4
+_SUB = 1 << _SUB_BITS
+
+# Coarse cumulative bounds (seconds) used for the Prometheus ``le`` buckets.
+PROMETHEUS_BOUNDS = (
+    0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0,
+    10.0,
+)
+
+
+def _bucket_index(us: int) -> int:
+    if us < _SUB:
+        return us
+    exponent = us.bit_length()
+    return (exponent - _SUB_BITS) * _SUB + (us >> (exponent - _SUB_BITS - 1)) - _SUB
+
+
+def _bucket_upper(index: int) -> int:
+    """Exclusive upper bound, in microseconds, of the values counted in bucket ``index``."""
+    if index < _SUB:
+        return index + 1
+    shift = index // _SUB - 1
+    return (index % _SUB + _SUB + 1) << shift
+
+
+class Histogram:
+    """
+    HDR-style histogram of durations at microsecond resolution.
+
+    Recording is one integer bit-length computation and a dict increment; buckets are
+    sparse, so an idle histogram costs nothing and a busy one stays a few hundred entries.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        index = _bucket_index(max(0, int(seconds * 1_000_000)))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Upper bound (seconds) of the bucket holding the ``q`` quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(_bucket_upper(index) / 1_000_000, self.max)
+        return self.max
+
+    def cumulative(self, bounds: Iterable[float]) -> list[tuple[float, int]]:
+        ordered = sorted(self.counts.items())
+        result, seen, position = [], 0, 0
+        for bound in bounds:
+            limit = bound * 1_000_000
+            while position < len(ordered) and _bucket_upper(ordered[position][0]) <= limit:
+                seen += ordered[position][1]
+                position += 1
+            result.append((bound, seen))
+        return result
+
+    def summary(self) -> dict[str, float | int]:
+        return {
+            "count": self.count,
+            "sum_s": round(self.total, 6),
+            "p50_s": round(self.quantile(0.5), 6),
+            "p90_s": round(self.quantile(0.9), 6),
+            "p99_s": round(self.quantile(0.99), 6),
+            "max_s": round(self.max, 6),
+        }
+
+
+# Histogram families: name -> (label name, help text).
+_FAMILIES = {
+    "mvp_tool_duration_seconds": ("tool", "End-to-end tool call latency."),
+    "mvp_gate_duration_seconds": ("tool", "Contract gating latency."),
+    "mvp_runtime_upstream_seconds": ("method", "Runtime adapter request latency."),
+    "mvp_serialize_seconds": ("stage", "Envelope serialization latency."),
+}
+
+_calls: dict[tuple[str, str], int] = {}
+_histograms: dict[str, dict[str, Histogram]] = {name: {} for name in _FAMILIES}
+
+
+def observe(family: str, label: str, seconds: float) -> None:
+    series = _histograms[family]
+    if (histogram := series.get(label)) is None:
+        histogram = series[label] = Histogram()
+    histogram.record(seconds)
+
+
+def record_call(tool: str, code: str, seconds: float) -> None:
+    """Count one tool call by outcome (``ok`` or an ``MvpErrorCode``) and record its latency."""
+    key = (tool, code)
+    _calls[key] = _calls.get(key, 0) + 1
+    observe("mvp_tool_duration_seconds", tool, seconds)
+
+
+def metrics_snapshot() -> dict[str, object]:
+    calls: dict[str, dict[str, int]] = {}
+    for (tool, code), count in sorted(_calls.items()):
+        calls.setdefault(tool, {})[code] = count
+    return {
+        "calls": calls,
+        "histograms": {
+            family: {label: histogram.summary() for label, histogram in sorted(series.items())}
+            for family, series in _histograms.items()
+            if series
+        },
+    }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus() -> str:
+    """Render every metric in the Prometheus text exposition format (0.0.4)."""
+    lines = [
+        "# HELP mvp_tool_calls_total Tool calls by outcome code.",
+        "# TYPE mvp_tool_calls_total counter",
+    ]
+    for (tool, code), count in sorted(_calls.items()):
+        labels = f'tool="{_escape(tool)}",code="{_escape(code)}"'
+        lines.append(f"mvp_tool_calls_total{{{labels}}} {count}")
+    for family, (label_name, help_text) in _FAMILIES.items():
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} histogram")
+        for label, histogram in sorted(_histograms[family].items()):
+            selector = f'{label_name}="{_escape(label)}"'
+            for bound, seen in histogram.cumulative(PROMETHEUS_BOUNDS):
+                lines.append(f'{family}_bucket{{{selector},le="{bound:g}"}} {seen}')
+            lines.append(f'{family}_bucket{{{selector},le="+Inf"}} {histogram.count}')
+            lines.append(f"{family}_sum{{{selector}}} {histogram.total:.6f}")
+            lines.append(f"{family}_count{{{selector}}} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics() -> None:
+    _calls.clear()
+    for series in _histograms.values():
+        series.clear()
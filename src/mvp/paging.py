@@ -0,0 +1,141 @@
+"""
+Opaque cursors and name-ordered pagination (determinism_rules_v1 canonical ordering).
+"""
+
+from __future__ import annotations
+
+import base64
+import heapq
+import json
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+
+def encode_cursor(after: str) -> str:
+    """Encode the last returned key into an opaque, URL-safe cursor."""
+    raw = json.dumps({"after": after}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> str | None:
+    """Return the key a cursor points after; raises ``ValueError`` on malformed cursors."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        after = json.loads(raw)["after"]
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(after, str):
+        raise ValueError("Invalid cursor")
+    return after
+
+
+def object_filter(
+    type: str | None = None, name_prefix: str | None = None
+) -> Callable[[dict], bool]:
+    """Predicate matching objects by (case-insensitive) type and name prefix."""
+    wanted_type = type.upper() if type else None
+
+    def matches(obj: dict) -> bool:
+        if name_prefix and not str(obj.get("name", "")).startswith(name_prefix):
+            return False
+        if wanted_type and str(obj.get("type", "")).upper() != wanted_type:
+            return False
+        return True
+
+    return matches
+
+
+def iter_sorted(
+    items: Sequence[dict],
+    *,
+    key: Callable[[dict], str],
+    after: str | None = None,
+    name_prefix: str | None = None,
+    predicate: Callable[[dict], bool] | None = None,
+) -> Iterator[dict]:
+    """
+    Yield ``items`` (already sorted by ``key``) past ``after`` that match the filters.
+
+    The start position is found by bisection (after the cursor key, and at the prefix
+    when one is given), so reaching the first item costs O(log n).
+    """
+    start = bisect_right(items, after, key=key) if after is not None else 0
+    if name_prefix:
+        start = max(start, bisect_left(items, name_prefix, key=key))
+    for index in range(start, len(items)):
+        item = items[index]
+        if name_prefix and not key(item).startswith(name_prefix):
+            return
+        if predicate is None or predicate(item):
+            yield item
+
+
+def page_sorted(
+    items: Sequence[dict],
+    *,
+    key: Callable[[dict], str],
+    limit: int | None,
+    cursor: str | None = None,
+    name_prefix: str | None = None,
+    predicate: Callable[[dict], bool] | None = None,
+) -> tuple[list[dict], str | None]:
+    """Page through ``items`` already sorted by ``key``; costs O(log n + scanned items)."""
+    page: list[dict] = []
+    matches = iter_sorted(
+        items, key=key, after=decode_cursor(cursor), name_prefix=name_prefix, predicate=predicate
+    )
+    for item in matches:
+        if limit is not None and len(page) == limit:
+            return page, encode_cursor(key(page[-1]))
+        page.append(item)
+    return page, None
+
+
+class _Descending:
+    __slots__ = ("key", "item")
+
+    def __init__(self, key: str, item: Any):
+        self.key = key
+        self.item = item
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return self.key > other.key
+
+
+class TopK:
+    """
+    Keep the ``limit + 1`` smallest-keyed items seen so far, in O(limit) memory.
+
+    Used to cut a name-ordered page out of an unordered stream of objects.
+    """
+
+    def __init__(self, limit: int, *, key: Callable[[dict], str], after: str | None = None):
+        self.limit = limit
+        self._key = key
+        self._after = after
+        self._heap: list[_Descending] = []
+
+    def offer(self, item: dict) -> bool:
+        """Consider ``item``; return False if it sorts at or before ``after``."""
+        item_key = self._key(item)
+        if self._after is not None and item_key <= self._after:
+            return False
+        entry = _Descending(item_key, item)
+        if len(self._heap) <= self.limit:
+            heapq.heappush(self._heap, entry)
+        elif item_key < self._heap[0].key:
+            heapq.heapreplace(self._heap, entry)
+        return True
+
+    def extend(self, items: Iterable[dict]) -> None:
+        for item in items:
+            self.offer(item)
+
+    def page(self) -> tuple[list[dict], str | None]:
+        ordered = [entry.item for entry in sorted(self._heap, key=lambda entry: entry.key)]
+        if len(ordered) > self.limit:
+            page = ordered[: self.limit]
+            return page, encode_cursor(self._key(page[-1])) if page else None
+        return ordered, None
@@ -4,18 +4,49 @@ Runtime adapter boundary (no real runtime in MVP).
 
 from __future__ import annotations
 
-from typing import Protocol
-
+import importlib.util
+import inspect
+import json
+import os
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Protocol, TypeVar
+
+import anyio
 from mcp import types
 
-import httpx
-
+from .breaker import BreakerState, CircuitOpenError, backoff_delay, breaker_for, retry_budget_for
 from .errors import MvpErrorCode, err
+from .jsonstream import ArrayNotFound, iter_array_items
+from .metrics import observe
+from .paging import TopK, decode_cursor, object_filter, page_sorted
+from .tracing import get_tracer
+
+
+T = TypeVar("T")
 
 
 class RuntimeUnavailableError(Exception):
     """Raised when a runtime adapter cannot serve a request."""
 
+    def __init__(self, message: str, *, retryable: bool = False, retry_after: float | None = None):
+        super().__init__(message)
+        self.retryable = retryable or retry_after is not None
+        self.retry_after = retry_after
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Network errors and 5xx answers: the runtime may recover, so these count against it."""
+    import httpx
+
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+def _open_circuit_error(exc: CircuitOpenError) -> RuntimeUnavailableError:
+    return RuntimeUnavailableError(str(exc), retry_after=exc.retry_after)
+
 
 class RuntimeAdapter(Protocol):
     def probe(self) -> dict:
@@ -26,6 +57,42 @@ class RuntimeAdapter(Protocol):
         """List scene objects in the active document/scene."""
         ...
 
+    def list_scene_objects_page(
+        self,
+        *,
+        limit: int,
+        cursor: str | None = None,
+        type: str | None = None,
+        name_prefix: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """Return one name-ordered page of matching objects and the next cursor (or None)."""
+        ...
+
+
+class AsyncRuntimeAdapter(Protocol):
+    async def probe(self) -> dict:
+        """Return runtime metadata."""
+        ...
+
+    async def list_scene_objects(self) -> list[dict]:
+        """List scene objects in the active document/scene."""
+        ...
+
+    async def list_scene_objects_page(
+        self,
+        *,
+        limit: int,
+        cursor: str | None = None,
+        type: str | None = None,
+        name_prefix: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """Return one name-ordered page of matching objects and the next cursor (or None)."""
+        ...
+
+    async def aclose(self) -> None:
+        """Release pooled connections held by the adapter."""
+        ...
+
 
 class NullRuntimeAdapter:
     """Default adapter that signals no runtime is available."""
@@ -36,6 +103,9 @@ class NullRuntimeAdapter:
     def list_scene_objects(self) -> list[dict]:
         raise RuntimeUnavailableError("Runtime unavailable")
 
+    def list_scene_objects_page(self, **_: Any) -> tuple[list[dict], str | None]:
+        raise RuntimeUnavailableError("Runtime unavailable")
+
 
 class InMemoryRuntimeAdapter:
     """In-memory adapter useful for tests."""
@@ -58,55 +128,456 @@ class InMemoryRuntimeAdapter:
     def list_scene_objects(self) -> list[dict]:
         return list(self._objects)
 
+    def list_scene_objects_page(
+        self,
+        *,
+        limit: int,
+        cursor: str | None = None,
+        type: str | None = None,
+        name_prefix: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        return page_objects(
+            self._objects, limit=limit, cursor=cursor, type=type, name_prefix=name_prefix
+        )
+
 
 class ExternalHttpRuntimeAdapter:
     """HTTP runtime adapter for external MCP runtime (e.g., MCPBLENDER)."""
 
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, *, timeout: float = 5.0):
         self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.breaker = breaker_for(self.base_url)
 
     def _get_json(self, path: str) -> dict:
         url = f"{self.base_url}{path}"
         try:
-            resp = httpx.get(url, timeout=5.0)
-            resp.raise_for_status()
-            return resp.json()
+            self.breaker.before_call()
+        except CircuitOpenError as exc:
+            raise _open_circuit_error(exc) from exc
+        import httpx
+
+        tracer = get_tracer()
+        try:
+            with tracer.span("runtime.request", path=path):
+                headers: dict[str, str] = {}
+                tracer.inject(headers)
+                resp = httpx.get(url, timeout=self.timeout, headers=headers)
+                resp.raise_for_status()
+                data = resp.json()
         except Exception as exc:
-            raise RuntimeUnavailableError(str(exc)) from exc
+            transient = _is_transient(exc)
+            if transient:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise RuntimeUnavailableError(str(exc), retryable=transient) from exc
+        except BaseException:
+            self.breaker.abandon()
+            raise
+        self.breaker.record_success()
+        return data
 
     def probe(self) -> dict:
-        data = self._get_json("/runtime/probe")
-        if not isinstance(data, dict):
-            raise RuntimeUnavailableError("Invalid response from runtime probe")
-        return data.get("result", data)
+        return _parse_probe(self._get_json("/runtime/probe"))
 
     def list_scene_objects(self) -> list[dict]:
-        data = self._get_json("/scene/objects")
-        if not isinstance(data, dict):
-            raise RuntimeUnavailableError("Invalid response from scene objects")
-        objects = data.get("result", data.get("objects", data))
-        if isinstance(objects, dict) and "objects" in objects:
-            objects = objects["objects"]
-        if not isinstance(objects, list):
-            raise RuntimeUnavailableError("Invalid objects payload")
-        return objects
+        return _parse_objects(self._get_json("/scene/objects"))
+
+    def list_scene_objects_page(
+        self,
+        *,
+        limit: int,
+        cursor: str | None = None,
+        type: str | None = None,
+        name_prefix: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        objects = self.list_scene_objects()
+        return page_objects(objects, limit=limit, cursor=cursor, type=type, name_prefix=name_prefix)
+
+
+class AsyncExternalHttpRuntimeAdapter:
+    """
+    Async HTTP runtime adapter backed by one long-lived ``httpx.AsyncClient``.
+
+    Connections are kept alive and pooled, so concurrent proxied calls share a few warm
+    sockets instead of opening one per request. HTTP/2 is negotiated (via ALPN) when the
+    optional ``h2`` package is installed and the runtime supports it.
+
+    Requests go through a circuit breaker shared per base URL, so a dead runtime fails
+    fast instead of costing every caller a full timeout. All requests are idempotent
+    GETs; transient failures are retried with jittered backoff within a retry budget.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 5.0,
+        http2: bool | None = None,
+        max_retries: int = 2,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.breaker = breaker_for(self.base_url)
+        self._retry_budget = retry_budget_for(self.base_url)
+        _monitored.add(self)
+        import httpx  # deferred: only processes that talk to a runtime pay for the client stack
+
+        if http2 is None:
+            http2 = _http2_available()
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=timeout,
+            http2=http2,
+        )
+
+    @classmethod
+    def from_env(cls, base_url: str) -> "AsyncExternalHttpRuntimeAdapter":
+        """Build an adapter whose pool settings come from ``MVP_RUNTIME_*`` variables."""
+        http2_env = os.getenv("MVP_RUNTIME_HTTP2", "").lower()
+        return cls(
+            base_url,
+            max_connections=int(os.getenv("MVP_RUNTIME_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("MVP_RUNTIME_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("MVP_RUNTIME_KEEPALIVE_EXPIRY", "30")),
+            timeout=float(os.getenv("MVP_RUNTIME_TIMEOUT", "5")),
+            http2=None if not http2_env else http2_env in {"1", "true", "yes"},
+            max_retries=int(os.getenv("MVP_RUNTIME_RETRIES", "2")),
+        )
+
+    async def _call(self, path: str, operation: Callable[[dict[str, str]], Awaitable[T]]) -> T:
+        """
+        Run one idempotent request through the breaker, retrying transient failures.
+
+        Each attempt gets its own ``runtime.request`` span, and ``operation`` receives the
+        trace-context headers to send along.
+        """
+        self._retry_budget.deposit()
+        tracer = get_tracer()
+        attempt = 0
+        while True:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError as exc:
+                raise _open_circuit_error(exc) from exc
+            try:
+                with tracer.span("runtime.request", path=path, attempt=attempt):
+                    headers: dict[str, str] = {}
+                    tracer.inject(headers)
+                    result = await operation(headers)
+            except Exception as exc:
+                if not _is_transient(exc):
+                    self.breaker.record_success()  # the runtime answered; the request was bad
+                    if isinstance(exc, RuntimeUnavailableError):
+                        raise
+                    raise RuntimeUnavailableError(str(exc)) from exc
+                self.breaker.record_failure()
+                if attempt < self.max_retries and self._retry_budget.try_spend():
+                    await anyio.sleep(backoff_delay(attempt))
+                    attempt += 1
+                    continue
+                raise RuntimeUnavailableError(str(exc), retryable=True) from exc
+            except BaseException:
+                self.breaker.abandon()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def _get_json(self, path: str) -> dict:
+        async def get(headers: dict[str, str]) -> dict:
+            resp = await self._client.get(path, headers=headers)
+            resp.raise_for_status()
+            return resp.json()
+
+        return await self._call(path, get)
+
+    async def check_health(self) -> bool | None:
+        """
+        Probe the runtime's ``/health`` outside the breaker and feed the outcome into it.
+
+        Returns ``None`` when the runtime has no health endpoint (404): the breaker then
+        half-opens on its timer and the next call is the trial.
+        """
+        try:
+            resp = await self._client.get("/health")
+            if resp.status_code == 404:
+                return None
+            resp.raise_for_status()
+        except Exception:
+            self.breaker.record_probe_failure()
+            return False
+        self.breaker.record_success()
+        return True
+
+    async def probe(self) -> dict:
+        return _parse_probe(await self._get_json("/runtime/probe"))
+
+    async def list_scene_objects(self) -> list[dict]:
+        return _parse_objects(await self._get_json("/scene/objects"))
+
+    async def list_scene_objects_conditional(
+        self, etag: str | None
+    ) -> tuple[list[dict] | None, str | None]:
+        """
+        Fetch scene objects unless they still match ``etag``.
+
+        Returns ``(None, etag)`` when the runtime answers ``304 Not Modified``.
+        """
+        async def get(headers: dict[str, str]) -> tuple[list[dict] | None, str | None]:
+            if etag:
+                headers["If-None-Match"] = etag
+            resp = await self._client.get("/scene/objects", headers=headers)
+            if resp.status_code == 304:
+                return None, etag
+            resp.raise_for_status()
+            return _parse_objects(resp.json()), resp.headers.get("etag")
+
+        return await self._call("/scene/objects", get)
+
+    async def list_scene_objects_page(
+        self,
+        *,
+        limit: int,
+        cursor: str | None = None,
+        type: str | None = None,
+        name_prefix: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """
+        Stream ``/scene/objects`` and keep only the requested page.
+
+        The query is forwarded so runtimes can filter server-side; whatever comes back is
+        filtered again here, item by item, so peak memory is bounded by ``limit`` rather
+        than by the scene size. A runtime that cuts the list at ``limit`` but ignores
+        ``after`` or a filter sends a full-size batch that contains rejected objects; the
+        page is then cut from an unlimited listing instead, so nothing is skipped.
+        """
+        after = decode_cursor(cursor)
+        query: dict[str, Any] = {}
+        if type:
+            query["type"] = type
+        if name_prefix:
+            query["prefix"] = name_prefix
+        limited = {**query, "limit": limit + 1}
+        if after is not None:
+            limited["after"] = after
+        matches = object_filter(type, name_prefix)
+
+        def accept(top: TopK, item: Any) -> bool:
+            if isinstance(item, dict) and matches(item):
+                return top.offer(item)
+            return False
+
+        async def stream(
+            params: dict[str, Any], headers: dict[str, str]
+        ) -> tuple[tuple[list[dict], str | None], bool]:
+            top = TopK(limit, key=_object_name, after=after)
+            seen = accepted = 0
+            async with self._client.stream(
+                "GET", "/scene/objects", params=params, headers=headers
+            ) as resp:
+                resp.raise_for_status()
+                try:
+                    async for item in iter_array_items(resp.aiter_bytes()):
+                        seen += 1
+                        accepted += accept(top, item)
+                except ArrayNotFound as exc:
+                    for obj in _parse_objects(json.loads(exc.text)):
+                        seen += 1
+                        accepted += accept(top, obj)
+            return top.page(), seen == limit + 1 and accepted < seen
+
+        page, cut_short = await self._call(
+            "/scene/objects", lambda headers: stream(limited, headers)
+        )
+        if cut_short:
+            page, _ = await self._call("/scene/objects", lambda headers: stream(query, headers))
+        return page
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _object_name(obj: dict) -> str:
+    return str(obj.get("name", ""))
+
+
+def page_objects(
+    objects: list[dict],
+    *,
+    limit: int,
+    cursor: str | None = None,
+    type: str | None = None,
+    name_prefix: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """Page an unordered in-memory object list by canonical name order."""
+    ordered = sorted(objects, key=_object_name)
+    return page_sorted(
+        ordered,
+        key=_object_name,
+        limit=limit,
+        cursor=cursor,
+        name_prefix=name_prefix,
+        predicate=object_filter(type),
+    )
+
+
+def _parse_probe(data: Any) -> dict:
+    if not isinstance(data, dict):
+        raise RuntimeUnavailableError("Invalid response from runtime probe")
+    return data.get("result", data)
+
+
+def _parse_objects(data: Any) -> list[dict]:
+    if not isinstance(data, dict):
+        raise RuntimeUnavailableError("Invalid response from scene objects")
+    objects = data.get("result", data.get("objects", data))
+    if isinstance(objects, dict) and "objects" in objects:
+        objects = objects["objects"]
+    if not isinstance(objects, list):
+        raise RuntimeUnavailableError("Invalid objects payload")
+    return objects
 
 
-_runtime_adapter: RuntimeAdapter = NullRuntimeAdapter()
+_runtime_adapter: RuntimeAdapter | AsyncRuntimeAdapter = NullRuntimeAdapter()
 
 
-def set_runtime(adapter: RuntimeAdapter) -> None:
+def set_runtime(adapter: RuntimeAdapter | AsyncRuntimeAdapter) -> None:
     global _runtime_adapter
     _runtime_adapter = adapter
 
 
-def get_runtime() -> RuntimeAdapter:
+def get_runtime() -> RuntimeAdapter | AsyncRuntimeAdapter:
     return _runtime_adapter
 
 
-def runtime_error(message: str) -> types.CallToolResult:
+# Read-only adapter methods whose concurrent identical calls share one upstream request.
+_COALESCED_METHODS = frozenset(
+    {"probe", "list_scene_objects", "list_scene_objects_conditional", "list_scene_objects_page"}
+)
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "cancelled")
+
+    def __init__(self):
+        self.done = anyio.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.cancelled = False
+
+
+_in_flight: dict[tuple, _Flight] = {}
+_call_stats = {"upstream": 0, "coalesced": 0}
+
+
+async def _timed_call(method: str, bound: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    started = time.perf_counter()
+    try:
+        result = bound(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    finally:
+        observe("mvp_runtime_upstream_seconds", method, time.perf_counter() - started)
+
+
+async def call_runtime(
+    adapter: RuntimeAdapter | AsyncRuntimeAdapter, method: str, *args: Any, **kwargs: Any
+) -> Any:
+    """
+    Invoke ``method`` on a sync or async adapter and return its result.
+
+    Concurrent calls of the same read-only async method with equal arguments are
+    coalesced: the first caller issues the request and the others await and share its
+    result (or exception), so results must be treated as read-only. If the leading call
+    is cancelled, waiting callers retry on their own.
+    """
+    bound = getattr(adapter, method)
+    if method not in _COALESCED_METHODS or not inspect.iscoroutinefunction(bound):
+        return await _timed_call(method, bound, *args, **kwargs)
+
+    key = (id(adapter), method, args, tuple(sorted(kwargs.items())))
+    joined = False
+    while (flight := _in_flight.get(key)) is not None:
+        if not joined:
+            _call_stats["coalesced"] += 1
+            joined = True
+        await flight.done.wait()
+        if not flight.cancelled:
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+    flight = _in_flight[key] = _Flight()
+    _call_stats["upstream"] += 1
+    try:
+        flight.result = await _timed_call(method, bound, *args, **kwargs)
+        return flight.result
+    except Exception as exc:
+        flight.error = exc
+        raise
+    except BaseException:
+        flight.cancelled = True
+        raise
+    finally:
+        del _in_flight[key]
+        flight.done.set()
+
+
+_monitored: "weakref.WeakSet[AsyncExternalHttpRuntimeAdapter]" = weakref.WeakSet()
+
+
+async def monitor_runtime_health(interval: float) -> None:
+    """
+    Background task: every ``interval`` seconds, probe ``/health`` on runtimes whose
+    breaker is not closed, so they recover without sacrificing a caller's request.
+    """
+    while True:
+        await anyio.sleep(interval)
+        probed = set()
+        for adapter in list(_monitored):
+            if adapter.breaker.name in probed or adapter.breaker.state is BreakerState.closed:
+                continue
+            probed.add(adapter.breaker.name)
+            await adapter.check_health()
+
+
+def runtime_call_stats() -> dict[str, int]:
+    """Upstream requests issued vs. calls served by joining an identical in-flight request."""
+    return {**_call_stats, "in_flight": len(_in_flight)}
+
+
+async def close_runtime(adapter: RuntimeAdapter | AsyncRuntimeAdapter | None = None) -> None:
+    """Close pooled resources held by ``adapter`` (the global adapter by default)."""
+    target = adapter if adapter is not None else _runtime_adapter
+    if closer := getattr(target, "aclose", None):
+        await closer()
+
+
+def runtime_error(error: str | BaseException) -> types.CallToolResult:
+    message = str(error)
+    retry_after = getattr(error, "retry_after", None)
     return types.CallToolResult(
         content=[types.TextContent(type="text", text=message)],
-        structuredContent=err(MvpErrorCode.runtime_unavailable, message),
+        structuredContent=err(
+            MvpErrorCode.runtime_unavailable,
+            message,
+            details={"retry_after_s": round(retry_after, 3)} if retry_after is not None else None,
+            hint=f"Retry after {retry_after:.1f}s." if retry_after is not None else None,
+            retryable=bool(getattr(error, "retryable", False)),
+        ),
         isError=True,
     )
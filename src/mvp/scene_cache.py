@@ -0,0 +1,405 @@
+"""
+Per-runtime scene snapshot cache with fingerprint/ETag revalidation.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable
+
+import anyio
+
+from .envelope import dumps
+from .fingerprint import MerkleTree, object_fingerprints, snapshot_fingerprint
+from .runtime import RuntimeUnavailableError, call_runtime
+from .state import StateBackend, get_state_backend
+
+logger = logging.getLogger(__name__)
+
+_SCENE_NS = "scene"
+
+
+@dataclass(frozen=True)
+class SceneSnapshot:
+    """Scene objects in canonical (name) order, their per-object hashes and fingerprint."""
+
+    objects: tuple[dict, ...]
+    object_hashes: tuple[str, ...]
+    fingerprint: str
+    etag: str | None
+    fetched_at: float
+    # Merkle tree of the object hashes; None when object names are not unique.
+    merkle: MerkleTree | None = field(default=None, compare=False, repr=False)
+
+    def hashes_by_name(self) -> dict[str, str]:
+        """Object hash by name; of objects sharing a name, the last one wins."""
+        return {_object_name(obj): h for obj, h in zip(self.objects, self.object_hashes)}
+
+    def keys(self) -> list[tuple[str, int]]:
+        """``(name, occurrence)`` of each object, so objects sharing a name stay distinct."""
+        seen: dict[str, int] = {}
+        keys = []
+        for obj in self.objects:
+            name = _object_name(obj)
+            keys.append((name, seen.get(name, 0)))
+            seen[name] = keys[-1][1] + 1
+        return keys
+
+
+def _object_name(obj: dict) -> str:
+    return str(obj.get("name", ""))
+
+
+def build_snapshot(
+    objects: list[dict],
+    *,
+    etag: str | None = None,
+    fetched_at: float = 0.0,
+    previous: SceneSnapshot | None = None,
+    blender_version: str = "",
+) -> SceneSnapshot:
+    """
+    Canonicalize and fingerprint ``objects``.
+
+    With a ``previous`` snapshot, objects equal to their previous version keep their hash
+    and only the changed Merkle paths are re-hashed; the fingerprint is the same as a
+    from-scratch build. ``blender_version`` is part of the fingerprint preimage, so the
+    same objects read from another Blender version get another fingerprint.
+    """
+    ordered = tuple(sorted(objects, key=_object_name))
+    names = [_object_name(obj) for obj in ordered]
+    known: dict[str, tuple[dict, str]] = {}
+    if previous is not None and previous.merkle is not None:
+        known = {
+            _object_name(obj): (obj, object_hash)
+            for obj, object_hash in zip(previous.objects, previous.object_hashes)
+        }
+
+    hashes: list[str] = [""] * len(ordered)
+    stale: list[int] = []
+    for index, (name, obj) in enumerate(zip(names, ordered)):
+        seen = known.get(name)
+        if seen is not None and (seen[0] is obj or seen[0] == obj):
+            hashes[index] = seen[1]
+        else:
+            stale.append(index)
+    for index, object_hash in zip(stale, object_fingerprints([ordered[index] for index in stale])):
+        hashes[index] = object_hash
+
+    leaves = dict(zip(names, hashes))
+    if len(leaves) != len(names):
+        # Duplicate names: one leaf per name, over its objects' hashes in order.
+        leaves = {}
+        for name, object_hash in zip(names, hashes):
+            leaves[name] = leaves.get(name, "") + object_hash
+        merkle = None
+        root = MerkleTree.build(leaves).root
+    else:
+        if known:
+            changes: dict[str, str | None] = {names[index]: hashes[index] for index in stale}
+            changes.update(dict.fromkeys(known.keys() - leaves.keys()))
+            merkle = previous.merkle.update(changes)
+        else:
+            merkle = MerkleTree.build(leaves)
+        root = merkle.root
+    fingerprint = snapshot_fingerprint(root, blender_version=blender_version)
+    return SceneSnapshot(ordered, tuple(hashes), fingerprint, etag, fetched_at, merkle)
+
+
+def _encode_snapshot(snapshot: SceneSnapshot) -> bytes:
+    return dumps(
+        {
+            "fingerprint": snapshot.fingerprint,
+            "etag": snapshot.etag,
+            "stored_at": time.time(),
+            "objects": snapshot.objects,
+            "hashes": snapshot.object_hashes,
+        }
+    )
+
+
+def _decode_snapshot(raw: bytes, now: float) -> SceneSnapshot:
+    """Rebuild a stored snapshot without re-hashing; its age carries over to ``now``."""
+    data = json.loads(raw)
+    objects, hashes = tuple(data["objects"]), tuple(data["hashes"])
+    names = [_object_name(obj) for obj in objects]
+    leaves = dict(zip(names, hashes))
+    merkle = MerkleTree.build(leaves) if len(leaves) == len(names) else None
+    fetched_at = now - max(0.0, time.time() - data["stored_at"])
+    return SceneSnapshot(objects, hashes, data["fingerprint"], data["etag"], fetched_at, merkle)
+
+
+@dataclass(frozen=True)
+class SceneDelta:
+    """
+    Objects added, removed (by name) and modified between two snapshots.
+
+    ``duplicates`` lists names shared by several objects of the target snapshot; those
+    objects are matched to the base in order. ``data_changed`` names the modified objects
+    whose runtime ``data_fingerprint`` moved (mesh data, not only transform or links).
+    """
+
+    base: str
+    target: str
+    added: tuple[dict, ...]
+    removed: tuple[str, ...]
+    modified: tuple[dict, ...]
+    duplicates: tuple[str, ...] = ()
+    data_changed: tuple[str, ...] = ()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "from": self.base,
+            "to": self.target,
+            "added": list(self.added),
+            "removed": list(self.removed),
+            "modified": list(self.modified),
+            "duplicates": list(self.duplicates),
+            "data_changed": list(self.data_changed),
+        }
+
+
+def diff_snapshots(old: SceneSnapshot, new: SceneSnapshot) -> SceneDelta:
+    """
+    Compare two snapshots object by object: keyed by name and occurrence, compared by
+    object hash, with ``data_fingerprint`` (when the runtime sends it) flagging data changes.
+    """
+    new_keys = new.keys()
+    duplicates = _duplicates(new_keys)
+    if old.fingerprint == new.fingerprint:
+        return SceneDelta(old.fingerprint, new.fingerprint, (), (), (), duplicates)
+    previous = dict(zip(old.keys(), zip(old.objects, old.object_hashes)))
+    added: list[dict] = []
+    modified: list[dict] = []
+    data_changed: list[str] = []
+    for key, obj, obj_hash in zip(new_keys, new.objects, new.object_hashes):
+        before = previous.pop(key, None)
+        if before is None:
+            added.append(obj)
+        elif before[1] != obj_hash:
+            modified.append(obj)
+            data = obj.get("data_fingerprint")
+            if data is not None and data != before[0].get("data_fingerprint"):
+                data_changed.append(key[0])
+    removed = tuple(name for name, _ in sorted(previous))
+    return SceneDelta(
+        old.fingerprint,
+        new.fingerprint,
+        tuple(added),
+        removed,
+        tuple(modified),
+        duplicates,
+        tuple(data_changed),
+    )
+
+
+def reset_delta(base: str, new: SceneSnapshot) -> SceneDelta:
+    """Delta from a base that is no longer known: every object of ``new`` is added."""
+    return SceneDelta(base, new.fingerprint, new.objects, (), (), _duplicates(new.keys()))
+
+
+def _duplicates(keys: list[tuple[str, int]]) -> tuple[str, ...]:
+    return tuple(name for name, occurrence in keys if occurrence == 1)
+
+
+class SceneSnapshotCache:
+    """
+    Last known snapshot of one runtime.
+
+    Snapshots younger than ``max_age`` are served without contacting the runtime. Older
+    ones are revalidated: with a conditional request when the adapter supports it
+    (``list_scene_objects_conditional``), otherwise by refetching and comparing
+    fingerprints. If revalidation fails, a snapshot younger than ``max_stale`` is still
+    served. The last ``history`` distinct snapshots are kept so deltas can be computed
+    against any of them.
+
+    The runtime's Blender version goes into every fingerprint. It is probed once, before
+    the first full fetch, and again after the runtime has been unreachable, since an
+    upgrade means a restart.
+
+    With a shared state backend (``share``), new snapshots are also written there and a
+    cold cache starts from the stored one, so another worker's fetch costs this worker at
+    most a conditional revalidation instead of a full fetch and re-hash.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_age: float = 1.0,
+        max_stale: float = 0.0,
+        history: int = 16,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_age = max_age
+        self.max_stale = max_stale
+        self.history = history
+        self._clock = clock
+        self._snapshot: SceneSnapshot | None = None
+        self._history: OrderedDict[str, SceneSnapshot] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.stale_served = 0
+        self._shared: tuple[StateBackend, str] | None = None
+        self._blender_version: str | None = None
+
+    @classmethod
+    def from_env(cls) -> "SceneSnapshotCache":
+        return cls(
+            max_age=float(os.getenv("MVP_SCENE_CACHE_MAX_AGE", "1.0")),
+            max_stale=float(os.getenv("MVP_SCENE_CACHE_MAX_STALE", "0")),
+            history=int(os.getenv("MVP_SCENE_HISTORY", "16")),
+        )
+
+    def share(self, backend: StateBackend, key: str) -> None:
+        """Keep this cache's latest snapshot under ``key`` in ``backend``."""
+        self._shared = (backend, key)
+
+    @property
+    def snapshot(self) -> SceneSnapshot | None:
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+
+    def peek(self) -> SceneSnapshot | None:
+        """Return the cached snapshot if still within ``max_age`` (no runtime round-trip)."""
+        cached = self._snapshot
+        if cached is not None and self._clock() - cached.fetched_at <= self.max_age:
+            self.hits += 1
+            return cached
+        return None
+
+    def find(self, fingerprint: str) -> SceneSnapshot | None:
+        """Return a recent snapshot by fingerprint, if still in the history ring."""
+        return self._history.get(fingerprint)
+
+    def _remember(self, snapshot: SceneSnapshot) -> None:
+        self._history[snapshot.fingerprint] = snapshot
+        self._history.move_to_end(snapshot.fingerprint)
+        while len(self._history) > self.history:
+            self._history.popitem(last=False)
+
+    async def get(self, adapter: Any) -> SceneSnapshot:
+        now = self._clock()
+        if self._snapshot is None and self._shared is not None:
+            if (stored := await self._load_shared(now)) is not None:
+                self._snapshot = stored
+                self._remember(stored)
+        cached = self._snapshot
+        if cached is not None and now - cached.fetched_at <= self.max_age:
+            self.hits += 1
+            return cached
+
+        try:
+            snapshot = await self._fetch(adapter, cached, now)
+        except RuntimeUnavailableError:
+            self._blender_version = None
+            if cached is not None and now - cached.fetched_at <= self.max_stale:
+                self.stale_served += 1
+                return cached
+            raise
+        changed = cached is None or snapshot.fingerprint != cached.fingerprint
+        if self._shared is not None and changed:
+            await self._store_shared(snapshot)
+        self._snapshot = snapshot
+        self._remember(snapshot)
+        return snapshot
+
+    async def _load_shared(self, now: float) -> SceneSnapshot | None:
+        backend, key = self._shared  # type: ignore[misc]
+        try:
+            raw = await anyio.to_thread.run_sync(backend.get, _SCENE_NS, key)
+            if raw is None:
+                return None
+            return await anyio.to_thread.run_sync(_decode_snapshot, raw, now)
+        except Exception as exc:  # the shared copy is an optimization; fall back to fetching
+            logger.warning("Ignoring shared scene snapshot for %s: %s", key, exc)
+            return None
+
+    async def _store_shared(self, snapshot: SceneSnapshot) -> None:
+        backend, key = self._shared  # type: ignore[misc]
+        try:
+            raw = await anyio.to_thread.run_sync(_encode_snapshot, snapshot)
+            await anyio.to_thread.run_sync(backend.put, _SCENE_NS, key, raw)
+        except Exception as exc:
+            logger.warning("Could not share scene snapshot for %s: %s", key, exc)
+
+    async def _fetch(self, adapter: Any, cached: SceneSnapshot | None, now: float) -> SceneSnapshot:
+        if cached is not None:
+            self.revalidations += 1
+        if hasattr(adapter, "list_scene_objects_conditional"):
+            etag = cached.etag if cached is not None else None
+            objects, new_etag = await call_runtime(adapter, "list_scene_objects_conditional", etag)
+            if objects is None and cached is not None:
+                self.hits += 1
+                return replace(cached, fetched_at=now)
+        else:
+            objects, new_etag = await call_runtime(adapter, "list_scene_objects"), None
+
+        snapshot = build_snapshot(
+            objects,
+            etag=new_etag,
+            fetched_at=now,
+            previous=cached,
+            blender_version=await self._runtime_version(adapter),
+        )
+        if cached is not None and snapshot.fingerprint == cached.fingerprint:
+            self.hits += 1
+            return replace(cached, etag=new_etag, fetched_at=now)
+        self.misses += 1
+        return snapshot
+
+    async def _runtime_version(self, adapter: Any) -> str:
+        if self._blender_version is None:
+            info: Any = {}
+            if hasattr(adapter, "probe"):
+                try:
+                    info = await call_runtime(adapter, "probe")
+                except RuntimeUnavailableError as exc:
+                    logger.warning("Fingerprinting without a Blender version: %s", exc)
+            if not isinstance(info, dict):
+                info = {}
+            # scene_state_v1 wants the Blender version; runtimes that only report their own
+            # version still get fingerprints that move when they are upgraded.
+            self._blender_version = str(info.get("blender_version") or info.get("version") or "")
+        return self._blender_version
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "stale_served": self.stale_served,
+        }
+
+
+_caches: "weakref.WeakKeyDictionary[Any, SceneSnapshotCache]" = weakref.WeakKeyDictionary()
+
+
+def get_scene_cache(adapter: Any) -> SceneSnapshotCache:
+    """Return the snapshot cache bound to ``adapter``, creating it on first use."""
+    cache = _caches.get(adapter)
+    if cache is None:
+        cache = _caches[adapter] = SceneSnapshotCache.from_env()
+        # Only runtimes with a stable identity (a URL) are the same scene in every worker.
+        backend, url = get_state_backend(), getattr(adapter, "base_url", None)
+        if backend is not None and url:
+            cache.share(backend, url)
+    return cache
+
+
+def scene_cache_stats() -> dict[str, int]:
+    """Counters summed over every live runtime cache."""
+    totals = {"runtimes": 0, "hits": 0, "misses": 0, "revalidations": 0, "stale_served": 0}
+    for cache in list(_caches.values()):
+        totals["runtimes"] += 1
+        for key, value in cache.stats().items():
+            totals[key] += value
+    return totals
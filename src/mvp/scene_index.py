@@ -0,0 +1,264 @@
+"""
+In-core query index over scene snapshots (scene_state_v1 ``indices``).
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import weakref
+from bisect import bisect_left, insort
+from fnmatch import fnmatchcase
+from typing import Iterable, Sequence
+
+from .scene_cache import SceneDelta, SceneSnapshot, SceneSnapshotCache, diff_snapshots
+
+Cell = tuple[int, int, int]
+_WILDCARD = re.compile(r"[*?\[]")
+
+
+def _name(obj: dict) -> str:
+    return str(obj.get("name", ""))
+
+
+def _strings(value: object) -> list[str]:
+    """Names in a collections/materials field: strings or ``{"name": ...}`` dicts, nulls dropped."""
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, (list, tuple)):
+        return []
+    names = []
+    for item in value:
+        if isinstance(item, dict):
+            names.append(str(item.get("name", "")))
+        elif item is not None:
+            names.append(str(item))
+    return names
+
+
+def _location(obj: dict) -> tuple[float, float, float] | None:
+    transform = obj.get("transform")
+    location = transform.get("location") if isinstance(transform, dict) else obj.get("location")
+    if isinstance(location, (list, tuple)) and len(location) == 3:
+        try:
+            return float(location[0]), float(location[1]), float(location[2])
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+class SceneIndex:
+    """
+    Lookup structures for one snapshot.
+
+    - a sorted name array for prefix/range scans,
+    - inverted maps collection/material/type -> names,
+    - a uniform grid over ``transform.location`` for radius and bbox queries.
+
+    Indexes are immutable once built; ``apply_delta`` returns an updated copy touching
+    only the changed objects.
+    """
+
+    def __init__(self, fingerprint: str, cell_size: float):
+        self.fingerprint = fingerprint
+        self.cell_size = cell_size
+        self.names: list[str] = []
+        self.by_name: dict[str, dict] = {}
+        self.by_collection: dict[str, set[str]] = {}
+        self.by_material: dict[str, set[str]] = {}
+        self.by_type: dict[str, set[str]] = {}
+        self.locations: dict[str, tuple[float, float, float]] = {}
+        self.grid: dict[Cell, set[str]] = {}
+
+    @classmethod
+    def build(cls, snapshot: SceneSnapshot, *, cell_size: float = 10.0) -> "SceneIndex":
+        index = cls(snapshot.fingerprint, cell_size)
+        index.names = [_name(obj) for obj in snapshot.objects]
+        for obj in snapshot.objects:
+            index._add(obj)
+        return index
+
+    def apply_delta(self, delta: SceneDelta) -> "SceneIndex":
+        """Return the index of ``delta.target``, reusing everything the delta leaves untouched."""
+        updated = SceneIndex(delta.target, self.cell_size)
+        updated.names = list(self.names)
+        updated.by_name = dict(self.by_name)
+        updated.locations = dict(self.locations)
+        updated.by_collection = dict(self.by_collection)
+        updated.by_material = dict(self.by_material)
+        updated.by_type = dict(self.by_type)
+        updated.grid = dict(self.grid)
+        # Buckets are shared with this index; copy the ones the delta touches before writing.
+        touched = [self.by_name[name] for name in delta.removed if name in self.by_name]
+        touched += [
+            self.by_name[_name(obj)] for obj in delta.modified if _name(obj) in self.by_name
+        ]
+        touched += [*delta.modified, *delta.added]
+        for obj in touched:
+            for mapping, keys in updated._buckets_of(obj):
+                for key in keys:
+                    if key in mapping:
+                        mapping[key] = set(mapping[key])
+
+        for name in delta.removed:
+            updated._remove(name)
+            del updated.names[bisect_left(updated.names, name)]
+        for obj in delta.modified:
+            updated._remove(_name(obj))
+            updated._add(obj)
+        for obj in delta.added:
+            insort(updated.names, _name(obj))
+            updated._add(obj)
+        return updated
+
+    def _buckets_of(self, obj: dict) -> list[tuple[dict, list]]:
+        location = _location(obj)
+        return [
+            (self.by_collection, _strings(obj.get("collections"))),
+            (self.by_material, _strings(obj.get("materials"))),
+            (self.by_type, [str(obj["type"]).upper()] if obj.get("type") else []),
+            (self.grid, [self._cell(location)] if location is not None else []),
+        ]
+
+    def _add(self, obj: dict) -> None:
+        name = _name(obj)
+        self.by_name[name] = obj
+        for mapping, keys in self._buckets_of(obj):
+            for key in keys:
+                mapping.setdefault(key, set()).add(name)
+        if (location := _location(obj)) is not None:
+            self.locations[name] = location
+
+    def _remove(self, name: str) -> None:
+        obj = self.by_name.pop(name, None)
+        if obj is None:
+            return
+        for mapping, keys in self._buckets_of(obj):
+            for key in keys:
+                if (bucket := mapping.get(key)) is not None:
+                    bucket.discard(name)
+                    if not bucket:
+                        del mapping[key]
+        self.locations.pop(name, None)
+
+    def _cell(self, location: Sequence[float]) -> Cell:
+        size = self.cell_size
+        x, y, z = location[0], location[1], location[2]
+        return (math.floor(x / size), math.floor(y / size), math.floor(z / size))
+
+    def _in_box(self, low: Sequence[float], high: Sequence[float]) -> set[str]:
+        low_cell, high_cell = self._cell(low), self._cell(high)
+        spans = [high_cell[axis] - low_cell[axis] + 1 for axis in range(3)]
+        if spans[0] * spans[1] * spans[2] > len(self.locations):
+            # Fewer objects than cells to probe: scan them.
+            candidates: Iterable[str] = self.locations
+        else:
+            candidates = (
+                name
+                for x in range(low_cell[0], high_cell[0] + 1)
+                for y in range(low_cell[1], high_cell[1] + 1)
+                for z in range(low_cell[2], high_cell[2] + 1)
+                for name in self.grid.get((x, y, z), ())
+            )
+        result = set()
+        for name in candidates:
+            loc = self.locations[name]
+            if all(low[axis] <= loc[axis] <= high[axis] for axis in range(3)):
+                result.add(name)
+        return result
+
+    def _name_range(self, prefix: str) -> list[str]:
+        start = bisect_left(self.names, prefix)
+        end = bisect_left(self.names, prefix + "\U0010ffff", lo=start)
+        return self.names[start:end]
+
+    def find(
+        self,
+        *,
+        name_pattern: str | None = None,
+        collection: str | None = None,
+        material: str | None = None,
+        type: str | None = None,
+        near: Sequence[float] | None = None,
+        radius: float | None = None,
+        bbox: Sequence[Sequence[float]] | None = None,
+        limit: int = 50,
+    ) -> tuple[list[dict], bool]:
+        """Return matches in name order and whether the result was truncated by ``limit``."""
+        candidate_sets: list[set[str]] = []
+        if collection is not None:
+            candidate_sets.append(self.by_collection.get(collection, set()))
+        if material is not None:
+            candidate_sets.append(self.by_material.get(material, set()))
+        if type is not None:
+            candidate_sets.append(self.by_type.get(type.upper(), set()))
+        if bbox is not None:
+            candidate_sets.append(self._in_box(bbox[0], bbox[1]))
+        if near is not None and radius is not None:
+            low = [near[axis] - radius for axis in range(3)]
+            high = [near[axis] + radius for axis in range(3)]
+            squared = radius * radius
+
+            def within(location: Sequence[float]) -> bool:
+                return sum((location[axis] - near[axis]) ** 2 for axis in range(3)) <= squared
+
+            candidate_sets.append(
+                {name for name in self._in_box(low, high) if within(self.locations[name])}
+            )
+
+        literal_prefix = ""
+        if name_pattern:
+            wildcard = _WILDCARD.search(name_pattern)
+            literal_prefix = name_pattern[: wildcard.start()] if wildcard else name_pattern
+
+        scan = self._name_range(literal_prefix) if literal_prefix else self.names
+        ordered: Iterable[str] = scan
+        if candidate_sets:
+            candidate_sets.sort(key=len)
+            smallest, rest = candidate_sets[0], candidate_sets[1:]
+            if len(smallest) * 8 < len(scan):
+                # Selective filter: sort the few candidates instead of scanning names.
+                ordered = sorted(name for name in smallest if all(name in other for other in rest))
+                if literal_prefix:
+                    ordered = (name for name in ordered if name.startswith(literal_prefix))
+            else:
+                ordered = (name for name in scan if all(name in other for other in candidate_sets))
+
+        matches: list[dict] = []
+        for name in ordered:
+            if name_pattern and not fnmatchcase(name, name_pattern):
+                continue
+            if len(matches) == limit:
+                return matches, True
+            matches.append(self.by_name[name])
+        return matches, False
+
+
+_indexes: "weakref.WeakKeyDictionary[SceneSnapshotCache, SceneIndex]" = weakref.WeakKeyDictionary()
+
+
+def get_scene_index(cache: SceneSnapshotCache, snapshot: SceneSnapshot) -> SceneIndex:
+    """
+    Return the index for ``snapshot``, built once per fingerprint.
+
+    When the previous index belongs to a snapshot still in the cache history, the new
+    index is derived from it by applying the delta instead of rebuilding from scratch.
+    """
+    current = _indexes.get(cache)
+    if current is not None and current.fingerprint == snapshot.fingerprint:
+        return current
+    cell_size = float(os.getenv("MVP_SCENE_GRID_CELL", "10"))
+    base = cache.find(current.fingerprint) if current is not None else None
+    # Duplicate names (no Merkle tree) cannot be patched by name: rebuild instead.
+    if (
+        base is not None
+        and current.cell_size == cell_size
+        and base.merkle is not None
+        and snapshot.merkle is not None
+    ):
+        index = current.apply_delta(diff_snapshots(base, snapshot))
+    else:
+        index = SceneIndex.build(snapshot, cell_size=cell_size)
+    _indexes[cache] = index
+    return index
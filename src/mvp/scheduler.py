@@ -0,0 +1,206 @@
+"""
+Fair admission scheduler for runtime-bound tool calls.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+import anyio
+
+
+class SchedulerBusy(Exception):
+    """Raised when a call cannot even be queued; callers should retry shortly."""
+
+    def __init__(self, reason: str, queued: int):
+        super().__init__(f"Runtime queue full ({reason})")
+        self.reason = reason
+        self.queued = queued
+
+
+class _Waiter:
+    __slots__ = ("session_id", "exclusive", "limit", "event", "enqueued_at", "granted")
+
+    def __init__(self, session_id: str, exclusive: bool, limit: int, enqueued_at: float):
+        self.session_id = session_id
+        self.exclusive = exclusive
+        self.limit = limit
+        self.event = anyio.Event()
+        self.enqueued_at = enqueued_at
+        self.granted = False
+
+
+class RuntimeScheduler:
+    """
+    Admission control in front of the (effectively single-threaded) runtime.
+
+    - at most ``max_concurrent`` calls run at once, and at most ``per_session`` per session
+      (or the contract's ``max_concurrent_calls``);
+    - read-only calls overlap, mutating (``exclusive``) calls run alone;
+    - waiting calls are queued per session and granted round-robin across sessions;
+    - queues are bounded: once full, ``SchedulerBusy`` is raised immediately.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrent: int = 4,
+        per_session: int = 2,
+        max_queue: int = 64,
+        max_session_queue: int = 16,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_concurrent = max_concurrent
+        self.per_session = per_session
+        self.max_queue = max_queue
+        self.max_session_queue = max_session_queue
+        self._clock = clock
+        self._queues: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._queued = 0
+        self._active = 0
+        self._active_by_session: dict[str, int] = {}
+        self._exclusive_active = False
+        self.granted = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @classmethod
+    def from_env(cls) -> "RuntimeScheduler":
+        return cls(
+            max_concurrent=int(os.getenv("MVP_RUNTIME_CONCURRENCY", "4")),
+            per_session=int(os.getenv("MVP_SESSION_CONCURRENCY", "2")),
+            max_queue=int(os.getenv("MVP_RUNTIME_QUEUE", "64")),
+            max_session_queue=int(os.getenv("MVP_SESSION_QUEUE", "16")),
+        )
+
+    @asynccontextmanager
+    async def slot(
+        self, session_id: str, *, exclusive: bool = False, limit: int | None = None
+    ) -> AsyncIterator[None]:
+        """Hold an execution slot for the duration of the ``async with`` body."""
+        waiter = _Waiter(session_id, exclusive, limit or self.per_session, self._clock())
+        if not self._queued and self._can_grant(waiter):
+            self._grant(waiter)
+        else:
+            self._enqueue(waiter)
+            try:
+                await waiter.event.wait()
+            except BaseException:
+                if waiter.granted:
+                    self._release(waiter)
+                else:
+                    self._withdraw(waiter)
+                raise
+        try:
+            yield
+        finally:
+            self._release(waiter)
+
+    def _can_grant(self, waiter: _Waiter) -> bool:
+        if waiter.exclusive:
+            return self._active == 0
+        return (
+            not self._exclusive_active
+            and self._active < self.max_concurrent
+            and self._active_by_session.get(waiter.session_id, 0) < waiter.limit
+        )
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        queue = self._queues.get(waiter.session_id)
+        if self._queued >= self.max_queue:
+            self.rejected += 1
+            raise SchedulerBusy("global", self._queued)
+        if queue is not None and len(queue) >= self.max_session_queue:
+            self.rejected += 1
+            raise SchedulerBusy("session", len(queue))
+        if queue is None:
+            queue = self._queues[waiter.session_id] = deque()
+        queue.append(waiter)
+        self._queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queued)
+
+    def _withdraw(self, waiter: _Waiter) -> None:
+        queue = self._queues.get(waiter.session_id)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self._queued -= 1
+            if not queue:
+                del self._queues[waiter.session_id]
+        self._dispatch()
+
+    def _grant(self, waiter: _Waiter) -> None:
+        waiter.granted = True
+        self._active += 1
+        session_id = waiter.session_id
+        self._active_by_session[session_id] = self._active_by_session.get(session_id, 0) + 1
+        if waiter.exclusive:
+            self._exclusive_active = True
+        self.granted += 1
+        waited = self._clock() - waiter.enqueued_at
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+
+    def _release(self, waiter: _Waiter) -> None:
+        self._active -= 1
+        remaining = self._active_by_session[waiter.session_id] - 1
+        if remaining:
+            self._active_by_session[waiter.session_id] = remaining
+        else:
+            del self._active_by_session[waiter.session_id]
+        if waiter.exclusive:
+            self._exclusive_active = False
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant queued calls round-robin across sessions until nothing else fits."""
+        progressed = True
+        while progressed and self._queues:
+            progressed = False
+            for session_id in list(self._queues):
+                queue = self._queues[session_id]
+                head = queue[0]
+                if not self._can_grant(head):
+                    if head.exclusive:
+                        # Writer preference: stop admitting readers ahead of a blocked writer.
+                        return
+                    continue
+                queue.popleft()
+                self._queued -= 1
+                # Rotate: a served session moves behind the others.
+                del self._queues[session_id]
+                if queue:
+                    self._queues[session_id] = queue
+                self._grant(head)
+                head.event.set()
+                progressed = True
+
+    def stats(self) -> dict[str, float | int]:
+        return {
+            "active": self._active,
+            "queued": self._queued,
+            "max_queue_depth": self.max_queue_depth,
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "wait_ms_avg": (
+                round(1000 * self._wait_total / self.granted, 3) if self.granted else 0.0
+            ),
+            "wait_ms_max": round(1000 * self._wait_max, 3),
+        }
+
+
+_scheduler = RuntimeScheduler.from_env()
+
+
+def set_scheduler(scheduler: RuntimeScheduler) -> None:
+    global _scheduler
+    _scheduler = scheduler
+
+
+def get_scheduler() -> RuntimeScheduler:
+    return _scheduler
@@ -4,31 +4,65 @@ Minimal MCP stdio server exposing the M0 tool surface.
 
 from __future__ import annotations
 
-import json
 import logging
 import os
 import sys
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any, AsyncIterator
 
 import anyio
-from mcp import types
 from mcp.server.fastmcp import FastMCP
-from starlette.applications import Starlette
-from starlette.requests import Request
-from starlette.responses import JSONResponse
-from starlette.routing import Route
 
 from . import __version__
-from .errors import MvpErrorCode, err
-from .runtime import ExternalHttpRuntimeAdapter, InMemoryRuntimeAdapter, set_runtime
+from .runtime import InMemoryRuntimeAdapter, close_runtime, monitor_runtime_health, set_runtime
+from .sessions import close_session_runtimes, compact_session_store, get_session_store
+from .state import default_state_path
 from .tools import register_tools
+from .workspace import watch_workspaces
+
+
+def _restore_sessions() -> None:
+    store = get_session_store()
+    if store.backend is None:
+        return
+    started = time.perf_counter()
+    store.compact()
+    restored = store.restore()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logging.info("Restored %s sessions in %.1f ms.", restored, elapsed_ms)
+
+
+@asynccontextmanager
+async def _lifespan(*_: Any) -> AsyncIterator[None]:
+    """
+    Restore persisted sessions, then run the runtime health monitor, workspace watchers
+    and state compaction; close runtime connections on shutdown.
+    """
+    _restore_sessions()
+    try:
+        async with anyio.create_task_group() as tg:
+            health_interval = float(os.getenv("MVP_RUNTIME_HEALTH_INTERVAL", "2"))
+            tg.start_soon(monitor_runtime_health, health_interval)
+            tg.start_soon(watch_workspaces)
+            if get_session_store().backend is not None:
+                compact_interval = float(os.getenv("MVP_STATE_COMPACT_INTERVAL", "300"))
+                tg.start_soon(compact_session_store, compact_interval)
+            try:
+                yield
+            finally:
+                tg.cancel_scope.cancel()
+    finally:
+        await close_session_runtimes()
+        await close_runtime()
 
 
 def build_server(workspace_root: Path | None = None) -> FastMCP:
     """
     Construct the FastMCP server with the M0 tool surface.
     """
-    server = FastMCP(name="mvp", log_level="INFO")
+    server = FastMCP(name="mvp", log_level="INFO", lifespan=_lifespan)
     # FastMCP does not expose a version argument; set it directly for the handshake.
     server._mcp_server.version = __version__  # type: ignore[attr-defined]
 
@@ -37,88 +71,82 @@ def build_server(workspace_root: Path | None = None) -> FastMCP:
     return server
 
 
-async def _call_tool_http(server: FastMCP, name: str, params: dict | None) -> dict:
-    try:
-        request = types.CallToolRequest(
-            params=types.CallToolRequestParams(name=name, arguments=params or {}),
-        )
-        handler = server._mcp_server.request_handlers.get(types.CallToolRequest)
-        if handler is None:
-            return err(MvpErrorCode.internal_error, "CallTool handler not available")
-        server_result = await handler(request)
-        result = server_result.root
-        if isinstance(result, types.CallToolResult) and result.structuredContent:
-            return result.structuredContent
-        return err(MvpErrorCode.internal_error, "Unexpected tool result")
-    except Exception as exc:
-        return err(MvpErrorCode.internal_error, str(exc))
-
-
-def _http_app(server: FastMCP) -> Starlette:
-    async def health(_: Request):
-        payload = await _call_tool_http(server, "system.health", {})
-        return JSONResponse(payload)
-
-    async def tools(_: Request):
-        payload = await _call_tool_http(server, "system.tools_catalog", {})
-        return JSONResponse(payload)
-
-    async def contract_create(request: Request):
-        body = await request.json()
-        payload = await _call_tool_http(server, "contract.create", body or {})
-        return JSONResponse(payload)
-
-    async def call(request: Request):
-        body = await request.json()
-        name = body.get("name")
-        params = body.get("params") or {}
-        if not name:
-            return JSONResponse(err(MvpErrorCode.invalid_request, "Missing tool name"), status_code=400)
-        payload = await _call_tool_http(server, name, params)
-        return JSONResponse(payload)
-
-    return Starlette(
-        debug=False,
-        routes=[
-            Route("/health", health, methods=["GET"]),
-            Route("/tools", tools, methods=["GET"]),
-            Route("/contract/create", contract_create, methods=["POST"]),
-            Route("/call", call, methods=["POST"]),
-        ],
-    )
+def _http_app(server: FastMCP):
+    """Build the HTTP transport app; Starlette is only imported on this path."""
+    from .http_transport import create_app
 
+    return create_app(server, lifespan=_lifespan)
 
-def main() -> None:
-    logging.basicConfig(level=logging.INFO, format="%(message)s")
-    server = build_server()
-    if os.getenv("MVP_RUNTIME", "").lower() == "inmemory":
+
+def _configure_runtime() -> None:
+    mode = os.getenv("MVP_RUNTIME", "").lower()
+    if mode == "inmemory":
         set_runtime(InMemoryRuntimeAdapter())
         logging.info("Using in-memory runtime adapter (MVP_RUNTIME=inmemory).")
-    elif os.getenv("MVP_RUNTIME", "").lower() == "external_http":
+    elif mode == "external_http":
         url = os.getenv("MVP_RUNTIME_URL", "http://127.0.0.1:9876")
-        set_runtime(ExternalHttpRuntimeAdapter(url))
+        from .runtime import AsyncExternalHttpRuntimeAdapter
+
+        set_runtime(AsyncExternalHttpRuntimeAdapter.from_env(url))
         logging.info("Using external HTTP runtime adapter at %s", url)
+
+
+def create_http_app():
+    """
+    HTTP app factory (``mvp.server:create_http_app``); every HTTP worker process calls it
+    once to build its own server, runtime adapter and state backend connection.
+    """
+    _configure_runtime()
+    return _http_app(build_server())
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     transport = os.getenv("MVP_TRANSPORT", "stdio").lower()
     if transport == "http":
-        host = "127.0.0.1"
+        host = os.getenv("MVP_HTTP_HOST", "127.0.0.1")
         port = int(os.getenv("MVP_HTTP_PORT", "8765"))
-        logging.info("Starting HTTP transport on http://%s:%s", host, port)
-        app = _http_app(server)
+        workers = max(1, int(os.getenv("MVP_HTTP_WORKERS", "1")))
         import uvicorn
 
-        uvicorn.run(app, host=host, port=port, log_level="info")
-    else:
-        logging.info("MVP stdio server expects a MCP client (Claude Desktop, Codex, etc.). Waiting on stdio...")
-        try:
-            server.run(transport="stdio")
-        except KeyboardInterrupt:
-            logging.info("Received interrupt, shutting down.")
-            sys.exit(130)
-        except (BrokenPipeError, EOFError):
-            logging.info("Stdio closed, exiting.")
-        except Exception as exc:  # pragma: no cover - defensive guard
-            logging.error("Server stopped unexpectedly: %s", exc)
-            sys.exit(1)
+        if workers == 1:
+            logging.info("Starting HTTP transport on http://%s:%s", host, port)
+            uvicorn.run(create_http_app(), host=host, port=port, log_level="info")
+            return
+        # Workers are separate processes: sessions must live in a backend they all share.
+        backend = os.environ.setdefault("MVP_STATE_BACKEND", "sqlite").lower()
+        if backend == "memory":
+            logging.warning(
+                "MVP_STATE_BACKEND=memory with %s workers: sessions are not shared.", workers
+            )
+        else:
+            logging.info("Sharing state between workers in %s", default_state_path())
+        logging.info("Starting HTTP transport on http://%s:%s with %s workers", host, port, workers)
+        uvicorn.run(
+            "mvp.server:create_http_app",
+            factory=True,
+            host=host,
+            port=port,
+            workers=workers,
+            log_level="info",
+        )
+        return
+
+    server = build_server()
+    _configure_runtime()
+    logging.info(
+        "MVP stdio server expects a MCP client (Claude Desktop, Codex, etc.). Waiting on stdio..."
+    )
+    try:
+        server.run(transport="stdio")
+    except KeyboardInterrupt:
+        logging.info("Received interrupt, shutting down.")
+        sys.exit(130)
+    except (BrokenPipeError, EOFError):
+        logging.info("Stdio closed, exiting.")
+    except Exception as exc:  # pragma: no cover - defensive guard
+        logging.error("Server stopped unexpectedly: %s", exc)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
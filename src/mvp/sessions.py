@@ -0,0 +1,322 @@
+"""
+Session store binding session ids to contracts and runtime adapters.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import MappingProxyType
+from typing import Any, Callable, Iterator, Mapping
+
+import anyio
+
+from .contracts import SessionContract
+from .envelope import dumps
+from .runtime import AsyncRuntimeAdapter, RuntimeAdapter, close_runtime
+from .state import StateBackend, get_state_backend
+
+SESSION_HEADER = "x-mvp-session"
+
+# Session selected by the transport for the request being handled (None -> default session).
+current_session_id: ContextVar[str | None] = ContextVar("mvp_session_id", default=None)
+
+_UNRESOLVED: Any = object()
+# Session looked up once by the gated call handler; helpers below it reuse the lookup.
+_call_session: ContextVar[Any] = ContextVar("mvp_call_session", default=_UNRESOLVED)
+
+_SESSIONS_NS = "session"
+_DEFAULT_NS = "default"
+
+
+class Session:
+    """A negotiated contract plus the runtime adapter bound to it."""
+
+    __slots__ = (
+        "session_id",
+        "contract",
+        "runtime",
+        "binding",
+        "resolved",
+        "bound",
+        "gate",
+        "last_used",
+        "record",
+        "refreshed",
+    )
+
+    def __init__(
+        self,
+        session_id: str,
+        contract: SessionContract,
+        runtime: RuntimeAdapter | AsyncRuntimeAdapter | None = None,
+        *,
+        binding: dict[str, Any] | None = None,
+        resolved: dict[str, Any] | None = None,
+        bound: bool = True,
+    ):
+        self.session_id = session_id
+        self.contract = contract
+        self.runtime = runtime
+        # How ``runtime`` was created (runtime profile + base URL), so it can be re-created.
+        self.binding = binding
+        # Host/runtime profiles resolved by contract.create.
+        self.resolved = resolved or {}
+        # False for sessions restored from the state backend: the runtime described by
+        # ``binding`` is created on first use in this process.
+        self.bound = bound
+        # Compiled gating table (tool name -> None or error result); filled by contract.create.
+        self.gate: Mapping[str, Any] = MappingProxyType({})
+        self.last_used = 0.0
+        # Encoded record as last written to / read from the shared backend.
+        self.record: bytes | None = None
+        self.refreshed = 0.0
+
+
+class SessionStore:
+    """
+    In-memory session registry with O(1) lookups and idle eviction.
+
+    Sessions are kept in least-recently-used order, so both the TTL sweep and the LRU cap
+    only ever pop from the front. Requests without a session id resolve to the default
+    session, which is the last one created without an explicit id.
+
+    With a shared ``backend`` the local registry becomes a cache of the backend's session
+    records: every lookup compares the local record with the stored one (a primary-key
+    read), so a session created or replaced by another worker is picked up on its next
+    request. The default-session pointer is re-read at most every ``default_refresh``
+    seconds. Expiry is tracked by the backend rows; the LRU cap only bounds the local cache.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 3600.0,
+        max_sessions: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+        backend: StateBackend | None = None,
+        default_refresh: float = 1.0,
+    ):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.backend = backend
+        self.default_refresh = default_refresh
+        self._clock = clock
+        self._sessions: OrderedDict[str, Session] = OrderedDict()
+        self._default_id: str | None = None
+        self._default_read = float("-inf")
+        self._evicted: list[Session] = []
+
+    @classmethod
+    def from_env(cls) -> "SessionStore":
+        return cls(
+            ttl=float(os.getenv("MVP_SESSION_TTL", "3600")),
+            max_sessions=int(os.getenv("MVP_SESSION_MAX", "256")),
+            backend=get_state_backend(),
+            default_refresh=float(os.getenv("MVP_SESSION_DEFAULT_REFRESH", "1")),
+        )
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __iter__(self) -> Iterator[Session]:
+        return iter(list(self._sessions.values()))
+
+    def get(self, session_id: str | None = None) -> Session | None:
+        key = session_id or self._default_key()
+        if key is None:
+            return None
+        session = self._sessions.get(key)
+        now = self._clock()
+        if self.backend is not None:
+            session = self._sync(key, session, now)
+        if session is None:
+            return None
+        if now - session.last_used > self.ttl:
+            self._evict(key)
+            return None
+        session.last_used = now
+        self._sessions.move_to_end(key)
+        return session
+
+    def put(self, session: Session, *, make_default: bool = False) -> None:
+        session.last_used = self._clock()
+        if (previous := self._sessions.get(session.session_id)) is not None:
+            if previous.runtime is not None and previous.runtime is not session.runtime:
+                self._evicted.append(previous)
+        self._sessions[session.session_id] = session
+        self._sessions.move_to_end(session.session_id)
+        if make_default:
+            self._default_id = session.session_id
+        if self.backend is not None:
+            session.record = _encode(session)
+            session.refreshed = session.last_used
+            self.backend.put(_SESSIONS_NS, session.session_id, session.record, ttl=self.ttl)
+            if make_default:
+                self.backend.put(_DEFAULT_NS, "", session.session_id.encode())
+                self._default_read = session.last_used
+        self.evict_idle()
+
+    def remove(self, session_id: str) -> None:
+        if self.backend is not None:
+            self.backend.delete(_SESSIONS_NS, session_id)
+        if session_id in self._sessions:
+            self._evict(session_id)
+
+    def _default_key(self, *, force: bool = False) -> str | None:
+        if self.backend is None:
+            return self._default_id
+        now = self._clock()
+        # Like the expiry write-back in ``_sync``, the shared pointer is read at most once
+        # per ``default_refresh`` seconds rather than on every request.
+        if force or now - self._default_read >= self.default_refresh:
+            self._default_read = now
+            if (stored := self.backend.get(_DEFAULT_NS, "")) is not None:
+                self._default_id = stored.decode()
+        return self._default_id
+
+    def _sync(self, key: str, session: Session | None, now: float) -> Session | None:
+        """Reconcile the local copy of ``key`` with the backend record."""
+        assert self.backend is not None
+        record = self.backend.get(_SESSIONS_NS, key)
+        if record is None:
+            # Expired or removed by another worker.
+            if session is not None:
+                self._evict(key)
+            return None
+        if session is None or session.record != record:
+            fresh = _decode(key, record, now)
+            if session is not None:
+                self._evicted.append(self._sessions.pop(key))
+            self._sessions[key] = session = fresh
+            self.evict_idle()
+        elif now - session.refreshed > self.ttl / 16:
+            # Still in use here: push the shared expiry forward (at most ~16 writes per TTL).
+            session.refreshed = now
+            self.backend.put(_SESSIONS_NS, key, record, ttl=self.ttl)
+        session.last_used = now
+        return session
+
+    def restore(self) -> int:
+        """
+        Load every live session record from the backend (warm restart); returns the count.
+
+        Runtimes are not reconnected here: each restored session binds its runtime on
+        first use, so startup costs one table scan plus contract validation.
+        """
+        if self.backend is None:
+            return 0
+        now = self._clock()
+        for key, record in self.backend.items(_SESSIONS_NS):
+            if (local := self._sessions.get(key)) is None or local.record != record:
+                self._sessions[key] = _decode(key, record, now)
+        self._default_key(force=True)
+        self.evict_idle()
+        return len(self._sessions)
+
+    def compact(self) -> int:
+        """Purge expired records from the backend; returns the number removed."""
+        if self.backend is None:
+            return 0
+        if (default := self.backend.get(_DEFAULT_NS, "")) is not None:
+            if self.backend.get(_SESSIONS_NS, default.decode()) is None:
+                self.backend.delete(_DEFAULT_NS, "")
+        return self.backend.compact()
+
+    def evict_idle(self) -> None:
+        """Drop sessions past their TTL, then enforce the LRU cap."""
+        now = self._clock()
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if now - oldest.last_used <= self.ttl and len(self._sessions) <= self.max_sessions:
+                break
+            self._evict(oldest_id)
+
+    def drain_evicted(self) -> list[Session]:
+        """Return (and forget) sessions evicted since the last call, so their runtimes can close."""
+        evicted, self._evicted = self._evicted, []
+        return evicted
+
+    def _evict(self, session_id: str) -> None:
+        session = self._sessions.pop(session_id)
+        if self._default_id == session_id:
+            self._default_id = None
+            self._default_read = float("-inf")
+        self._evicted.append(session)
+
+
+def _encode(session: Session) -> bytes:
+    return dumps(
+        {
+            "contract": session.contract.model_dump(mode="json"),
+            "resolved": session.resolved,
+            "runtime": session.binding,
+        }
+    )
+
+
+def _decode(session_id: str, record: bytes, now: float) -> Session:
+    data = json.loads(record)
+    session = Session(
+        session_id,
+        SessionContract.model_validate(data["contract"]),
+        binding=data.get("runtime"),
+        resolved=data.get("resolved"),
+        bound=False,
+    )
+    session.record, session.refreshed, session.last_used = record, now, now
+    return session
+
+
+_session_store = SessionStore.from_env()
+
+
+def set_session_store(store: SessionStore) -> None:
+    global _session_store
+    _session_store = store
+
+
+def get_session_store() -> SessionStore:
+    return _session_store
+
+
+def get_current_session() -> Session | None:
+    """The calling request's session, looked up once per call inside ``call_session``."""
+    session = _call_session.get()
+    if session is _UNRESOLVED:
+        return _session_store.get(current_session_id.get())
+    return session
+
+
+@contextmanager
+def call_session() -> Iterator[Session | None]:
+    """Resolve the current session once; ``get_current_session`` reuses it in this block."""
+    token = _call_session.set(_session_store.get(current_session_id.get()))
+    try:
+        yield _call_session.get()
+    finally:
+        _call_session.reset(token)
+
+
+def set_call_session(session: Session) -> None:
+    """Make ``session`` current for the rest of the call (after contract.create replaces it)."""
+    if _call_session.get() is not _UNRESOLVED:
+        _call_session.set(session)
+
+
+async def compact_session_store(interval: float) -> None:
+    """Background task: every ``interval`` seconds, purge expired session records."""
+    while True:
+        await anyio.sleep(interval)
+        await anyio.to_thread.run_sync(_session_store.compact)
+
+
+async def close_session_runtimes() -> None:
+    """Close runtime adapters bound to live or evicted sessions."""
+    for session in [*_session_store, *_session_store.drain_evicted()]:
+        if session.runtime is not None:
+            await close_runtime(session.runtime)
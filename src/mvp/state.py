@@ -0,0 +1,162 @@
+"""
+Shared state backends for session records and scene snapshots.
+
+By default all state lives in the worker's own objects (``SessionStore``, snapshot
+caches) and no backend is configured. ``MVP_STATE_BACKEND=sqlite`` stores it in a local
+SQLite database in WAL mode instead, so every HTTP worker process can serve every
+session: readers never block the single writer, and rows carry their own expiry. The
+database outlives the process, so sessions also survive a restart.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Callable, Protocol
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    ns TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (ns, key)
+) WITHOUT ROWID
+"""
+
+
+class StateBackend(Protocol):
+    """Key/value rows grouped by namespace; expired rows read as missing."""
+
+    def get(self, ns: str, key: str) -> bytes | None: ...
+
+    def put(self, ns: str, key: str, value: bytes, *, ttl: float | None = None) -> None: ...
+
+    def delete(self, ns: str, key: str) -> None: ...
+
+    def items(self, ns: str) -> list[tuple[str, bytes]]: ...
+
+    def compact(self) -> int: ...
+
+    def close(self) -> None: ...
+
+
+def default_state_path() -> str:
+    """
+    ``MVP_STATE_PATH``, else a database in the temp directory named after this instance
+    (working directory and HTTP bind address), so separate servers on one host never
+    share sessions while the workers of one server do.
+    """
+    if path := os.getenv("MVP_STATE_PATH"):
+        return path
+    import hashlib
+    import tempfile
+
+    instance = "|".join(
+        (os.getcwd(), os.getenv("MVP_HTTP_HOST", "127.0.0.1"), os.getenv("MVP_HTTP_PORT", "8765"))
+    )
+    digest = hashlib.sha256(instance.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"mvp-state-{digest}.sqlite3")
+
+
+class SqliteStateBackend:
+    """
+    ``StateBackend`` over one SQLite file shared by the worker processes on this host.
+
+    Each process keeps one autocommit connection (guarded by a lock, since snapshot
+    writes run in worker threads). WAL mode with ``synchronous=NORMAL`` keeps a write at
+    one append to the log, and ``busy_timeout`` serializes concurrent writers.
+    """
+
+    def __init__(self, path: str, *, clock: Callable[[], float] = time.time):
+        import sqlite3  # deferred: the default in-process setup never opens a database
+
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=5.0)
+        # Only takes effect when the file is new; lets compact() hand freed pages back.
+        self._db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+
+    def get(self, ns: str, key: str) -> bytes | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM state WHERE ns = ? AND key = ?", (ns, key)
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= self._clock()):
+            return None
+        return bytes(row[0])
+
+    def put(self, ns: str, key: str, value: bytes, *, ttl: float | None = None) -> None:
+        expires_at = None if ttl is None else self._clock() + ttl
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO state (ns, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (ns, key, value, expires_at),
+            )
+
+    def delete(self, ns: str, key: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM state WHERE ns = ? AND key = ?", (ns, key))
+
+    def items(self, ns: str) -> list[tuple[str, bytes]]:
+        """Live rows of ``ns`` in key order."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, value FROM state"
+                " WHERE ns = ? AND (expires_at IS NULL OR expires_at > ?) ORDER BY key",
+                (ns, self._clock()),
+            ).fetchall()
+        return [(key, bytes(value)) for key, value in rows]
+
+    def compact(self) -> int:
+        """Delete expired rows, release their pages and truncate the WAL; returns rows deleted."""
+        with self._lock:
+            deleted = self._db.execute(
+                "DELETE FROM state WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (self._clock(),),
+            ).rowcount
+            self._db.execute("PRAGMA incremental_vacuum")
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def state_backend_from_env() -> StateBackend | None:
+    """
+    Backend selected by ``MVP_STATE_BACKEND`` (``memory`` or ``sqlite``). Unset, it is
+    ``sqlite`` when ``MVP_STATE_PATH`` names a database and ``memory`` otherwise.
+    """
+    default = "sqlite" if os.getenv("MVP_STATE_PATH") else "memory"
+    kind = os.getenv("MVP_STATE_BACKEND", default).lower()
+    if kind == "sqlite":
+        return SqliteStateBackend(default_state_path())
+    if kind not in {"", "memory"}:
+        raise ValueError(f"Unknown MVP_STATE_BACKEND: {kind!r}")
+    return None
+
+
+_UNSET = object()
+_backend: StateBackend | None | object = _UNSET
+
+
+def get_state_backend() -> StateBackend | None:
+    """Process-wide backend, opened from the environment on first use."""
+    global _backend
+    if _backend is _UNSET:
+        _backend = state_backend_from_env()
+    return _backend  # type: ignore[return-value]
+
+
+def set_state_backend(backend: StateBackend | None) -> None:
+    global _backend
+    _backend = backend
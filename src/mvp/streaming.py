@@ -0,0 +1,75 @@
+"""
+Streamed tool results: list-valued results produced in bounded chunks.
+
+A streaming tool returns a ``ResultStream`` instead of a materialized payload. Each chunk
+is a dict holding a slice of the ``field`` list (plus any per-chunk companions such as
+content hashes); the HTTP transport writes chunks as NDJSON lines and stdio hosts receive
+them in MCP progress notifications. Only one chunk is alive at a time, so peak memory
+follows ``MVP_STREAM_CHUNK`` rather than the result size.
+"""
+
+from __future__ import annotations
+
+import os
+import weakref
+from itertools import islice
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator
+
+from mcp import types
+from mcp.server.fastmcp import FastMCP
+
+
+def stream_chunk_size() -> int:
+    """Items per streamed chunk (``MVP_STREAM_CHUNK``, default 500)."""
+    return max(1, int(os.getenv("MVP_STREAM_CHUNK", "500")))
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class ResultStream:
+    """
+    Chunks of a result's ``field`` list, then ``result()``: the remaining keys (computed
+    once the chunks are drained) and a ``stream`` summary of what was sent.
+    """
+
+    def __init__(
+        self,
+        field: str,
+        chunks: AsyncIterator[dict[str, Any]],
+        tail: Callable[[], dict[str, Any]] = dict,
+    ):
+        self.field = field
+        self._chunks = chunks
+        self._tail = tail
+        self.items = 0
+        self.chunks = 0
+
+    async def __aiter__(self) -> AsyncIterator[dict[str, Any]]:
+        async for chunk in self._chunks:
+            if not chunk.get(self.field):
+                continue
+            self.items += len(chunk[self.field])
+            self.chunks += 1
+            yield chunk
+
+    def result(self) -> dict[str, Any]:
+        stream = {"field": self.field, "items": self.items, "chunks": self.chunks}
+        return {**self._tail(), "stream": stream}
+
+
+StreamOpener = Callable[[str, dict], Awaitable["ResultStream | types.CallToolResult"]]
+
+_openers: "weakref.WeakKeyDictionary[FastMCP, StreamOpener]" = weakref.WeakKeyDictionary()
+
+
+def publish_stream_opener(server: FastMCP, opener: StreamOpener) -> None:
+    """Register the gated ``opener(name, arguments)`` that streams ``server``'s tools."""
+    _openers[server] = opener
+
+
+def get_stream_opener(server: FastMCP) -> StreamOpener | None:
+    return _openers.get(server)
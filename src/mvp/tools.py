@@ -4,35 +4,83 @@ MCP tools exposed by the M0 stdio server.
 
 from __future__ import annotations
 
-import json
+import math
 import os
+import time
+from itertools import islice
 from pathlib import Path
-from typing import Iterable
+from types import MappingProxyType
+from typing import Awaitable, Callable, Iterable, Mapping, TypeVar
 
+import anyio
 from mcp.server.fastmcp import FastMCP
 from mcp import types
+from pydantic import ValidationError
 
 from . import __version__
-from .contracts import Capability, SessionContract
+from .breaker import breaker_stats
+from .catalog import ToolCatalog, publish_catalog
+from .contracts import SessionContract, default_tool_timeout, negotiate_limits
+from .envelope import success_result
 from .errors import MvpErrorCode, err
 from .runtime import (
-    ExternalHttpRuntimeAdapter,
+    AsyncExternalHttpRuntimeAdapter,
     NullRuntimeAdapter,
+    call_runtime,
+    close_runtime,
     get_runtime,
+    runtime_call_stats,
     runtime_error,
-    set_runtime,
 )
+from .macros import MacroError, get_macro, run_macro
+from .metrics import metrics_snapshot, observe, record_call
+from .paging import decode_cursor, encode_cursor, iter_sorted, object_filter, page_sorted
 from .profiles import get_host_profile, get_runtime_profile
-
-IGNORED_NAMES = {".git", ".venv", "__pycache__"}
-
-_active_contract: SessionContract | None = None
-_TOOLS_ALWAYS_ALLOWED = {"system.health", "echo", "contract.create", "contract.get_active", "system.tools_catalog"}
+from .scene_cache import diff_snapshots, get_scene_cache, reset_delta, scene_cache_stats
+from .scene_index import get_scene_index
+from .scheduler import SchedulerBusy, get_scheduler
+from .sessions import (
+    Session,
+    call_session,
+    current_session_id,
+    get_current_session,
+    get_session_store,
+    set_call_session,
+)
+from .streaming import ResultStream, batched, publish_stream_opener, stream_chunk_size
+from .tracing import get_tracer
+from .workspace import get_workspace_index, workspace_stats
+
+T = TypeVar("T")
+
+_TOOLS_ALWAYS_ALLOWED = {
+    "system.health",
+    "system.metrics",
+    "echo",
+    "contract.create",
+    "contract.get_active",
+    "system.tools_catalog",
+}
 _CAPABILITY_REQUIREMENTS = {
     "runtime.probe": "DATA_ONLY",
     "scene.list_objects": "DATA_ONLY",
+    "scene.diff": "DATA_ONLY",
+    "scenegraph.find": "DATA_ONLY",
+}
+_RUNTIME_TOOLS = {"runtime.probe", "scene.list_objects", "scene.diff", "scenegraph.find"}
+# Tools without side effects; safe to run concurrently (e.g. in HTTP batches).
+_READ_ONLY_TOOLS = {
+    "system.health",
+    "system.metrics",
+    "system.tools_catalog",
+    "echo",
+    "workspace.list_files",
+    "contract.get_active",
+    "runtime.probe",
+    "scene.list_objects",
+    "scene.diff",
+    "scenegraph.find",
 }
-_RUNTIME_TOOLS = {"runtime.probe", "scene.list_objects"}
 
 
 def _contract_error(code: str, message: str) -> types.CallToolResult:
@@ -43,27 +91,95 @@ def _contract_error(code: str, message: str) -> types.CallToolResult:
     )
 
 
-def _success_payload(data: object) -> types.CallToolResult:
-    payload = {"ok": True, "result": data}
+def _success_payload(
+    data: object, *, text: str | None = None, compact_text: str | None = None
+) -> types.CallToolResult:
+    session = get_current_session()
+    if session is None:
+        return success_result(data, text=text)
+    contract = session.contract
+    compact = contract.compact_text
+    return success_result(
+        data,
+        include_text=not contract.structured_only,
+        compact=compact,
+        text=compact_text if compact else text,
+    )
+
+
+def is_read_only_tool(name: str) -> bool:
+    return name in _READ_ONLY_TOOLS
+
+
+def _timeout_error(tool_name: str, timeout: float | None) -> types.CallToolResult:
+    message = f"Tool '{tool_name}' exceeded its {timeout:g}s deadline."
     return types.CallToolResult(
-        content=[types.TextContent(type="text", text=json.dumps(payload, indent=2))],
-        structuredContent=payload,
-        isError=False,
+        content=[types.TextContent(type="text", text=message)],
+        structuredContent=err(
+            MvpErrorCode.timeout,
+            message,
+            details={"tool": tool_name, "timeout_s": timeout, "cancelled": True},
+            retryable=True,
+        ),
+        isError=True,
     )
 
 
-def _maybe_gate(tool_name: str) -> types.CallToolResult | None:
-    if tool_name in _TOOLS_ALWAYS_ALLOWED:
+def _busy_error(tool_name: str, exc: SchedulerBusy) -> types.CallToolResult:
+    message = f"Runtime is busy; '{tool_name}' was not queued."
+    return types.CallToolResult(
+        content=[types.TextContent(type="text", text=message)],
+        structuredContent=err(
+            MvpErrorCode.runtime_unavailable,
+            message,
+            details={"reason": "queue_full", "queue": exc.reason, "queued": exc.queued},
+            hint="Retry shortly or lower request concurrency.",
+            retryable=True,
+        ),
+        isError=True,
+    )
+
+
+def _result_code(result: object) -> str:
+    """Outcome label of a tool result: ``ok`` or its error code."""
+    if not getattr(result, "isError", False):
+        return "ok"
+    error = (getattr(result, "structuredContent", None) or {}).get("error")
+    if isinstance(error, dict) and (code := error.get("code")):
+        return code.value if isinstance(code, MvpErrorCode) else str(code)
+    return MvpErrorCode.internal_error.value
+
+
+def _runtime_binding(runtime_profile: str) -> dict[str, str] | None:
+    """Runtime a session on ``runtime_profile`` owns; None means the process-wide runtime."""
+    runtime = get_runtime_profile(runtime_profile)
+    if runtime is not None and runtime.name == "mcpblender_http":
+        base_url = os.getenv("MVP_RUNTIME_URL", runtime.base_url or "http://127.0.0.1:9876")
+        return {"profile": runtime.name, "base_url": base_url}
+    return None
+
+
+def _bind_runtime(binding: dict[str, str] | None):
+    if binding is None:
         return None
+    return AsyncExternalHttpRuntimeAdapter.from_env(binding["base_url"])
 
-    if _active_contract is None:
-        return _contract_error(MvpErrorCode.contract_required.value, "An active session contract is required.")
 
-    if _active_contract.tool_allowlist is not None and tool_name not in _active_contract.tool_allowlist:
+def _session_runtime(session: Session | None):
+    if session is not None and not session.bound:
+        # Restored from the state backend: connect this process's own adapter.
+        session.runtime, session.bound = _bind_runtime(session.binding), True
+    if session is not None and session.runtime is not None:
+        return session.runtime
+    return get_runtime()
+
+
+def _gate_verdict(contract: SessionContract, tool_name: str) -> types.CallToolResult | None:
+    if contract.tool_allowlist is not None and tool_name not in contract.tool_allowlist:
         return _contract_error("tool_not_allowed", f"Tool '{tool_name}' is not allowed by the active contract.")
 
     if required_cap := _CAPABILITY_REQUIREMENTS.get(tool_name):
-        cap_values = {cap.value for cap in _active_contract.capabilities}
+        cap_values = {cap.value for cap in contract.capabilities}
         if required_cap not in cap_values:
             return _contract_error(
                 MvpErrorCode.capability_required.value,
@@ -73,14 +189,73 @@ def _maybe_gate(tool_name: str) -> types.CallToolResult | None:
     return None
 
 
+def _compile_gate(
+    contract: SessionContract, tool_names: Iterable[str]
+) -> Mapping[str, types.CallToolResult | None]:
+    """
+    Precompute the gating verdict of every registered tool for ``contract``.
+
+    The resulting read-only table maps tool name to ``None`` (allowed) or the ready-made
+    error result, so gating a call is a single dict lookup.
+    """
+    return MappingProxyType(
+        {
+            name: None if name in _TOOLS_ALWAYS_ALLOWED else _gate_verdict(contract, name)
+            for name in tool_names
+        }
+    )
+
+
+_CONTRACT_REQUIRED = _contract_error(
+    MvpErrorCode.contract_required.value, "An active session contract is required."
+)
+_NOT_COMPILED = object()
+
+
+def _maybe_gate(tool_name: str) -> types.CallToolResult | None:
+    if tool_name in _TOOLS_ALWAYS_ALLOWED:
+        return None
+
+    session = get_current_session()
+    if session is None:
+        return _CONTRACT_REQUIRED
+
+    verdict = session.gate.get(tool_name, _NOT_COMPILED)
+    if verdict is _NOT_COMPILED:
+        # Tool unknown when the contract was compiled; evaluate it directly.
+        return _gate_verdict(session.contract, tool_name)
+    return verdict
+
+
 def register_tools(server: FastMCP, workspace_root: Path) -> None:
     """
     Register the M0 tools on the provided server.
     """
+    # Created here rather than on first call so the lifespan's watcher finds it.
+    index = get_workspace_index(workspace_root)
 
     @server.tool(name="system.health", description="Return basic health information for the MVP core.")
     def system_health() -> types.CallToolResult:
-        return _success_payload({"name": "mvp", "version": __version__})
+        return _success_payload(
+            {
+                "name": "mvp",
+                "version": __version__,
+                "scene_cache": scene_cache_stats(),
+                "scheduler": get_scheduler().stats(),
+                "workspace": workspace_stats(),
+                "runtime_calls": runtime_call_stats(),
+                "runtime_breakers": breaker_stats(),
+            }
+        )
+
+    @server.tool(
+        name="system.metrics",
+        description=(
+            "Return call counters and latency percentiles (also served as /metrics over HTTP)."
+        ),
+    )
+    def system_metrics() -> types.CallToolResult:
+        return _success_payload(metrics_snapshot())
 
     @server.tool(name="echo", description="Echo the provided text.")
     def echo(text: str) -> types.CallToolResult:
@@ -88,72 +263,132 @@ def register_tools(server: FastMCP, workspace_root: Path) -> None:
 
     @server.tool(
         name="workspace.list_files",
-        description="List files under the workspace root up to a maximum depth.",
+        description=(
+            "List files under the workspace root up to a maximum depth, from an in-memory index. "
+            "Filters: glob (path if it contains '/', else file name), extensions; paged with "
+            "limit/cursor. with_hash adds sha256 content hashes. stream=true sends the list in "
+            "progress notifications (requires a progressToken)."
+        ),
     )
-    def workspace_list_files(max_depth: int = 3) -> types.CallToolResult:
+    async def workspace_list_files(
+        max_depth: int = 3,
+        glob: str | None = None,
+        extensions: list[str] | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+        with_hash: bool = False,
+        stream: bool = False,
+    ) -> types.CallToolResult:
         if max_depth < 0:
             raise ValueError("max_depth must be non-negative")
+        if limit is not None and limit < 1:
+            return _contract_error(MvpErrorCode.invalid_request.value, "limit must be positive")
 
-        files: list[str] = []
-        root = workspace_root.resolve()
-
-        def iter_paths(base: Path, depth: int) -> Iterable[Path]:
-            for entry in base.iterdir():
-                if entry.name in IGNORED_NAMES:
-                    continue
-                if entry.is_symlink():
-                    continue
-                if entry.is_dir():
-                    if depth < max_depth:
-                        yield from iter_paths(entry, depth + 1)
-                elif entry.is_file():
-                    yield entry
-
-        for path in iter_paths(root, 0):
-            files.append(path.relative_to(root).as_posix())
+        await index.ready()
+        try:
+            entries, next_cursor = index.query(
+                max_depth=max_depth, glob=glob, extensions=extensions, limit=limit, cursor=cursor
+            )
+        except ValueError as exc:
+            return _contract_error(MvpErrorCode.invalid_request.value, str(exc))
+        payload: dict[str, object] = {
+            "files": [entry.path for entry in entries],
+            "next_cursor": next_cursor,
+        }
+        if with_hash:
+            payload["hashes"] = await anyio.to_thread.run_sync(index.digests, entries)
+        return _success_payload(payload)
 
-        files.sort()
-        return _success_payload({"files": files})
+    async def stream_list_files(
+        max_depth: int = 3,
+        glob: str | None = None,
+        extensions: list[str] | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+        with_hash: bool = False,
+        stream: bool = True,
+    ) -> ResultStream | types.CallToolResult:
+        if max_depth < 0 or (limit is not None and limit < 1):
+            return _contract_error(
+                MvpErrorCode.invalid_request.value, "max_depth and limit must be positive"
+            )
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as exc:
+            return _contract_error(MvpErrorCode.invalid_request.value, str(exc))
+        await index.ready()
+        tail: dict[str, object] = {"next_cursor": None}
+
+        async def chunks():
+            # Each chunk resumes after the last path sent, so index updates between
+            # chunks never shift or repeat entries.
+            last, remaining, size = after, limit, stream_chunk_size()
+            while True:
+                page, more = index.select(
+                    after=last,
+                    max_depth=max_depth,
+                    glob=glob,
+                    extensions=extensions,
+                    limit=size if remaining is None else min(size, remaining),
+                )
+                if not page:
+                    return
+                chunk: dict[str, object] = {"files": [entry.path for entry in page]}
+                if with_hash:
+                    chunk["hashes"] = await anyio.to_thread.run_sync(index.digests, page)
+                yield chunk
+                last = page[-1].path
+                if remaining is not None:
+                    remaining -= len(page)
+                    if remaining == 0:
+                        tail["next_cursor"] = encode_cursor(last) if more else None
+                        return
+                if not more:
+                    return
+
+        return ResultStream("files", chunks(), lambda: tail)
 
     @server.tool(
         name="contract.create",
         description="Create a session contract to gate subsequent tool calls.",
     )
-    def contract_create(
+    async def contract_create(
         host_profile: str,
         runtime_profile: str,
         capabilities: list[str] | None = None,
         tool_allowlist: list[str] | None = None,
+        structured_only: bool = False,
+        compact_text: bool = False,
+        limits: dict | None = None,
     ) -> types.CallToolResult:
-        global _active_contract
         resolved: dict[str, object] = {}
+        binding = None
+        host_limits: dict = {}
 
         if host := get_host_profile(host_profile):
             resolved["host"] = host.model_dump()
             host_profile_name = host.name
+            host_limits = host.limits or {}
         else:
             host_profile_name = host_profile
 
         if runtime := get_runtime_profile(runtime_profile):
             resolved["runtime"] = runtime.model_dump()
             runtime_profile_name = runtime.name
-            if runtime.name == "mcpblender_http":
-                base_url = os.getenv("MVP_RUNTIME_URL", runtime.base_url or "http://127.0.0.1:9876")
-                set_runtime(ExternalHttpRuntimeAdapter(base_url))
+            binding = _runtime_binding(runtime.name)
         else:
             runtime_profile_name = runtime_profile
 
         try:
-            _active_contract = SessionContract.create(
+            contract = SessionContract.create(
                 host_profile=host_profile_name,
                 runtime_profile=runtime_profile_name,
                 capabilities=capabilities or [],
                 tool_allowlist=tool_allowlist,
+                structured_only=structured_only,
+                compact_text=compact_text,
+                limits=negotiate_limits(host_limits, limits),
             )
-            payload = _active_contract.model_dump(mode="json")
-            if resolved:
-                payload["resolved"] = resolved
-            return _success_payload(payload)
         except ValueError as exc:
             return types.CallToolResult(
                 content=[types.TextContent(type="text", text=str(exc))],
@@ -161,71 +396,443 @@ def register_tools(server: FastMCP, workspace_root: Path) -> None:
                 isError=True,
             )
 
+        store = get_session_store()
+        requested_id = current_session_id.get()
+        session = Session(
+            requested_id or contract.contract_id,
+            contract,
+            _bind_runtime(binding),
+            binding=binding,
+            resolved=resolved,
+        )
+        tool_names = (tool.name for tool in server._tool_manager.list_tools())
+        session.gate = _compile_gate(contract, tool_names)
+        store.put(session, make_default=requested_id is None)
+        set_call_session(session)
+        for evicted in store.drain_evicted():
+            if evicted.runtime is not None:
+                await close_runtime(evicted.runtime)
+
+        payload = contract.model_dump(mode="json")
+        payload["session_id"] = session.session_id
+        if resolved:
+            payload["resolved"] = resolved
+        return _success_payload(payload)
+
     @server.tool(
         name="contract.get_active",
         description="Return the active session contract, if any.",
     )
     def contract_get_active() -> types.CallToolResult:
-        payload = _active_contract.model_dump(mode="json") if _active_contract else None
+        session = get_current_session()
+        if session is None:
+            return _success_payload(None)
+        payload = session.contract.model_dump(mode="json")
+        payload["session_id"] = session.session_id
+        if session.resolved:
+            payload["resolved"] = session.resolved
         return _success_payload(payload)
 
     @server.tool(
         name="runtime.probe",
         description="Probe the injected runtime for metadata.",
     )
-    def runtime_probe() -> types.CallToolResult:
-        adapter = get_runtime()
+    async def runtime_probe() -> types.CallToolResult:
+        adapter = _session_runtime(get_current_session())
         try:
-            return _success_payload(adapter.probe())
+            return _success_payload(await call_runtime(adapter, "probe"))
         except Exception as exc:  # pragma: no cover - guarded
-            return runtime_error(str(exc))
+            return runtime_error(exc)
 
     @server.tool(
         name="scene.list_objects",
-        description="List objects in the active scene via the injected runtime.",
+        description=(
+            "List objects in the active scene via the injected runtime. Optional limit/cursor "
+            "paging (name order) and type/name_prefix filters. stream=true sends the objects in "
+            "progress notifications (requires a progressToken)."
+        ),
+    )
+    async def scene_list_objects(
+        limit: int | None = None,
+        cursor: str | None = None,
+        type: str | None = None,
+        name_prefix: str | None = None,
+        stream: bool = False,
+    ) -> types.CallToolResult:
+        adapter = _session_runtime(get_current_session())
+        cache = get_scene_cache(adapter)
+        if limit is not None and limit < 1:
+            return _contract_error(MvpErrorCode.invalid_request.value, "limit must be positive")
+        try:
+            if limit is None:
+                snapshot = await cache.get(adapter)
+                objects = list(snapshot.objects)
+                if type or name_prefix:
+                    objects = list(filter(object_filter(type, name_prefix), objects))
+                return _success_payload({"objects": objects, "fingerprint": snapshot.fingerprint})
+
+            snapshot = cache.peek()
+            if snapshot is None and not hasattr(adapter, "list_scene_objects_page"):
+                snapshot = await cache.get(adapter)
+            if snapshot is not None:
+                page, next_cursor = page_sorted(
+                    snapshot.objects,
+                    key=lambda obj: str(obj.get("name", "")),
+                    limit=limit,
+                    cursor=cursor,
+                    name_prefix=name_prefix,
+                    predicate=object_filter(type),
+                )
+                payload = {
+                    "objects": page,
+                    "next_cursor": next_cursor,
+                    "fingerprint": snapshot.fingerprint,
+                }
+                return _success_payload(payload)
+
+            page, next_cursor = await call_runtime(
+                adapter,
+                "list_scene_objects_page",
+                limit=limit,
+                cursor=cursor,
+                type=type,
+                name_prefix=name_prefix,
+            )
+            # Paged by the runtime, not from a snapshot: there is no fingerprint to report.
+            payload = {"objects": page, "next_cursor": next_cursor, "fingerprint": None}
+            return _success_payload(payload)
+        except ValueError as exc:
+            return _contract_error(MvpErrorCode.invalid_request.value, str(exc))
+        except Exception as exc:  # pragma: no cover - guarded
+            return runtime_error(exc)
+
+    async def stream_scene_objects(
+        limit: int | None = None,
+        cursor: str | None = None,
+        type: str | None = None,
+        name_prefix: str | None = None,
+        stream: bool = True,
+    ) -> ResultStream | types.CallToolResult:
+        if limit is not None and limit < 1:
+            return _contract_error(MvpErrorCode.invalid_request.value, "limit must be positive")
+        adapter = _session_runtime(get_current_session())
+        try:
+            after = decode_cursor(cursor)
+            snapshot = await get_scene_cache(adapter).get(adapter)
+        except ValueError as exc:
+            return _contract_error(MvpErrorCode.invalid_request.value, str(exc))
+        except Exception as exc:  # pragma: no cover - guarded
+            return runtime_error(exc)
+        tail: dict[str, object] = {"next_cursor": None, "fingerprint": snapshot.fingerprint}
+
+        def name(obj: dict) -> str:
+            return str(obj.get("name", ""))
+
+        async def chunks():
+            # Chunks are slices of the immutable snapshot; nothing else is materialized.
+            matches = iter_sorted(
+                snapshot.objects,
+                key=name,
+                after=after,
+                name_prefix=name_prefix,
+                predicate=object_filter(type),
+            )
+            if limit is not None:
+                matches = islice(matches, limit + 1)
+            sent, last = 0, after
+            for batch in batched(matches, stream_chunk_size()):
+                more = limit is not None and sent + len(batch) > limit
+                if more:
+                    batch = batch[: limit - sent]
+                if batch:
+                    sent, last = sent + len(batch), name(batch[-1])
+                    yield {"objects": batch}
+                if more:
+                    tail["next_cursor"] = encode_cursor(last)
+
+        return ResultStream("objects", chunks(), lambda: tail)
+
+    @server.tool(
+        name="scene.diff",
+        description=(
+            "Return objects added, removed and modified since a previous snapshot fingerprint."
+        ),
     )
-    def scene_list_objects() -> types.CallToolResult:
-        adapter = get_runtime()
+    async def scene_diff(since: str) -> types.CallToolResult:
+        adapter = _session_runtime(get_current_session())
         try:
-            objects = adapter.list_scene_objects()
-            return _success_payload({"objects": objects})
+            cache = get_scene_cache(adapter)
+            snapshot = await cache.get(adapter)
         except Exception as exc:  # pragma: no cover - guarded
-            return runtime_error(str(exc))
+            return runtime_error(exc)
+        if (base := cache.find(since)) is not None:
+            return _success_payload({**diff_snapshots(base, snapshot).as_dict(), "reset": False})
+        # Unknown or expired base: the caller must resync from the full object list.
+        return _success_payload({**reset_delta(since, snapshot).as_dict(), "reset": True})
+
+    @server.tool(
+        name="scenegraph.find",
+        description=(
+            "Query objects by name pattern (glob), collection, material, type, radius around a "
+            "point or bounding box, from the indexed scene snapshot."
+        ),
+    )
+    async def scenegraph_find(
+        name_pattern: str | None = None,
+        collection: str | None = None,
+        material: str | None = None,
+        type: str | None = None,
+        near: list[float] | None = None,
+        radius: float | None = None,
+        bbox: list[list[float]] | None = None,
+        limit: int = 50,
+    ) -> types.CallToolResult:
+        if limit < 1:
+            return _contract_error(MvpErrorCode.invalid_request.value, "limit must be positive")
+        if (near is None) != (radius is None) or (near is not None and len(near) != 3):
+            return _contract_error(
+                MvpErrorCode.invalid_request.value, "near requires [x,y,z] and radius"
+            )
+        if bbox is not None and (len(bbox) != 2 or any(len(corner) != 3 for corner in bbox)):
+            return _contract_error(
+                MvpErrorCode.invalid_request.value, "bbox must be [[x,y,z],[x,y,z]]"
+            )
+        coordinates = [*(near or ()), *(value for corner in bbox or () for value in corner)]
+        if not all(math.isfinite(value) for value in coordinates):
+            return _contract_error(
+                MvpErrorCode.invalid_request.value, "near and bbox coordinates must be finite"
+            )
+        if radius is not None and not (math.isfinite(radius) and radius >= 0):
+            return _contract_error(
+                MvpErrorCode.invalid_request.value, "radius must be finite and non-negative"
+            )
+        if bbox is not None:
+            # Accept corners in either order: the index expects per-axis [min, max].
+            bbox = [
+                [min(bbox[0][axis], bbox[1][axis]) for axis in range(3)],
+                [max(bbox[0][axis], bbox[1][axis]) for axis in range(3)],
+            ]
+        adapter = _session_runtime(get_current_session())
+        try:
+            cache = get_scene_cache(adapter)
+            snapshot = await cache.get(adapter)
+        except Exception as exc:  # pragma: no cover - guarded
+            return runtime_error(exc)
+        matches, truncated = get_scene_index(cache, snapshot).find(
+            name_pattern=name_pattern,
+            collection=collection,
+            material=material,
+            type=type,
+            near=near,
+            radius=radius,
+            bbox=bbox,
+            limit=limit,
+        )
+        return _success_payload(
+            {"matches": matches, "truncated": truncated, "fingerprint": snapshot.fingerprint}
+        )
 
     @server.tool(
         name="system.tools_catalog",
-        description="List available tools and their gating metadata.",
-    )
-    def system_tools_catalog() -> types.CallToolResult:
-        tools = []
-        for tool in server._tool_manager.list_tools():
-            name = tool.name
-            tools.append(
-                {
-                    "name": name,
-                    "description": tool.description,
-                    "gating": {
-                        "requires_contract": name not in _TOOLS_ALWAYS_ALLOWED,
-                        "required_capabilities": [_CAPABILITY_REQUIREMENTS[name]]
-                        if name in _CAPABILITY_REQUIREMENTS
-                        else [],
-                        "allowlist_respected": name not in _TOOLS_ALWAYS_ALLOWED,
-                    },
-                    "input_schema": tool.parameters,
-                    "output_schema": tool.output_schema,
-                }
+        description=(
+            "List the tools the active contract may call (all tools without a contract) and their "
+            "gating metadata. Pass a previous catalog fingerprint as if_none_match to skip an "
+            "unchanged listing."
+        ),
+    )
+    def system_tools_catalog(if_none_match: str | None = None) -> types.CallToolResult:
+        session = get_current_session()
+        view = catalog.view(session.contract if session else None)
+        if if_none_match == view.fingerprint:
+            return _success_payload({"fingerprint": view.fingerprint, "not_modified": True})
+        return _success_payload(view.result, text=view.text, compact_text=view.compact_text)
+
+    @server.tool(
+        name="macro.run",
+        description="Run a registered macro server-side; each step goes through contract gating.",
+    )
+    async def macro_run(name: str, inputs: dict | None = None) -> types.CallToolResult:
+        macro = get_macro(name)
+        if macro is None:
+            return _contract_error(MvpErrorCode.invalid_request.value, f"Unknown macro '{name}'.")
+        session = get_current_session()
+        capabilities = {cap.value for cap in session.contract.capabilities} if session else set()
+        # Refuse before the first (possibly mutating) step rather than relying on rollback.
+        checked = {step.tool for step in [*macro.steps, *macro.postconditions]} & known_tools
+        if refused := sorted(tool for tool in checked if _maybe_gate(tool) is not None):
+            return _contract_error(
+                MvpErrorCode.invalid_request.value,
+                f"Macro steps are not allowed by the active contract: {', '.join(refused)}",
             )
-        return _success_payload({"tools": tools})
+        try:
+            envelope = await run_macro(
+                macro,
+                inputs or {},
+                _call_gated,
+                available_tools=known_tools,
+                capabilities=capabilities,
+            )
+        except MacroError as exc:
+            return _contract_error(MvpErrorCode.invalid_request.value, str(exc))
+        if envelope["ok"]:
+            return _success_payload(envelope["result"])
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=envelope["error"]["message"])],
+            structuredContent=envelope,
+            isError=True,
+        )
+
+    async def _call_gated(name: str, arguments: dict) -> dict:
+        params = types.CallToolRequestParams(name=name, arguments=arguments)
+        request = types.CallToolRequest(params=params)
+        result = (await gated_call_tool(request)).root
+        if isinstance(result, types.CallToolResult) and result.structuredContent:
+            return result.structuredContent
+        content = getattr(result, "content", [])
+        text = next((block.text for block in content if block.type == "text"), None)
+        return err(MvpErrorCode.internal_error, text or "Unexpected tool result")
+
+    # Built once the tool surface is complete; system.tools_catalog and GET /tools serve it.
+    catalog = ToolCatalog.build(
+        server,
+        always_allowed=_TOOLS_ALWAYS_ALLOWED,
+        capability_requirements=_CAPABILITY_REQUIREMENTS,
+    )
+    publish_catalog(server, catalog)
 
     original_call_handler = server._mcp_server.request_handlers.get(types.CallToolRequest)
+    known_tools = {entry["name"] for entry in catalog.full.tools}
 
     async def gated_call_tool(req: types.CallToolRequest):
         tool_name = req.params.name
-        if error := _maybe_gate(tool_name):
-            return types.ServerResult(error)
-        if tool_name in _RUNTIME_TOOLS and isinstance(get_runtime(), NullRuntimeAdapter):
-            return types.ServerResult(runtime_error("Runtime unavailable"))
+        # Unregistered names are folded into one label to bound metric cardinality.
+        label = tool_name if tool_name in known_tools else "unknown"
+        started = time.perf_counter()
+        code = MvpErrorCode.internal_error.value  # unless the handler returns a result
+        try:
+            # One session lookup per call: gating, limits and the envelope all reuse it.
+            with call_session(), get_tracer().span("mcp.call_tool", tool=tool_name) as span:
+                result = await _dispatch_call(req, tool_name, label)
+                if (code := _result_code(result.root)) != "ok":
+                    span.record_error(code)
+        except anyio.get_cancelled_exc_class():
+            code = "cancelled"
+            raise
+        finally:
+            record_call(label, code, time.perf_counter() - started)
+        return result
+
+    async def _dispatch_call(req: types.CallToolRequest, tool_name: str, label: str):
         assert original_call_handler is not None
-        return await original_call_handler(req)
+        if tool_name in streamers and (req.params.arguments or {}).get("stream"):
+            run = lambda: _stream_progress(tool_name, req.params.arguments or {})  # noqa: E731
+        else:
+            run = lambda: original_call_handler(req)  # noqa: E731
+        result = await _guarded(tool_name, label, run)
+        return result if isinstance(result, types.ServerResult) else types.ServerResult(result)
+
+    async def _guarded(
+        tool_name: str, label: str, run: Callable[[], Awaitable[T]]
+    ) -> T | types.CallToolResult:
+        """Gate ``run()``, then apply the call deadline and, for runtime tools, a scheduler slot."""
+        started = time.perf_counter()
+        with get_tracer().span("mvp.gate", tool=tool_name):
+            error = _maybe_gate(tool_name)
+        observe("mvp_gate_duration_seconds", label, time.perf_counter() - started)
+        if error:
+            return error
+        session = get_current_session()
+        if tool_name in _RUNTIME_TOOLS and isinstance(
+            _session_runtime(session), NullRuntimeAdapter
+        ):
+            return runtime_error("Runtime unavailable")
+        timeout = session.contract.limits.timeout_for(tool_name) if session else None
+        if timeout is None:
+            timeout = default_tool_timeout()
+        # Cancellation (deadline or MCP notifications/cancelled) propagates into awaited
+        # runtime requests, which releases their pooled connections immediately. The
+        # deadline also covers time spent queued for a runtime slot.
+        with anyio.move_on_after(timeout):
+            if tool_name not in _RUNTIME_TOOLS:
+                return await run()
+            try:
+                slot = get_scheduler().slot(
+                    session.session_id if session else "",
+                    exclusive=tool_name not in _READ_ONLY_TOOLS,
+                    limit=session.contract.limits.max_concurrent_calls if session else None,
+                )
+                async with slot:
+                    return await run()
+            except SchedulerBusy as exc:
+                return _busy_error(tool_name, exc)
+        return _timeout_error(tool_name, timeout)
+
+    streamers = {
+        "workspace.list_files": stream_list_files,
+        "scene.list_objects": stream_scene_objects,
+    }
+
+    async def _open_stream(tool_name: str, arguments: dict) -> ResultStream | types.CallToolResult:
+        tool = server._tool_manager.get_tool(tool_name)
+        if tool is None or tool_name not in streamers:
+            return _contract_error(
+                MvpErrorCode.invalid_request.value, f"Tool '{tool_name}' does not stream results."
+            )
+        if not isinstance(arguments, dict):
+            return _contract_error(
+                MvpErrorCode.invalid_request.value, "Arguments must be a JSON object."
+            )
+        try:
+            return await tool.fn_metadata.call_fn_with_arg_validation(
+                streamers[tool_name], True, arguments, None
+            )
+        except ValidationError as exc:
+            return _contract_error(MvpErrorCode.invalid_request.value, str(exc))
+
+    async def _stream_progress(tool_name: str, arguments: dict) -> types.CallToolResult:
+        """Send each chunk as a progress notification; the final result carries the tail."""
+        try:
+            context = server._mcp_server.request_context
+        except LookupError:
+            context = None
+        meta = context.meta if context is not None else None
+        token = meta.progressToken if meta is not None else None
+        if token is None:
+            return _contract_error(
+                MvpErrorCode.invalid_request.value,
+                "stream=true needs a progressToken (MCP) or POST /call/stream (HTTP).",
+            )
+        opened = await _open_stream(tool_name, arguments)
+        if not isinstance(opened, ResultStream):
+            return opened
+        try:
+            async for chunk in opened:
+                params = types.ProgressNotificationParams(
+                    progressToken=token,
+                    progress=opened.items,
+                    message=f"{opened.items} {opened.field}",
+                    **chunk,
+                )
+                await context.session.send_notification(
+                    types.ServerNotification(types.ProgressNotification(params=params)),
+                    related_request_id=context.request_id,
+                )
+        except Exception as exc:
+            return _contract_error(MvpErrorCode.internal_error.value, str(exc))
+        return _success_payload(opened.result())
+
+    async def open_result_stream(
+        tool_name: str, arguments: dict
+    ) -> ResultStream | types.CallToolResult:
+        """Gated stream opener for transports; the deadline and runtime slot cover opening only."""
+        label = tool_name if tool_name in known_tools else "unknown"
+        started = time.perf_counter()
+        with call_session():
+            opened = await _guarded(tool_name, label, lambda: _open_stream(tool_name, arguments))
+        code = "ok" if isinstance(opened, ResultStream) else _result_code(opened)
+        record_call(label, code, time.perf_counter() - started)
+        return opened
+
+    publish_stream_opener(server, open_result_stream)
 
     server._mcp_server.request_handlers[types.CallToolRequest] = gated_call_tool
@@ -0,0 +1,256 @@
+"""
+Optional tracing: a no-op default, a built-in W3C trace-context tracer with a JSONL
+exporter, and a bridge to OpenTelemetry when it is installed.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, MutableMapping, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class Span(Protocol):
+    def set_attribute(self, key: str, value: Any) -> None: ...
+
+    def record_error(self, code: str, message: str = "") -> None: ...
+
+    def __enter__(self) -> "Span": ...
+
+    def __exit__(self, *exc_info: Any) -> None: ...
+
+
+class Tracer(Protocol):
+    def span(self, name: str, **attributes: Any) -> Span:
+        """Return a span context manager; the span is current inside the ``with`` block."""
+        ...
+
+    def inject(self, headers: MutableMapping[str, str]) -> None:
+        """Add ``traceparent`` for the current span to outgoing request ``headers``."""
+        ...
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_error(self, code: str, message: str = "") -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class NoopTracer:
+    """Default tracer: hands out one shared inert span, so disabled tracing allocates nothing."""
+
+    def span(self, name: str, **attributes: Any) -> Span:
+        return _NOOP_SPAN
+
+    def inject(self, headers: MutableMapping[str, str]) -> None:
+        pass
+
+
+class JsonlExporter:
+    """
+    Append finished spans to a file, one JSON object per line.
+
+    ``export`` only queues the record: a daemon thread encodes queued spans, writes them
+    through one open, buffered handle and flushes whenever the queue runs dry, so calls
+    never wait on the file. ``flush`` blocks until every span queued so far is written;
+    it also runs at interpreter exit.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._handle = self.path.open("a", encoding="utf-8")
+        self._queue: queue.Queue[dict | None] = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._write_queued, name="mvp-trace-writer", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.flush)
+
+    def export(self, record: dict) -> None:
+        self._queue.put(record)
+
+    def flush(self) -> None:
+        if self._writer.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        """Write the queued spans, then stop the writer and close the file."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        atexit.unregister(self.flush)
+
+    def _write_queued(self) -> None:
+        while True:
+            record = self._queue.get()
+            try:
+                if record is None:
+                    self._handle.close()
+                    return
+                self._handle.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+                if self._queue.empty():
+                    self._handle.flush()
+            except Exception as exc:  # a full disk or odd attribute loses the span, never a call
+                logger.warning("Trace export to %s failed: %s", self.path, exc)
+            finally:
+                self._queue.task_done()
+
+
+_current: ContextVar["_RecordedSpan | None"] = ContextVar("mvp_current_span", default=None)
+
+
+class _RecordedSpan:
+    __slots__ = (
+        "tracer",
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "status",
+        "start_ns",
+        "_token",
+    )
+
+    def __init__(self, tracer: "RecordingTracer", name: str, attributes: dict[str, Any]):
+        parent = _current.get()
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.status: dict[str, str] = {"code": "ok"}
+        self.start_ns = 0
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, code: str, message: str = "") -> None:
+        self.status = {"code": "error", "error_code": code, "message": message}
+
+    def __enter__(self) -> "_RecordedSpan":
+        self.start_ns = time.time_ns()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, _tb: Any) -> None:
+        end_ns = time.time_ns()
+        _current.reset(self._token)
+        if exc is not None and self.status["code"] == "ok":
+            self.record_error(exc_type.__name__, str(exc))
+        self.tracer.exporter.export(
+            {
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "name": self.name,
+                "start_ns": self.start_ns,
+                "duration_us": (end_ns - self.start_ns) // 1000,
+                "attributes": self.attributes,
+                "status": self.status,
+            }
+        )
+
+
+class RecordingTracer:
+    """Self-contained tracer following the W3C trace-context model (no dependencies)."""
+
+    def __init__(self, exporter: JsonlExporter):
+        self.exporter = exporter
+
+    def span(self, name: str, **attributes: Any) -> Span:
+        return _RecordedSpan(self, name, attributes)
+
+    def inject(self, headers: MutableMapping[str, str]) -> None:
+        if (span := _current.get()) is not None:
+            headers["traceparent"] = f"00-{span.trace_id}-{span.span_id}-01"
+
+
+class _OtelSpan:
+    __slots__ = ("_manager", "_span")
+
+    def __init__(self, manager: Any):
+        self._manager = manager
+        self._span = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self._span.set_attribute(key, value)
+
+    def record_error(self, code: str, message: str = "") -> None:
+        from opentelemetry.trace import Status, StatusCode
+
+        self._span.set_attribute("mvp.error_code", code)
+        self._span.set_status(Status(StatusCode.ERROR, message))
+
+    def __enter__(self) -> "_OtelSpan":
+        self._span = self._manager.__enter__()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._manager.__exit__(*exc_info)
+
+
+class OpenTelemetryTracer:
+    """Bridge onto the globally configured OpenTelemetry tracer provider."""
+
+    def __init__(self):
+        from opentelemetry import propagate, trace
+
+        self._tracer = trace.get_tracer("mvp")
+        self._propagate = propagate
+
+    def span(self, name: str, **attributes: Any) -> Span:
+        return _OtelSpan(self._tracer.start_as_current_span(name, attributes=attributes))
+
+    def inject(self, headers: MutableMapping[str, str]) -> None:
+        self._propagate.inject(headers)
+
+
+def tracer_from_env() -> Tracer:
+    """``MVP_TRACE_FILE`` selects the JSONL tracer, ``MVP_TRACING=otel`` the OpenTelemetry one."""
+    if os.getenv("MVP_TRACING", "").lower() == "otel":
+        try:
+            return OpenTelemetryTracer()
+        except ImportError:
+            logger.warning("MVP_TRACING=otel needs opentelemetry-api; tracing is off.")
+            return NoopTracer()
+    if path := os.getenv("MVP_TRACE_FILE"):
+        return RecordingTracer(JsonlExporter(path))
+    return NoopTracer()
+
+
+_tracer: Tracer = tracer_from_env()
+
+
+def set_tracer(tracer: Tracer) -> None:
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer() -> Tracer:
+    return _tracer
@@ -0,0 +1,468 @@
+"""
+In-memory workspace file index, kept current by inotify (or polling) in the background.
+"""
+
+from __future__ import annotations
+
+import errno
+import hashlib
+import logging
+import os
+import re
+import stat
+import struct
+import sys
+import time
+from bisect import bisect_left, bisect_right, insort
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Callable, Iterable
+
+import anyio
+
+from .paging import decode_cursor, encode_cursor
+
+IGNORED_NAMES = {".git", ".venv", "__pycache__"}
+
+_WILDCARD = re.compile(r"[*?\[]")
+# Above this many changes in one batch, re-sort the path array instead of inserting.
+_BULK_CHANGES = 1024
+
+logger = logging.getLogger(__name__)
+
+
+class FileEntry:
+    """One indexed file; ``digest`` is the cached sha256 for its (size, mtime_ns)."""
+
+    __slots__ = ("path", "size", "mtime_ns", "digest")
+
+    def __init__(self, path: str, size: int, mtime_ns: int, digest: str | None = None):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.digest = digest
+
+
+# inotify(7) constants.
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_DONT_FOLLOW = 0x02000000
+_IN_EXCL_UNLINK = 0x04000000
+_IN_ISDIR = 0x40000000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+    | _IN_ONLYDIR | _IN_DONT_FOLLOW | _IN_EXCL_UNLINK
+)
+_EVENT = struct.Struct("iIII")
+
+
+class WatchLimitReached(OSError):
+    """``fs.inotify.max_user_watches`` is exhausted; the index falls back to polling."""
+
+
+class _Inotify:
+    """Minimal ctypes binding: one non-blocking inotify descriptor."""
+
+    def __init__(self, libc, fd: int, get_errno: Callable[[], int]):
+        self._libc = libc
+        self._get_errno = get_errno
+        self.fd = fd
+
+    @classmethod
+    def open(cls) -> "_Inotify | None":
+        if not sys.platform.startswith("linux"):
+            return None
+        import ctypes
+        import ctypes.util
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        except (OSError, AttributeError):
+            return None
+        # IN_NONBLOCK is O_NONBLOCK, which only exists on POSIX: read it after the platform check.
+        fd = libc.inotify_init1(os.O_NONBLOCK | _IN_CLOEXEC)
+        return cls(libc, fd, ctypes.get_errno) if fd >= 0 else None
+
+    def add(self, path: str) -> int:
+        """Watch directory ``path``; returns the watch descriptor, or -1 if it is gone."""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0 and self._get_errno() == errno.ENOSPC:
+            raise WatchLimitReached(errno.ENOSPC, "inotify watch limit reached", path)
+        return wd
+
+    def remove(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self) -> list[tuple[int, int, str]]:
+        """Drain pending events as ``(wd, mask, name)``."""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                events.append((wd, mask, name))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _depth(path: str) -> int:
+    return path.count("/")
+
+
+def _extension(path: str) -> str:
+    return os.path.splitext(path)[1].lower()
+
+
+def _file_digest(path: str) -> str:
+    with open(path, "rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
+
+class WorkspaceIndex:
+    """
+    Files under ``root`` (symlinks and ``IGNORED_NAMES`` skipped), by relative POSIX path.
+
+    Entries live in a dict plus a sorted path array, so queries page from memory with
+    bisection. ``watch`` runs the initial ``os.scandir`` walk in a worker thread and then
+    applies inotify events (Linux) or periodic rescans (``poll_interval``). Without a
+    running watcher, queries rescan when the last walk is older than ``poll_interval``.
+    Content hashes are computed on request and cached until a file's size or mtime changes.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        mode: str = "auto",
+        poll_interval: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.root = str(root)
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._entries: dict[str, FileEntry] = {}
+        self._paths: list[str] = []
+        self._scanned_at: float | None = None
+        self._scanning: anyio.Event | None = None
+        self._inotify: _Inotify | None = None
+        self._watch_dirs: dict[int, str] = {}
+        self.watching: str | None = None
+        self.scans = 0
+        self.events = 0
+
+    @classmethod
+    def from_env(cls, root: Path) -> "WorkspaceIndex":
+        return cls(
+            root,
+            mode=os.getenv("MVP_WORKSPACE_WATCH", "auto").lower(),
+            poll_interval=float(os.getenv("MVP_WORKSPACE_POLL_INTERVAL", "2.0")),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _absolute(self, path: str) -> str:
+        return os.path.join(self.root, path) if path else self.root
+
+    def _walk(self, top: str = "") -> tuple[list[FileEntry], dict[int, str]]:
+        """Scan the subtree at relative path ``top``; runs in a worker thread."""
+        files: list[FileEntry] = []
+        watches: dict[int, str] = {}
+        pending = [top]
+        while pending:
+            directory = pending.pop()
+            absolute = self._absolute(directory)
+            if self._inotify is not None:
+                # Watch before listing, so nothing created meanwhile is missed.
+                if (wd := self._inotify.add(absolute)) >= 0:
+                    watches[wd] = directory
+            try:
+                scanner = os.scandir(absolute)
+            except OSError:
+                continue
+            with scanner:
+                for entry in scanner:
+                    if entry.name in IGNORED_NAMES:
+                        continue
+                    path = f"{directory}/{entry.name}" if directory else entry.name
+                    try:
+                        if entry.is_symlink():
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(path)
+                        elif entry.is_file(follow_symlinks=False):
+                            info = entry.stat(follow_symlinks=False)
+                            files.append(FileEntry(path, info.st_size, info.st_mtime_ns))
+                    except OSError:
+                        continue
+        return files, watches
+
+    def _replace(self, files: list[FileEntry]) -> None:
+        previous = self._entries
+        entries: dict[str, FileEntry] = {}
+        for entry in files:
+            old = previous.get(entry.path)
+            if old is not None and old.size == entry.size and old.mtime_ns == entry.mtime_ns:
+                entry.digest = old.digest
+            entries[entry.path] = entry
+        self._entries = entries
+        self._paths = sorted(entries)
+        self._scanned_at = self._clock()
+        self.scans += 1
+
+    def _apply(self, upserts: Iterable[FileEntry], removals: Iterable[str]) -> None:
+        upserts = list(upserts)
+        removals = [path for path in removals if path in self._entries]
+        bulk = len(upserts) + len(removals) > _BULK_CHANGES
+        for path in removals:
+            del self._entries[path]
+            if not bulk:
+                del self._paths[bisect_left(self._paths, path)]
+        for entry in upserts:
+            old = self._entries.get(entry.path)
+            if old is None:
+                if not bulk:
+                    insort(self._paths, entry.path)
+            elif old.size == entry.size and old.mtime_ns == entry.mtime_ns:
+                entry.digest = old.digest
+            self._entries[entry.path] = entry
+        if bulk:
+            self._paths = sorted(self._entries)
+
+    def _subtree(self, directory: str) -> list[str]:
+        start = bisect_left(self._paths, directory + "/")
+        end = bisect_left(self._paths, directory + "0")  # "0" sorts right after "/"
+        return self._paths[start:end]
+
+    async def _rescan(self) -> None:
+        if self._scanning is not None:
+            await self._scanning.wait()
+            return
+        self._scanning = anyio.Event()
+        try:
+            files, _ = await anyio.to_thread.run_sync(self._walk)
+            self._replace(files)
+        finally:
+            self._scanning.set()
+            self._scanning = None
+
+    async def ready(self) -> None:
+        """Ensure the index reflects the workspace (within ``poll_interval`` if unwatched)."""
+        if self._scanned_at is None or (
+            self.watching is None and self._clock() - self._scanned_at > self.poll_interval
+        ):
+            await self._rescan()
+
+    async def watch(self) -> None:
+        """Background task: initial walk, then keep the index current until cancelled."""
+        if self.watching is not None or self.mode == "off":
+            return
+        if self.mode in ("auto", "inotify") and (inotify := _Inotify.open()) is not None:
+            try:
+                await self._watch_inotify(inotify)
+            except OSError as exc:  # watch limit reached, descriptor errors, ...
+                logger.warning(
+                    "Workspace index: %s; polling every %.1fs instead.", exc, self.poll_interval
+                )
+            finally:
+                self._inotify = None
+                self._watch_dirs = {}
+                self.watching = None
+                inotify.close()
+        try:
+            self.watching = "poll"
+            await self._rescan()
+            while True:
+                await anyio.sleep(self.poll_interval)
+                await self._rescan()
+        finally:
+            self.watching = None
+
+    async def _watch_inotify(self, inotify: _Inotify) -> None:
+        self._inotify = inotify
+        files, self._watch_dirs = await anyio.to_thread.run_sync(self._walk)
+        self._replace(files)
+        self.watching = "inotify"
+        while True:
+            await anyio.wait_readable(inotify.fd)
+            await self._handle(inotify.read())
+
+    async def _handle(self, events: list[tuple[int, int, str]]) -> None:
+        self.events += len(events)
+        changed: dict[str, None] = {}
+        new_dirs: list[str] = []
+        for wd, mask, name in events:
+            if mask & _IN_Q_OVERFLOW:
+                files, watches = await anyio.to_thread.run_sync(self._walk)
+                self._watch_dirs.update(watches)
+                self._replace(files)
+                return
+            if mask & _IN_IGNORED:
+                self._watch_dirs.pop(wd, None)
+                continue
+            directory = self._watch_dirs.get(wd)
+            if directory is None or not name or name in IGNORED_NAMES:
+                continue
+            path = f"{directory}/{name}" if directory else name
+            if not mask & _IN_ISDIR:
+                changed[path] = None
+            elif mask & (_IN_CREATE | _IN_MOVED_TO):
+                new_dirs.append(path)
+            elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+                self._drop_directory(path)
+
+        upserts: list[FileEntry] = []
+        removals: list[str] = []
+        for path in changed:
+            try:
+                info = os.lstat(self._absolute(path))
+            except OSError:
+                removals.append(path)
+                continue
+            if stat.S_ISREG(info.st_mode):
+                upserts.append(FileEntry(path, info.st_size, info.st_mtime_ns))
+            else:
+                removals.append(path)
+        for directory in new_dirs:
+            files, watches = await anyio.to_thread.run_sync(self._walk, directory)
+            self._watch_dirs.update(watches)
+            upserts.extend(files)
+        self._apply(upserts, removals)
+
+    def _drop_directory(self, directory: str) -> None:
+        prefix = directory + "/"
+        for wd, watched in list(self._watch_dirs.items()):
+            if watched == directory or watched.startswith(prefix):
+                del self._watch_dirs[wd]
+                if self._inotify is not None:
+                    self._inotify.remove(wd)
+        self._apply((), self._subtree(directory))
+
+    def select(
+        self,
+        *,
+        after: str | None = None,
+        max_depth: int | None = None,
+        glob: str | None = None,
+        extensions: Iterable[str] | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[FileEntry], bool]:
+        """
+        Up to ``limit`` files after path ``after``, in path order, matching every filter;
+        the flag tells whether more matches remain.
+
+        ``glob`` matches the relative path when it contains ``/`` (``*`` crosses
+        directories) and the file name otherwise.
+        """
+        paths = self._paths
+        start = bisect_right(paths, after) if after is not None else 0
+        prefix = ""
+        match_path = glob is not None and "/" in glob
+        if match_path:
+            wildcard = _WILDCARD.search(glob)
+            prefix = glob[: wildcard.start()] if wildcard else glob
+            start = max(start, bisect_left(paths, prefix))
+        wanted = {
+            ext.lower() if ext.startswith(".") else f".{ext.lower()}" for ext in extensions or ()
+        }
+
+        page: list[FileEntry] = []
+        for index in range(start, len(paths)):
+            path = paths[index]
+            if prefix and not path.startswith(prefix):
+                break
+            if max_depth is not None and _depth(path) > max_depth:
+                continue
+            if wanted and _extension(path) not in wanted:
+                continue
+            if glob is not None:
+                subject = path if match_path else path.rpartition("/")[2]
+                if not fnmatchcase(subject, glob):
+                    continue
+            if limit is not None and len(page) == limit:
+                return page, True
+            page.append(self._entries[path])
+        return page, False
+
+    def query(
+        self, *, cursor: str | None = None, limit: int | None = None, **filters
+    ) -> tuple[list[FileEntry], str | None]:
+        """One page of ``select`` behind an opaque cursor; raises ``ValueError`` on a bad cursor."""
+        page, more = self.select(after=decode_cursor(cursor), limit=limit, **filters)
+        return page, encode_cursor(page[-1].path) if more else None
+
+    def digests(self, entries: list[FileEntry]) -> dict[str, str | None]:
+        """sha256 of each entry's content, reusing cached digests; runs in a worker thread."""
+        result: dict[str, str | None] = {}
+        for entry in entries:
+            absolute = self._absolute(entry.path)
+            try:
+                info = os.stat(absolute)
+                stale = (info.st_size, info.st_mtime_ns) != (entry.size, entry.mtime_ns)
+                if entry.digest is None or stale:
+                    entry.size, entry.mtime_ns = info.st_size, info.st_mtime_ns
+                    entry.digest = _file_digest(absolute)
+            except OSError:
+                result[entry.path] = None
+                continue
+            result[entry.path] = entry.digest
+        return result
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "files": len(self._entries),
+            "watching": self.watching,
+            "scans": self.scans,
+            "events": self.events,
+        }
+
+
+_indexes: dict[str, WorkspaceIndex] = {}
+
+
+def get_workspace_index(root: Path) -> WorkspaceIndex:
+    """Return the index of ``root``, creating it on first use."""
+    key = str(root.resolve())
+    index = _indexes.get(key)
+    if index is None:
+        index = _indexes[key] = WorkspaceIndex.from_env(Path(key))
+    return index
+
+
+async def watch_workspaces(interval: float = 1.0) -> None:
+    """Background task: run the watcher of every workspace index, including later ones."""
+    started: set[str] = set()
+    async with anyio.create_task_group() as tg:
+        while True:
+            for root, index in list(_indexes.items()):
+                if root not in started:
+                    started.add(root)
+                    tg.start_soon(index.watch)
+            await anyio.sleep(interval)
+
+
+def workspace_stats() -> dict[str, object]:
+    """Counters of the registered workspace indexes, by root."""
+    return {root: index.stats() for root, index in _indexes.items()}
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import pytest
+from starlette.testclient import TestClient
+
+from mvp.contracts import SessionContract
+from mvp.server import _http_app, build_server
+from mvp.sessions import SESSION_HEADER, Session, SessionStore, set_session_store
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _contract() -> SessionContract:
+    return SessionContract.create(
+        host_profile="h", runtime_profile="none", capabilities=["DATA_ONLY"]
+    )
+
+
+def test_session_store_ttl_and_lru_eviction():
+    clock = _Clock()
+    store = SessionStore(ttl=10.0, max_sessions=2, clock=clock)
+    store.put(Session("a", _contract()), make_default=True)
+    store.put(Session("b", _contract()))
+    assert store.get() is store.get("a")
+
+    clock.now = 5.0
+    assert store.get("a") is not None  # touch "a" so "b" becomes least recently used
+    store.put(Session("c", _contract()))
+    assert store.get("b") is None
+    assert {s.session_id for s in store} == {"a", "c"}
+
+    clock.now = 100.0
+    assert store.get("a") is None
+    assert store.get() is None
+    assert {s.session_id for s in store.drain_evicted()} == {"a", "b"}
+
+
+@pytest.fixture()
+def client():
+    set_session_store(SessionStore())
+    with TestClient(_http_app(build_server())) as test_client:
+        yield test_client
+    set_session_store(SessionStore())
+
+
+def test_http_sessions_are_isolated_by_header(client):
+    alice = client.post(
+        "/contract/create",
+        headers={SESSION_HEADER: "alice"},
+        json={"host_profile": "h", "runtime_profile": "none", "tool_allowlist": ["echo"]},
+    ).json()
+    assert alice["result"]["session_id"] == "alice"
+    bob = client.post(
+        "/contract/create",
+        headers={SESSION_HEADER: "bob"},
+        json={
+            "host_profile": "h",
+            "runtime_profile": "none",
+            "tool_allowlist": ["workspace.list_files"],
+        },
+    ).json()
+    assert bob["ok"] is True
+
+    allowed = client.post(
+        "/call",
+        headers={SESSION_HEADER: "bob"},
+        json={"name": "workspace.list_files", "params": {"max_depth": 0}},
+    ).json()
+    assert allowed["ok"] is True
+    denied = client.post(
+        "/call",
+        headers={SESSION_HEADER: "alice"},
+        json={"name": "workspace.list_files", "params": {}},
+    ).json()
+    assert denied["error"]["code"] == "tool_not_allowed"
+
+    # Headerless calls only see the default session, which neither client created.
+    anonymous = client.post("/call", json={"name": "workspace.list_files", "params": {}}).json()
+    assert anonymous["error"]["code"] == "contract_required"
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import pytest
+
+from mvp import tools
+from mvp.contracts import SessionContract
+
+
+def test_compiled_gate_precomputes_verdicts():
+    contract = SessionContract.create(
+        host_profile="h",
+        runtime_profile="none",
+        capabilities=[],
+        tool_allowlist=["runtime.probe", "workspace.list_files"],
+    )
+    gate = tools._compile_gate(
+        contract, ["echo", "runtime.probe", "scene.list_objects", "workspace.list_files"]
+    )
+
+    assert gate["echo"] is None
+    assert gate["workspace.list_files"] is None
+    assert gate["runtime.probe"].structuredContent["error"]["code"] == "capability_required"
+    assert gate["scene.list_objects"].structuredContent["error"]["code"] == "tool_not_allowed"
+    with pytest.raises(TypeError):
+        gate["echo"] = gate["runtime.probe"]  # type: ignore[index]
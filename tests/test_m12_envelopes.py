@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from mcp import types
+
+from mvp.envelope import dumps, success_result
+from mvp.server import build_server
+from mvp.sessions import SessionStore, set_session_store
+
+
+def test_dumps_matches_stdlib_and_falls_back():
+    objects = [{"name": "Cube", "loc": [0.5, 1, -2]}]
+    payload = {"ok": True, "result": {"objects": objects, "é": None}}
+    assert json.loads(dumps(payload)) == payload
+    assert json.loads(dumps({1: "int key"})) == {"1": "int key"}
+
+
+def test_success_result_text_is_indented_unless_compact():
+    result = success_result({"files": ["a.txt"]})
+    assert result.content[0].text == json.dumps(result.structuredContent, indent=2)
+    compact = success_result({"files": ["a.txt"]}, compact=True)
+    assert compact.content[0].text == '{"ok":true,"result":{"files":["a.txt"]}}'
+    assert success_result("x", include_text=False).content == []
+
+
+@pytest.mark.anyio
+async def test_structured_only_contract_omits_text_block():
+    set_session_store(SessionStore())
+    server = build_server()
+    handler = server._mcp_server.request_handlers[types.CallToolRequest]
+
+    async def call(name: str, arguments: dict) -> types.CallToolResult:
+        params = types.CallToolRequestParams(name=name, arguments=arguments)
+        request = types.CallToolRequest(params=params)
+        return (await handler(request)).root
+
+    created = await call(
+        "contract.create",
+        {"host_profile": "h", "runtime_profile": "none", "structured_only": True},
+    )
+    assert created.structuredContent["result"]["structured_only"] is True
+    echoed = await call("echo", {"text": "ping"})
+    assert echoed.content == []
+    assert echoed.structuredContent == {"ok": True, "result": "ping"}
+
+    await call(
+        "contract.create", {"host_profile": "h", "runtime_profile": "none", "compact_text": True}
+    )
+    assert (await call("echo", {"text": "ping"})).content[0].text == '{"ok":true,"result":"ping"}'
+    catalog = await call("system.tools_catalog", {})
+    assert "\n" not in catalog.content[0].text
+    assert json.loads(catalog.content[0].text) == catalog.structuredContent
+    set_session_store(SessionStore())
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mvp.runtime import (
+    AsyncExternalHttpRuntimeAdapter,
+    InMemoryRuntimeAdapter,
+    RuntimeUnavailableError,
+)
+from mvp.scene_cache import SceneSnapshotCache
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _ETagRuntimeHandler(BaseHTTPRequestHandler):
+    objects = [{"name": "Cube"}, {"name": "Camera"}]
+    etag = '"v1"'
+    full_responses = 0
+    not_modified = 0
+
+    def log_message(self, *_):
+        pass
+
+    def do_GET(self):
+        if self.path != "/scene/objects":
+            self.send_error(404)
+            return
+        cls = type(self)
+        if self.headers.get("If-None-Match") == cls.etag:
+            cls.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", cls.etag)
+            self.end_headers()
+            return
+        cls.full_responses += 1
+        body = json.dumps({"ok": True, "result": {"objects": cls.objects}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", cls.etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.anyio
+async def test_cache_revalidates_with_etag():
+    port = _free_port()
+    server = ThreadingHTTPServer(("127.0.0.1", port), _ETagRuntimeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    adapter = AsyncExternalHttpRuntimeAdapter(f"http://127.0.0.1:{port}")
+    cache = SceneSnapshotCache(max_age=0.0)
+
+    first = await cache.get(adapter)
+    assert [obj["name"] for obj in first.objects] == ["Camera", "Cube"]
+    second = await cache.get(adapter)
+    assert second.fingerprint == first.fingerprint
+    assert second.objects is first.objects
+    assert (_ETagRuntimeHandler.full_responses, _ETagRuntimeHandler.not_modified) == (1, 1)
+
+    _ETagRuntimeHandler.objects = [{"name": "Cube"}]
+    _ETagRuntimeHandler.etag = '"v2"'
+    third = await cache.get(adapter)
+    assert third.fingerprint != first.fingerprint
+    assert cache.stats() == {"hits": 1, "misses": 2, "revalidations": 2, "stale_served": 0}
+
+    await adapter.aclose()
+    server.shutdown()
+
+
+class _FlakyRuntime(InMemoryRuntimeAdapter):
+    available = True
+
+    def list_scene_objects(self) -> list[dict]:
+        if not self.available:
+            raise RuntimeUnavailableError("down")
+        return super().list_scene_objects()
+
+
+@pytest.mark.anyio
+async def test_cache_staleness_bounds():
+    clock = _Clock()
+    adapter = _FlakyRuntime()
+    cache = SceneSnapshotCache(max_age=1.0, max_stale=5.0, clock=clock)
+    snapshot = await cache.get(adapter)
+
+    adapter.available = False
+    clock.now = 0.5
+    assert await cache.get(adapter) is snapshot
+    clock.now = 3.0
+    assert (await cache.get(adapter)).fingerprint == snapshot.fingerprint
+    assert cache.stale_served == 1
+    clock.now = 10.0
+    with pytest.raises(RuntimeUnavailableError):
+        await cache.get(adapter)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import pytest
+from mcp import types
+
+from mvp.runtime import InMemoryRuntimeAdapter, NullRuntimeAdapter, set_runtime
+from mvp.scene_cache import build_snapshot, diff_snapshots, get_scene_cache
+from mvp.server import build_server
+from mvp.sessions import SessionStore, set_session_store
+
+
+@pytest.mark.anyio
+async def test_scene_diff_returns_changes_since_fingerprint():
+    adapter = InMemoryRuntimeAdapter()
+    get_scene_cache(adapter).max_age = 0.0
+    set_runtime(adapter)
+    set_session_store(SessionStore())
+    server = build_server()
+    handler = server._mcp_server.request_handlers[types.CallToolRequest]
+
+    async def call(name: str, arguments: dict) -> dict:
+        params = types.CallToolRequestParams(name=name, arguments=arguments)
+        request = types.CallToolRequest(params=params)
+        return (await handler(request)).root.structuredContent
+
+    await call(
+        "contract.create",
+        {"host_profile": "h", "runtime_profile": "inmemory", "capabilities": ["DATA_ONLY"]},
+    )
+    base = (await call("scene.list_objects", {}))["result"]["fingerprint"]
+
+    unchanged = (await call("scene.diff", {"since": base}))["result"]
+    assert unchanged["to"] == base
+    assert unchanged["added"] == unchanged["removed"] == unchanged["modified"] == []
+
+    adapter._objects = [
+        {
+            "id": "obj-cube",
+            "name": "Cube",
+            "type": "MESH",
+            "transform": {"location": [1.0, 0.0, 0.0]},
+        },
+        {"id": "obj-light", "name": "Light", "type": "LIGHT"},
+    ]
+    delta = (await call("scene.diff", {"since": base}))["result"]
+    assert delta["reset"] is False
+    assert [obj["name"] for obj in delta["added"]] == ["Light"]
+    assert delta["removed"] == ["Camera"]
+    assert [obj["name"] for obj in delta["modified"]] == ["Cube"]
+
+    reset = (await call("scene.diff", {"since": "unknown"}))["result"]
+    assert reset["reset"] is True
+    assert len(reset["added"]) == 2
+    assert reset.keys() == delta.keys()
+    assert reset["duplicates"] == [] and reset["data_changed"] == []
+
+    set_runtime(NullRuntimeAdapter())
+    set_session_store(SessionStore())
+
+
+def test_diff_keeps_duplicate_names_apart_and_reads_data_fingerprints():
+    old = build_snapshot(
+        [
+            {"name": "Cube", "type": "MESH", "data_fingerprint": "m1"},
+            {"name": "Dup", "type": "MESH", "transform": {"location": [0, 0, 0]}},
+            {"name": "Dup", "type": "MESH", "transform": {"location": [5, 0, 0]}},
+        ]
+    )
+    new = build_snapshot(
+        [
+            {"name": "Cube", "type": "MESH", "data_fingerprint": "m2"},
+            {"name": "Dup", "type": "MESH", "transform": {"location": [0, 0, 0]}},
+        ]
+    )
+    delta = diff_snapshots(old, new).as_dict()
+    assert [obj["name"] for obj in delta["modified"]] == ["Cube"]
+    assert delta["data_changed"] == ["Cube"]
+    assert delta["removed"] == ["Dup"] and delta["added"] == []
+    assert delta["duplicates"] == []
+    assert diff_snapshots(new, old).as_dict()["duplicates"] == ["Dup"]
+    assert [obj["transform"] for obj in diff_snapshots(new, old).added] == [{"location": [5, 0, 0]}]
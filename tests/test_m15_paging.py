@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import json
+import random
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from mcp import types
+
+from mvp.jsonstream import ArrayNotFound, ArrayTruncated, iter_array_items
+from mvp.paging import decode_cursor, encode_cursor
+from mvp.runtime import (
+    AsyncExternalHttpRuntimeAdapter,
+    NullRuntimeAdapter,
+    page_objects,
+    set_runtime,
+)
+from mvp.server import build_server
+from mvp.sessions import SessionStore, set_session_store
+
+SCENE = [{"name": f"Obj{i:04d}", "type": "MESH" if i % 3 else "LIGHT"} for i in range(500)]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_cursor_roundtrip_and_rejects_garbage():
+    assert decode_cursor(encode_cursor("Cube.001")) == "Cube.001"
+    assert decode_cursor(None) is None
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_pages_follow_name_order_with_filters():
+    shuffled = random.Random(7).sample(SCENE, len(SCENE))
+    names: list[str] = []
+    cursor = None
+    while True:
+        page, cursor = page_objects(shuffled, limit=64, cursor=cursor, type="light")
+        names.extend(obj["name"] for obj in page)
+        if cursor is None:
+            break
+    assert names == [obj["name"] for obj in SCENE if obj["type"] == "LIGHT"]
+
+    prefixed, cursor = page_objects(shuffled, limit=5, name_prefix="Obj01")
+    assert [obj["name"] for obj in prefixed] == [f"Obj01{i:02d}" for i in range(5)]
+    assert cursor is not None
+
+
+@pytest.mark.anyio
+async def test_stream_parser_handles_arbitrary_chunking():
+    objects = [{"name": "Cubé", "tags": ["a]", "{"]}] * 3
+    body = json.dumps({"ok": True, "result": {"objects": objects}}).encode()
+
+    async def chunks():
+        for i in range(0, len(body), 7):
+            yield body[i : i + 7]
+
+    items = [item async for item in iter_array_items(chunks())]
+    assert items == [{"name": "Cubé", "tags": ["a]", "{"]}] * 3
+
+
+async def _items(body: bytes, size: int = 3) -> list:
+    async def chunks():
+        for i in range(0, len(body), size):
+            yield body[i : i + size]
+
+    return [item async for item in iter_array_items(chunks())]
+
+
+@pytest.mark.anyio
+async def test_stream_parser_anchors_the_array_and_detects_truncation():
+    nested = {"ok": True, "count": 12345, "meta": {"objects": [9]}, "result": {"objects": [1, 22]}}
+    assert await _items(json.dumps(nested).encode()) == [1, 22]
+    decoy = {"note": '"result": [', "error": {"result": [7]}, "objects": [8]}
+    assert await _items(json.dumps(decoy).encode()) == [8]
+
+    with pytest.raises(ArrayNotFound) as info:
+        await _items(b'{"result": {"items": []}}')
+    assert info.value.text == '{"result": {"items": []}}'
+    with pytest.raises(ArrayTruncated) as truncated:
+        await _items(b'{"objects": [{"name": "A"}, {"name": "B"}, {"na')
+    assert truncated.value.items == 2
+
+
+class _UnorderedRuntimeHandler(BaseHTTPRequestHandler):
+    def log_message(self, *_):
+        pass
+
+    def do_GET(self):
+        objects = random.Random(3).sample(SCENE, len(SCENE))
+        body = json.dumps({"ok": True, "result": {"objects": objects}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.mark.anyio
+async def test_external_adapter_streams_pages():
+    port = _free_port()
+    server = ThreadingHTTPServer(("127.0.0.1", port), _UnorderedRuntimeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    adapter = AsyncExternalHttpRuntimeAdapter(f"http://127.0.0.1:{port}")
+
+    first, cursor = await adapter.list_scene_objects_page(limit=10)
+    assert [obj["name"] for obj in first] == [f"Obj{i:04d}" for i in range(10)]
+    second, _ = await adapter.list_scene_objects_page(limit=10, cursor=cursor)
+    assert second[0]["name"] == "Obj0010"
+
+    await adapter.aclose()
+    server.shutdown()
+
+
+class _LimitOnlyRuntimeHandler(_UnorderedRuntimeHandler):
+    """Cuts the listing at ``limit`` but ignores ``after``, ``type`` and ``prefix``."""
+
+    queries: list[dict] = []
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        self.queries.append(query)
+        objects = SCENE[: int(query["limit"][0])] if "limit" in query else SCENE
+        body = json.dumps({"ok": True, "result": {"objects": objects}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.mark.anyio
+async def test_external_adapter_pages_core_side_when_the_runtime_only_honours_limit():
+    port = _free_port()
+    server = ThreadingHTTPServer(("127.0.0.1", port), _LimitOnlyRuntimeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    adapter = AsyncExternalHttpRuntimeAdapter(f"http://127.0.0.1:{port}")
+
+    try:
+        first, cursor = await adapter.list_scene_objects_page(limit=100)
+        assert len(_LimitOnlyRuntimeHandler.queries) == 1  # the first page needs no fallback
+        names = [obj["name"] for obj in first]
+        for _ in range(len(SCENE)):
+            if cursor is None:
+                break
+            page, cursor = await adapter.list_scene_objects_page(limit=100, cursor=cursor)
+            names.extend(obj["name"] for obj in page)
+        assert names == [obj["name"] for obj in SCENE]
+        assert "limit" not in _LimitOnlyRuntimeHandler.queries[-1]
+
+        lights, _ = await adapter.list_scene_objects_page(limit=10, type="light")
+        assert [obj["name"] for obj in lights] == [f"Obj{i:04d}" for i in range(0, 30, 3)]
+    finally:
+        await adapter.aclose()
+        server.shutdown()
+
+
+@pytest.mark.anyio
+async def test_cached_and_runtime_pages_have_the_same_keys():
+    port = _free_port()
+    server = ThreadingHTTPServer(("127.0.0.1", port), _UnorderedRuntimeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    adapter = AsyncExternalHttpRuntimeAdapter(f"http://127.0.0.1:{port}")
+    set_runtime(adapter)
+    set_session_store(SessionStore())
+    handler = build_server()._mcp_server.request_handlers[types.CallToolRequest]
+
+    async def call(name: str, arguments: dict) -> dict:
+        params = types.CallToolRequestParams(name=name, arguments=arguments)
+        return (await handler(types.CallToolRequest(params=params))).root.structuredContent
+
+    try:
+        contract = {"host_profile": "h", "runtime_profile": "external"}
+        contract.update(capabilities=["DATA_ONLY"], tool_allowlist=["scene.list_objects"])
+        await call("contract.create", contract)
+        streamed = (await call("scene.list_objects", {"limit": 10}))["result"]
+        await call("scene.list_objects", {})  # warms the snapshot cache
+        cached = (await call("scene.list_objects", {"limit": 10}))["result"]
+        assert streamed.keys() == cached.keys() == {"objects", "next_cursor", "fingerprint"}
+        assert streamed["fingerprint"] is None and cached["fingerprint"]
+        assert streamed["objects"] == cached["objects"]
+    finally:
+        set_runtime(NullRuntimeAdapter())
+        set_session_store(SessionStore())
+        await adapter.aclose()
+        server.shutdown()
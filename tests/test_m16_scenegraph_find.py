@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import pytest
+from mcp import types
+
+from mvp.runtime import InMemoryRuntimeAdapter, NullRuntimeAdapter, set_runtime
+from mvp.scene_cache import build_snapshot, diff_snapshots
+from mvp.scene_index import SceneIndex
+from mvp.server import build_server
+from mvp.sessions import SessionStore, set_session_store
+
+
+def _obj(name: str, location, *, collections=(), materials=(), type="MESH") -> dict:
+    return {
+        "name": name,
+        "type": type,
+        "transform": {"location": list(location)},
+        "collections": list(collections),
+        "materials": list(materials),
+    }
+
+
+SCENE = [
+    _obj("Cube", (0, 0, 0), collections=["Props"], materials=["Red"]),
+    _obj("Cube.001", (3, 0, 0), collections=["Props"], materials=["Blue"]),
+    _obj("Camera", (0, -10, 5), type="CAMERA"),
+    _obj("Lamp", (25, 25, 0), collections=["Lights"], type="LIGHT"),
+]
+
+
+def _names(matches: list[dict]) -> list[str]:
+    return [obj["name"] for obj in matches]
+
+
+def test_find_uses_name_inverted_and_spatial_indices():
+    index = SceneIndex.build(build_snapshot(SCENE), cell_size=5.0)
+
+    assert _names(index.find(name_pattern="Cube*")[0]) == ["Cube", "Cube.001"]
+    assert _names(index.find(name_pattern="C*a")[0]) == ["Camera"]
+    assert _names(index.find(collection="Props", material="Blue")[0]) == ["Cube.001"]
+    assert _names(index.find(type="light")[0]) == ["Lamp"]
+    assert _names(index.find(near=[0, 0, 0], radius=3.5)[0]) == ["Cube", "Cube.001"]
+    assert _names(index.find(bbox=[[-1, -20, -1], [1, 1, 10]])[0]) == ["Camera", "Cube"]
+    matches, truncated = index.find(limit=2)
+    assert _names(matches) == ["Camera", "Cube"] and truncated
+
+
+def test_malformed_collection_entries_are_tolerated():
+    collections = [1, None, {"name": "Props"}]
+    odd = {**_obj("Odd", (0, 0, 0)), "collections": collections, "materials": "Red"}
+    index = SceneIndex.build(build_snapshot([*SCENE, odd]), cell_size=5.0)
+    assert _names(index.find(collection="1")[0]) == ["Odd"]
+    assert _names(index.find(collection="Props")[0]) == ["Cube", "Cube.001", "Odd"]
+    assert _names(index.find(material="Red")[0]) == ["Cube", "Odd"]
+
+
+def test_apply_delta_matches_full_rebuild_and_leaves_base_untouched():
+    old = build_snapshot(SCENE)
+    changed = [obj for obj in SCENE if obj["name"] != "Lamp"]
+    changed[0] = _obj("Cube", (50, 0, 0), collections=["Moved"], materials=["Red"])
+    changed.append(_obj("Cone", (1, 1, 1), collections=["Props"]))
+    new = build_snapshot(changed)
+
+    base = SceneIndex.build(old, cell_size=5.0)
+    incremental = base.apply_delta(diff_snapshots(old, new))
+    rebuilt = SceneIndex.build(new, cell_size=5.0)
+
+    for attribute in (
+        "names",
+        "by_name",
+        "by_collection",
+        "by_material",
+        "by_type",
+        "locations",
+        "grid",
+    ):
+        assert getattr(incremental, attribute) == getattr(rebuilt, attribute)
+    assert _names(base.find(collection="Props")[0]) == ["Cube", "Cube.001"]
+    assert _names(incremental.find(collection="Props")[0]) == ["Cone", "Cube.001"]
+
+
+class _CountingDict(dict):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.scans = 0
+
+    def __iter__(self):
+        self.scans += 1
+        return super().__iter__()
+
+
+def test_spatial_queries_probe_cells_unless_objects_are_fewer():
+    crowd = [_obj(f"Obj{i:04d}", (i % 10 * 0.1, 0, 0)) for i in range(1000)]
+    index = SceneIndex.build(build_snapshot([*crowd, _obj("Far", (500, 500, 500))]), cell_size=5.0)
+    everything = set(index.locations)
+    index.locations = _CountingDict(index.locations)
+
+    # 27 cells to probe but only 2 occupied: probing still beats scanning 1001 objects.
+    assert len(index._in_box((-5, -5, -5), (5, 5, 5))) == 1000
+    assert index.locations.scans == 0
+    assert index._in_box((-5000, -5000, -5000), (5000, 5000, 5000)) == everything
+    assert index.locations.scans == 1
+
+
+@pytest.mark.anyio
+async def test_find_rejects_non_finite_or_negative_geometry_and_orders_bbox():
+    runtime = InMemoryRuntimeAdapter()
+    runtime._objects = list(SCENE)
+    set_runtime(runtime)
+    set_session_store(SessionStore())
+    server = build_server()
+    handler = server._mcp_server.request_handlers[types.CallToolRequest]
+
+    async def call(name: str, arguments: dict) -> dict:
+        params = types.CallToolRequestParams(name=name, arguments=arguments)
+        return (await handler(types.CallToolRequest(params=params))).root.structuredContent
+
+    async def find(**arguments) -> dict:
+        return await call("scenegraph.find", arguments)
+
+    try:
+        contract = {"host_profile": "h", "runtime_profile": "inmemory"}
+        contract.update(capabilities=["DATA_ONLY"], tool_allowlist=["scenegraph.find"])
+        await call("contract.create", contract)
+        for arguments in (
+            {"near": [0, 0, 0], "radius": float("inf")},
+            {"near": [0, float("nan"), 0], "radius": 1},
+            {"near": [0, 0, 0], "radius": -1},
+            {"bbox": [[0, 0, float("-inf")], [1, 1, 1]]},
+            {"bbox": [[0, 0], [1, 1, 1]]},
+        ):
+            assert (await find(**arguments))["error"]["code"] == "invalid_request", arguments
+
+        ordered = await find(bbox=[[-1, -20, -1], [1, 1, 10]])
+        inverted = await find(bbox=[[1, -20, 10], [-1, 1, -1]])
+        assert _names(ordered["result"]["matches"]) == ["Camera", "Cube"]
+        assert inverted["result"]["matches"] == ordered["result"]["matches"]
+    finally:
+        set_runtime(NullRuntimeAdapter())
+        set_session_store(SessionStore())
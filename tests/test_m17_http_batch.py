@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import pytest
+from starlette.testclient import TestClient
+
+from mvp.server import _http_app, build_server
+from mvp.sessions import SessionStore, set_session_store
+
+
+@pytest.fixture()
+def client():
+    set_session_store(SessionStore())
+    with TestClient(_http_app(build_server())) as test_client:
+        yield test_client
+    set_session_store(SessionStore())
+
+
+def test_sequential_batch_stops_on_first_error(client):
+    resp = client.post(
+        "/call/batch",
+        json={
+            "calls": [
+                {"name": "echo", "params": {"text": "a"}},
+                {
+                    "name": "contract.create",
+                    "params": {"host_profile": "h", "runtime_profile": "none"},
+                },
+                {"name": "runtime.probe", "params": {}},
+                {"name": "echo", "params": {"text": "never"}},
+            ]
+        },
+    ).json()
+    items = resp["result"]["items"]
+    assert resp["result"]["stopped_at"] == 2
+    assert [item["ok"] for item in items] == [True, True, False]
+    assert items[2]["error"]["code"] == "capability_required"
+
+
+def test_concurrent_batch_runs_read_only_calls(client):
+    calls = [{"name": "echo", "params": {"text": str(i)}} for i in range(20)]
+    resp = client.post("/call/batch", json={"concurrent": True, "calls": calls}).json()
+    assert [item["result"] for item in resp["result"]["items"]] == [str(i) for i in range(20)]
+
+    rejected = client.post(
+        "/call/batch",
+        json={"concurrent": True, "calls": [{"name": "contract.create", "params": {}}]},
+    )
+    assert rejected.status_code == 400
+    assert rejected.json()["error"]["details"]["tools"] == ["contract.create"]
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import pytest
+from mcp import types
+
+from mvp.errors import MvpErrorCode, err
+from mvp.macros import MacroDefinition, MacroError, render, run_macro
+from mvp.runtime import InMemoryRuntimeAdapter, NullRuntimeAdapter, set_runtime
+from mvp.server import build_server
+from mvp.sessions import SessionStore, set_session_store
+
+
+def test_render_keeps_types_and_interpolates():
+    context = {"inputs": {"name": "Cube", "location": [1, 2, 3]}, "steps": [{"result": {"id": 7}}]}
+    template = {"loc": "{{ location }}", "label": "obj-{{name}}", "id": "{{ steps.0.result.id }}"}
+    assert render(template, context) == {"loc": [1, 2, 3], "label": "obj-Cube", "id": 7}
+
+
+@pytest.mark.anyio
+async def test_failed_step_runs_rollback_and_propagates_error():
+    macro = MacroDefinition.model_validate(
+        {
+            "macro_name": "test.create_then_move",
+            "version": "1.0.0",
+            "inputs": {"name": {"type": "string"}},
+            "steps": [
+                {"tool": "object.create", "args": {"name": "{{ name }}"}},
+                {"tool": "object.move", "args": {"name": "{{ name }}"}},
+            ],
+            "rollback": [
+                {"tool": "object.delete", "args": {"name": "{{ name }}"}, "after_step": 0}
+            ],
+            "determinism": "deterministic",
+        }
+    )
+    calls: list[tuple[str, dict]] = []
+
+    async def call(name: str, args: dict) -> dict:
+        calls.append((name, args))
+        if name == "object.move":
+            return err(MvpErrorCode.tool_not_allowed, "nope")
+        return {"ok": True, "result": {}}
+
+    envelope = await run_macro(macro, {"name": "Cube"}, call)
+    assert envelope["error"]["code"] == "tool_not_allowed"
+    context = envelope["error"]["details"]["context"]
+    assert context["failed_step"] == 1
+    assert context["rollback"] == [{"tool": "object.delete", "ok": True}]
+    assert [name for name, _ in calls] == ["object.create", "object.move", "object.delete"]
+
+
+@pytest.mark.anyio
+async def test_unresolved_template_after_a_step_still_rolls_back():
+    macro = MacroDefinition.model_validate(
+        {
+            "macro_name": "test.create_then_bad_ref",
+            "version": "1.0.0",
+            "inputs": {"name": {"type": "string"}},
+            "steps": [
+                {"tool": "object.create", "args": {"name": "{{ name }}"}},
+                {"tool": "object.move", "args": {"name": "{{ steps.0.result.missing }}"}},
+            ],
+            "postconditions": [{"tool": "scene.list_objects", "expect": {"count": "{{ nope }}"}}],
+            "rollback": [
+                {"tool": "object.delete", "args": {"name": "{{ name }}"}, "after_step": 0}
+            ],
+            "determinism": "deterministic",
+        }
+    )
+    calls: list[str] = []
+
+    async def call(name: str, args: dict) -> dict:
+        calls.append(name)
+        return {"ok": True, "result": {}}
+
+    envelope = await run_macro(macro, {"name": "Cube"}, call)
+    assert envelope["error"]["code"] == "invalid_request"
+    assert envelope["error"]["details"]["context"]["failed_step"] == 1
+    assert calls == ["object.create", "object.delete"]
+
+    macro.steps.pop()
+    calls.clear()
+    envelope = await run_macro(macro, {"name": "Cube"}, call)
+    assert envelope["error"]["code"] == "invalid_request"
+    rollback = envelope["error"]["details"]["context"]["rollback"]
+    assert rollback == [{"tool": "object.delete", "ok": True}]
+    assert calls == ["object.create", "object.delete"]
+
+
+@pytest.mark.anyio
+async def test_macro_run_executes_steps_through_gating():
+    set_runtime(InMemoryRuntimeAdapter())
+    set_session_store(SessionStore())
+    server = build_server()
+    handler = server._mcp_server.request_handlers[types.CallToolRequest]
+
+    async def call(name: str, arguments: dict) -> dict:
+        params = types.CallToolRequestParams(name=name, arguments=arguments)
+        request = types.CallToolRequest(params=params)
+        return (await handler(request)).root.structuredContent
+
+    await call(
+        "contract.create",
+        {
+            "host_profile": "h",
+            "runtime_profile": "inmemory",
+            "capabilities": ["DATA_ONLY"],
+            "tool_allowlist": ["macro.run", "scene.list_objects", "scenegraph.find"],
+        },
+    )
+    inputs = {"name_pattern": "C*"}
+    ran = await call("macro.run", {"name": "demo.snapshot_and_find", "inputs": inputs})
+    assert ran["ok"] is True
+    matches = ran["result"]["steps"][-1]["result"]["matches"]
+    assert [obj["name"] for obj in matches] == ["Camera", "Cube"]
+
+    inputs = {"name": "C", "location": [0, 0, 0]}
+    missing = await call("macro.run", {"name": "demo.move_cube_abs", "inputs": inputs})
+    assert missing["error"]["code"] == "invalid_request"
+
+    await call(
+        "contract.create",
+        {
+            "host_profile": "h",
+            "runtime_profile": "inmemory",
+            "tool_allowlist": ["macro.run", "scene.list_objects", "scenegraph.find"],
+        },
+    )
+    refused = await call("macro.run", {"name": "demo.snapshot_and_find", "inputs": {}})
+    assert refused["error"]["code"] == "invalid_request"
+    assert "scene.list_objects" in refused["error"]["message"]
+
+    set_runtime(NullRuntimeAdapter())
+    set_session_store(SessionStore())
+
+
+@pytest.mark.anyio
+async def test_missing_capability_is_refused_before_any_step():
+    macro = MacroDefinition.model_validate(
+        {
+            "macro_name": "test.needs_data",
+            "version": "1.0.0",
+            "preconditions": {"capabilities": ["DATA_ONLY"]},
+            "steps": [{"tool": "object.create", "args": {"name": "Cube"}}],
+            "determinism": "deterministic",
+        }
+    )
+    calls: list[str] = []
+
+    async def call(name: str, args: dict) -> dict:
+        calls.append(name)
+        return {"ok": True, "result": {}}
+
+    with pytest.raises(MacroError, match="DATA_ONLY"):
+        await run_macro(macro, {}, call, capabilities=[])
+    assert calls == []
+    assert (await run_macro(macro, {}, call, capabilities=["DATA_ONLY"]))["ok"] is True
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from mcp import types
+
+from mvp.contracts import negotiate_limits
+from mvp.runtime import AsyncExternalHttpRuntimeAdapter, NullRuntimeAdapter, set_runtime
+from mvp.server import build_server
+from mvp.sessions import SessionStore, set_session_store
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _StuckRuntimeHandler(BaseHTTPRequestHandler):
+    def log_message(self, *_):
+        pass
+
+    def do_GET(self):
+        time.sleep(2.0)
+        self.send_error(503)
+
+
+@pytest.mark.anyio
+async def test_contract_deadline_cancels_stuck_runtime_call():
+    port = _free_port()
+    runtime_server = ThreadingHTTPServer(("127.0.0.1", port), _StuckRuntimeHandler)
+    threading.Thread(target=runtime_server.serve_forever, daemon=True).start()
+    adapter = AsyncExternalHttpRuntimeAdapter(f"http://127.0.0.1:{port}", timeout=10.0)
+    set_runtime(adapter)
+    set_session_store(SessionStore())
+    server = build_server()
+    handler = server._mcp_server.request_handlers[types.CallToolRequest]
+
+    async def call(name: str, arguments: dict) -> dict:
+        params = types.CallToolRequestParams(name=name, arguments=arguments)
+        request = types.CallToolRequest(params=params)
+        return (await handler(request)).root.structuredContent
+
+    created = await call(
+        "contract.create",
+        {
+            "host_profile": "h",
+            "runtime_profile": "external",
+            "capabilities": ["DATA_ONLY"],
+            "limits": {"tool_timeout_s": 5, "tool_timeouts": {"runtime.probe": 0.2}},
+        },
+    )
+    assert created["result"]["limits"]["tool_timeouts"] == {"runtime.probe": 0.2}
+
+    started = time.perf_counter()
+    timed_out = await call("runtime.probe", {})
+    assert time.perf_counter() - started < 1.5
+    assert timed_out["error"]["code"] == "timeout"
+    assert timed_out["error"]["retryable"] is True
+    details = {"tool": "runtime.probe", "timeout_s": 0.2, "cancelled": True}
+    assert timed_out["error"]["details"] == details
+
+    rejected = await call(
+        "contract.create",
+        {"host_profile": "h", "runtime_profile": "x", "limits": {"tool_timeout_s": 0}},
+    )
+    assert rejected["error"]["code"] == "invalid_request"
+
+    await adapter.aclose()
+    runtime_server.shutdown()
+    set_runtime(NullRuntimeAdapter())
+    set_session_store(SessionStore())
+
+
+def test_client_limits_only_tighten_the_host_profile():
+    host = {
+        "tool_timeout_s": 10,
+        "tool_timeouts": {"render": 60, "runtime.probe": 2},
+        "max_concurrent_calls": 4,
+    }
+    client = {
+        "tool_timeout_s": 30,
+        "tool_timeouts": {"render": 120, "scene.list_objects": 20},
+        "max_concurrent_calls": 2,
+    }
+    limits = negotiate_limits(host, client)
+    assert limits["tool_timeout_s"] == 10
+    assert limits["max_concurrent_calls"] == 2
+    assert limits["tool_timeouts"] == {"render": 60, "runtime.probe": 2, "scene.list_objects": 10}
+    tightened = negotiate_limits(host, {"tool_timeout_s": 1})
+    assert tightened["tool_timeouts"] == {"render": 1, "runtime.probe": 1}
+    assert negotiate_limits(None, {"max_concurrent_calls": 3})["max_concurrent_calls"] == 3
+    with pytest.raises(ValueError):
+        negotiate_limits(host, {"tool_timeouts": {"render": -1}})
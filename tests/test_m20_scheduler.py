@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import anyio
+import pytest
+from mcp import types
+
+from mvp.runtime import InMemoryRuntimeAdapter, NullRuntimeAdapter, set_runtime
+from mvp.scheduler import RuntimeScheduler, SchedulerBusy, set_scheduler
+from mvp.server import build_server
+from mvp.sessions import SessionStore, set_session_store
+
+
+@pytest.mark.anyio
+async def test_round_robin_across_sessions_and_bounded_queue():
+    scheduler = RuntimeScheduler(max_concurrent=1, per_session=1, max_queue=4, max_session_queue=3)
+    order: list[str] = []
+    release = anyio.Event()
+
+    async def call(session_id: str, tag: str) -> None:
+        async with scheduler.slot(session_id):
+            order.append(tag)
+            if tag == "hold":
+                await release.wait()
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(call, "a", "hold")
+        await anyio.sleep(0)
+        for tag in ("a1", "a2", "a3"):
+            tg.start_soon(call, "a", tag)
+        tg.start_soon(call, "b", "b1")
+        await anyio.sleep(0.01)
+        assert scheduler.stats()["queued"] == 4
+        with pytest.raises(SchedulerBusy):
+            async with scheduler.slot("c"):
+                pass
+        release.set()
+
+    # Session b is served right after a's first queued call instead of after all of them.
+    assert order == ["hold", "a1", "b1", "a2", "a3"]
+    stats = scheduler.stats()
+    assert stats["rejected"] == 1 and stats["max_queue_depth"] == 4 and stats["active"] == 0
+
+
+@pytest.mark.anyio
+async def test_reads_overlap_but_writes_are_exclusive():
+    scheduler = RuntimeScheduler(max_concurrent=4, per_session=4)
+    running = 0
+    peak = {"read": 0, "write": 0}
+
+    async def call(exclusive: bool) -> None:
+        nonlocal running
+        async with scheduler.slot("s", exclusive=exclusive):
+            running += 1
+            kind = "write" if exclusive else "read"
+            peak[kind] = max(peak[kind], running)
+            await anyio.sleep(0.01)
+            running -= 1
+
+    async with anyio.create_task_group() as tg:
+        for exclusive in (False, False, True, False, True, False):
+            tg.start_soon(call, exclusive)
+
+    assert peak["read"] > 1
+    assert peak["write"] == 1
+
+
+@pytest.mark.anyio
+async def test_runtime_tool_rejected_when_queue_full():
+    scheduler = RuntimeScheduler(max_concurrent=1, max_queue=0)
+    set_scheduler(scheduler)
+    set_session_store(SessionStore())
+    set_runtime(InMemoryRuntimeAdapter())
+    handler = build_server()._mcp_server.request_handlers[types.CallToolRequest]
+
+    async def call(name: str, arguments: dict) -> dict:
+        params = types.CallToolRequestParams(name=name, arguments=arguments)
+        request = types.CallToolRequest(params=params)
+        return (await handler(request)).root.structuredContent
+
+    try:
+        await call(
+            "contract.create",
+            {
+                "host_profile": "h",
+                "runtime_profile": "r",
+                "capabilities": ["DATA_ONLY"],
+                "limits": {"max_concurrent_calls": 1},
+            },
+        )
+        assert (await call("runtime.probe", {}))["ok"] is True
+
+        async with scheduler.slot("someone-else"):
+            busy = await call("scene.list_objects", {})
+        assert busy["error"]["code"] == "runtime_unavailable"
+        assert busy["error"]["retryable"] is True
+        assert busy["error"]["details"]["reason"] == "queue_full"
+
+        health = await call("system.health", {})
+        assert health["result"]["scheduler"]["rejected"] == 1
+    finally:
+        set_scheduler(RuntimeScheduler.from_env())
+        set_runtime(NullRuntimeAdapter())
+        set_session_store(SessionStore())
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from functools import partial
+
+import anyio
+import pytest
+
+from mvp.runtime import RuntimeUnavailableError, call_runtime, runtime_call_stats
+
+
+class _CountingAdapter:
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+
+    async def probe(self) -> dict:
+        self.calls += 1
+        await anyio.sleep(0.05)
+        if self.fail:
+            raise RuntimeUnavailableError("down")
+        return {"runtime": "counting"}
+
+    async def list_scene_objects_page(self, *, limit, cursor=None, type=None, name_prefix=None):
+        self.calls += 1
+        await anyio.sleep(0.05)
+        return [{"name": f"{type}-{limit}"}], None
+
+
+@pytest.mark.anyio
+async def test_identical_concurrent_calls_share_one_request():
+    adapter = _CountingAdapter()
+    before = runtime_call_stats()
+    results = []
+
+    async def probe():
+        results.append(await call_runtime(adapter, "probe"))
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(5):
+            tg.start_soon(probe)
+        page = partial(call_runtime, adapter, "list_scene_objects_page", type="MESH")
+        tg.start_soon(partial(page, limit=1))
+        tg.start_soon(partial(page, limit=2))
+
+    assert adapter.calls == 3  # one probe, two pages with different arguments
+    assert results == [{"runtime": "counting"}] * 5
+    after = runtime_call_stats()
+    assert after["coalesced"] - before["coalesced"] == 4
+    assert after["in_flight"] == 0
+
+    # Calls that do not overlap are not coalesced.
+    await call_runtime(adapter, "probe")
+    assert adapter.calls == 4
+
+
+@pytest.mark.anyio
+async def test_errors_are_shared_and_cancelled_leader_hands_over():
+    failing = _CountingAdapter(fail=True)
+    errors = []
+
+    async def probe():
+        try:
+            await call_runtime(failing, "probe")
+        except RuntimeUnavailableError as exc:
+            errors.append(exc)
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(3):
+            tg.start_soon(probe)
+    assert failing.calls == 1 and len(errors) == 3
+
+    adapter = _CountingAdapter()
+    followers = []
+
+    async def follower():
+        followers.append(await call_runtime(adapter, "probe"))
+
+    async with anyio.create_task_group() as tg:
+        with anyio.move_on_after(0.01):
+            tg.start_soon(follower)
+            await call_runtime(adapter, "probe")  # leader, cancelled mid-flight
+    assert followers == [{"runtime": "counting"}]
+    assert adapter.calls == 2
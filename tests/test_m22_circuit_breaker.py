@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import anyio
+import pytest
+
+from mvp.breaker import (
+    BreakerState,
+    CircuitBreaker,
+    CircuitOpenError,
+    breaker_stats,
+    reset_breakers,
+)
+from mvp.runtime import AsyncExternalHttpRuntimeAdapter, RuntimeUnavailableError, runtime_error
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_breaker_opens_on_failure_rate_and_recovers_through_half_open():
+    clock = _Clock()
+    breaker = CircuitBreaker(
+        "rt", window=10, min_calls=4, failure_rate=0.5, open_for=5.0, clock=clock
+    )
+    for ok in (True, False, True, False):
+        breaker.before_call()
+        breaker.record_success() if ok else breaker.record_failure()
+    assert breaker.state is BreakerState.open
+
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before_call()
+    assert info.value.retry_after == pytest.approx(5.0)
+
+    clock.now = 5.0
+    assert breaker.state is BreakerState.half_open
+    breaker.before_call()  # the single trial call
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state is BreakerState.open
+
+    clock.now = 10.0
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state is BreakerState.closed
+    assert breaker.stats()["opened"] == 2
+
+
+class _FlakyRuntimeHandler(BaseHTTPRequestHandler):
+    failures_left = 0
+
+    def log_message(self, *_):
+        pass
+
+    def do_GET(self):
+        if self.path == "/runtime/probe" and type(self).failures_left > 0:
+            type(self).failures_left -= 1
+            self.send_error(503)
+            return
+        body = json.dumps({"result": {"runtime": "flaky"}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.mark.anyio
+async def test_open_breaker_fails_fast_and_health_probe_closes_it():
+    reset_breakers()
+    port = _free_port()
+    adapter = AsyncExternalHttpRuntimeAdapter(f"http://127.0.0.1:{port}", max_retries=0)
+    try:
+        for _ in range(adapter.breaker.min_calls):
+            with pytest.raises(RuntimeUnavailableError) as info:
+                await adapter.probe()
+            assert info.value.retryable is True
+        assert adapter.breaker.state is BreakerState.open
+
+        started = time.perf_counter()
+        with pytest.raises(RuntimeUnavailableError) as info:
+            await adapter.probe()
+        assert time.perf_counter() - started < 0.01
+        error = runtime_error(info.value).structuredContent["error"]
+        assert error["retryable"] is True
+        assert 0 < error["details"]["retry_after_s"] <= adapter.breaker.open_for
+
+        server = ThreadingHTTPServer(("127.0.0.1", port), _FlakyRuntimeHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            assert await adapter.check_health() is True
+            assert adapter.breaker.state is BreakerState.closed
+            assert await adapter.probe() == {"runtime": "flaky"}
+        finally:
+            server.shutdown()
+            server.server_close()
+    finally:
+        await adapter.aclose()
+        reset_breakers()
+
+
+@pytest.mark.anyio
+async def test_transient_failures_are_retried_within_budget():
+    reset_breakers()
+    port = _free_port()
+    server = ThreadingHTTPServer(("127.0.0.1", port), _FlakyRuntimeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{port}"
+    adapter = AsyncExternalHttpRuntimeAdapter(base_url, max_retries=2)
+    try:
+        _FlakyRuntimeHandler.failures_left = 2
+        assert await adapter.probe() == {"runtime": "flaky"}
+        stats = breaker_stats()[base_url]
+        assert stats["retry_budget"]["retries"] == 2
+        assert stats["state"] == "closed"
+    finally:
+        _FlakyRuntimeHandler.failures_left = 0
+        await adapter.aclose()
+        server.shutdown()
+        server.server_close()
+        reset_breakers()
+
+
+def test_failed_health_probe_does_not_extend_the_open_period():
+    clock = _Clock()
+    breaker = CircuitBreaker("rt", min_calls=1, open_for=5.0, clock=clock)
+    breaker.record_failure()
+    clock.now = 4.0
+    breaker.record_probe_failure()
+    assert breaker.retry_after() == pytest.approx(1.0)
+    clock.now = 5.0
+    assert breaker.state is BreakerState.half_open
+    breaker.record_probe_failure()
+    assert breaker.state is BreakerState.open and breaker.stats()["opened"] == 2
+
+
+class _NoHealthRuntimeHandler(_FlakyRuntimeHandler):
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_error(404)
+            return
+        super().do_GET()
+
+
+@pytest.mark.anyio
+async def test_runtime_without_health_route_half_opens_on_its_timer(monkeypatch):
+    reset_breakers()
+    monkeypatch.setenv("MVP_BREAKER_OPEN_FOR", "0.2")
+    server = ThreadingHTTPServer(("127.0.0.1", _free_port()), _NoHealthRuntimeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    adapter = AsyncExternalHttpRuntimeAdapter(base_url, max_retries=0)
+    try:
+        _NoHealthRuntimeHandler.failures_left = adapter.breaker.min_calls
+        for _ in range(adapter.breaker.min_calls):
+            with pytest.raises(RuntimeUnavailableError):
+                await adapter.probe()
+        assert adapter.breaker.state is BreakerState.open
+
+        deadline = time.monotonic() + 5.0
+        while adapter.breaker.state is BreakerState.open and time.monotonic() < deadline:
+            assert await adapter.check_health() is None  # no /health: the timer is left alone
+            await anyio.sleep(0.05)
+        assert adapter.breaker.state is BreakerState.half_open
+        assert await adapter.probe() == {"runtime": "flaky"}
+        assert adapter.breaker.state is BreakerState.closed
+    finally:
+        _NoHealthRuntimeHandler.failures_left = 0
+        await adapter.aclose()
+        server.shutdown()
+        server.server_close()
+        reset_breakers()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import anyio
+import pytest
+from starlette.testclient import TestClient
+
+from mvp.http_transport import _call_tool_http
+from mvp.metrics import Histogram, metrics_snapshot, reset_metrics
+from mvp.runtime import InMemoryRuntimeAdapter, NullRuntimeAdapter, set_runtime
+from mvp.server import _http_app, build_server
+from mvp.sessions import SessionStore, set_session_store
+
+
+def test_histogram_quantiles_within_bucket_precision():
+    histogram = Histogram()
+    for us in range(1, 10_001):
+        histogram.record(us / 1_000_000)
+    assert histogram.count == 10_000
+    for q in (0.5, 0.9, 0.99):
+        assert histogram.quantile(q) == pytest.approx(q * 0.01, rel=0.07)
+    assert histogram.quantile(1.0) == pytest.approx(0.01)
+    cumulative = dict(histogram.cumulative([0.001, 0.01, 1.0]))
+    assert cumulative[1.0] == 10_000
+    assert 900 <= cumulative[0.001] <= 1_000
+
+
+@pytest.fixture()
+def client():
+    reset_metrics()
+    set_session_store(SessionStore())
+    with TestClient(_http_app(build_server())) as test_client:
+        yield test_client
+    set_session_store(SessionStore())
+    reset_metrics()
+
+
+def test_calls_are_counted_by_outcome_and_exported(client):
+    client.post("/call", json={"name": "echo", "params": {"text": "hi"}})
+    client.post("/call", json={"name": "workspace.list_files", "params": {}})
+    client.post("/call", json={"name": "no.such_tool", "params": {}})
+
+    snapshot = metrics_snapshot()
+    assert snapshot["calls"]["echo"] == {"ok": 1}
+    assert snapshot["calls"]["workspace.list_files"] == {"contract_required": 1}
+    assert "unknown" in snapshot["calls"]
+    assert snapshot["histograms"]["mvp_gate_duration_seconds"]["echo"]["count"] == 1
+
+    stdio_view = client.post("/call", json={"name": "system.metrics", "params": {}}).json()
+    assert stdio_view["result"]["calls"]["echo"] == {"ok": 1}
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'mvp_tool_calls_total{tool="echo",code="ok"} 1' in text
+    assert 'mvp_tool_duration_seconds_bucket{tool="echo",le="+Inf"} 1' in text
+    assert "# TYPE mvp_serialize_seconds histogram" in text
+
+
+class _HangingRuntime(InMemoryRuntimeAdapter):
+    async def probe(self) -> dict:
+        await anyio.sleep_forever()
+
+
+@pytest.mark.anyio
+async def test_cancelled_calls_are_still_counted():
+    reset_metrics()
+    set_session_store(SessionStore())
+    set_runtime(_HangingRuntime())
+    server = build_server()
+    contract = {"host_profile": "h", "runtime_profile": "r", "capabilities": ["DATA_ONLY"]}
+    try:
+        await _call_tool_http(server, "contract.create", contract)
+        with anyio.move_on_after(0.05):
+            await _call_tool_http(server, "runtime.probe", {})
+        assert metrics_snapshot()["calls"]["runtime.probe"] == {"cancelled": 1}
+    finally:
+        set_runtime(NullRuntimeAdapter())
+        set_session_store(SessionStore())
+        reset_metrics()
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from mcp import types
+
+from mvp.breaker import reset_breakers
+from mvp.runtime import AsyncExternalHttpRuntimeAdapter, NullRuntimeAdapter, set_runtime
+from mvp.server import build_server
+from mvp.sessions import SessionStore, set_session_store
+from mvp.tracing import JsonlExporter, NoopTracer, RecordingTracer, set_tracer, tracer_from_env
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _TraceparentHandler(BaseHTTPRequestHandler):
+    received: list[str | None] = []
+
+    def log_message(self, *_):
+        pass
+
+    def do_GET(self):
+        type(self).received.append(self.headers.get("traceparent"))
+        body = json.dumps({"result": {"runtime": "traced"}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.mark.anyio
+async def test_spans_link_tool_call_to_runtime_request(tmp_path):
+    trace_file = tmp_path / "trace.jsonl"
+    exporter = JsonlExporter(trace_file)
+    port = _free_port()
+    runtime_server = ThreadingHTTPServer(("127.0.0.1", port), _TraceparentHandler)
+    threading.Thread(target=runtime_server.serve_forever, daemon=True).start()
+    adapter = AsyncExternalHttpRuntimeAdapter(f"http://127.0.0.1:{port}")
+    set_runtime(adapter)
+    set_session_store(SessionStore())
+    handler = build_server()._mcp_server.request_handlers[types.CallToolRequest]
+
+    async def call(name: str, arguments: dict) -> dict:
+        params = types.CallToolRequestParams(name=name, arguments=arguments)
+        request = types.CallToolRequest(params=params)
+        return (await handler(request)).root.structuredContent
+
+    try:
+        await call(
+            "contract.create",
+            {"host_profile": "h", "runtime_profile": "r", "capabilities": ["DATA_ONLY"]},
+        )
+        set_tracer(RecordingTracer(exporter))
+        assert (await call("runtime.probe", {}))["result"] == {"runtime": "traced"}
+    finally:
+        set_tracer(NoopTracer())
+        exporter.close()
+        set_runtime(NullRuntimeAdapter())
+        set_session_store(SessionStore())
+        await adapter.aclose()
+        runtime_server.shutdown()
+        runtime_server.server_close()
+        reset_breakers()
+
+    spans = {span["name"]: span for span in map(json.loads, trace_file.read_text().splitlines())}
+    root, gate, upstream = spans["mcp.call_tool"], spans["mvp.gate"], spans["runtime.request"]
+    assert root["parent_id"] is None and root["attributes"] == {"tool": "runtime.probe"}
+    assert gate["parent_id"] == root["span_id"]
+    assert upstream["parent_id"] == root["span_id"]
+    assert {gate["trace_id"], upstream["trace_id"]} == {root["trace_id"]}
+    assert upstream["attributes"] == {"path": "/runtime/probe", "attempt": 0}
+    assert _TraceparentHandler.received[-1] == f"00-{root['trace_id']}-{upstream['span_id']}-01"
+
+
+
+
+def test_jsonl_exporter_writes_from_its_own_thread(tmp_path):
+    exporter = JsonlExporter(tmp_path / "trace.jsonl")
+
+    def export_many():
+        for i in range(500):
+            exporter.export({"n": i, "attributes": {"x": object}})
+
+    workers = [threading.Thread(target=export_many) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    exporter.flush()
+    lines = (tmp_path / "trace.jsonl").read_text().splitlines()
+    assert len(lines) == 1000 and json.loads(lines[0])["attributes"]["x"] == str(object)
+    exporter.close()
+    assert exporter._handle.closed
+
+
+def test_otel_without_opentelemetry_falls_back_to_noop(monkeypatch, caplog):
+    monkeypatch.setenv("MVP_TRACING", "otel")
+    monkeypatch.setitem(sys.modules, "opentelemetry", None)  # import fails as if not installed
+    assert isinstance(tracer_from_env(), NoopTracer)
+    assert "opentelemetry-api" in caplog.text
+def test_opentelemetry_bridge_uses_global_provider():
+    pytest.importorskip("opentelemetry.trace")
+    from mvp.tracing import OpenTelemetryTracer
+
+    tracer = OpenTelemetryTracer()
+    headers: dict[str, str] = {}
+    with tracer.span("mcp.call_tool", tool="echo") as span:
+        span.record_error("timeout", "slow")
+        tracer.inject(headers)
+    # Without an SDK the API provider is a no-op; the bridge must still be safe to use.
+    assert isinstance(headers, dict)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+# Regression threshold for the import cost of mvp's own modules (typically ~20 ms).
+BUDGET_MS = float(os.getenv("MVP_STARTUP_BUDGET_MS", "200"))
+TRANSPORT_ONLY = {"starlette", "httpx", "uvicorn"}
+
+
+def _importtime(code: str) -> tuple[list[tuple[int, str, int]], str]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|")
+        rows.append((len(name) - len(name.lstrip()), name.strip(), int(self_us)))
+    return rows, proc.stdout.strip()
+
+
+def test_stdio_startup_defers_transport_stack_and_stays_within_budget():
+    owned_ms = []
+    for _ in range(3):
+        rows, stdout = _importtime(
+            "import sys, mvp.server; print('mvp.http_transport' in sys.modules)"
+        )
+        assert stdout == "False"
+        owned_us = sum(self_us for _, name, self_us in rows if name.split(".")[0] == "mvp")
+        owned_ms.append(owned_us / 1000)
+
+        # importtime lists children (deeper indent) right before their parent: no mvp
+        # module may import the HTTP stack itself (mcp's own imports are nested deeper).
+        for index, (depth, name, _) in enumerate(rows):
+            if name.split(".")[0] != "mvp":
+                continue
+            position = index - 1
+            while position >= 0 and rows[position][0] > depth:
+                child_depth, child, _ = rows[position]
+                if child_depth == depth + 2:
+                    assert child.split(".")[0] not in TRANSPORT_ONLY, (name, child)
+                position -= 1
+
+    assert min(owned_ms) < BUDGET_MS, f"mvp modules took {min(owned_ms):.1f} ms to import"
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import pytest
+from starlette.testclient import TestClient
+
+from mvp.catalog import get_tool_catalog
+from mvp.server import _http_app, build_server
+from mvp.sessions import SESSION_HEADER, SessionStore, set_session_store
+
+
+@pytest.fixture()
+def server():
+    set_session_store(SessionStore())
+    yield build_server()
+    set_session_store(SessionStore())
+
+
+def test_catalog_is_built_once_and_fingerprinted(server):
+    catalog = get_tool_catalog(server)
+    names = [entry["name"] for entry in catalog.full.tools]
+    assert names == sorted(names)
+    assert {"system.health", "scenegraph.find", "macro.run"} <= set(names)
+    assert len(catalog.full.fingerprint) == 64
+    # Same tool surface, same fingerprint; the view is not rebuilt per call.
+    assert get_tool_catalog(build_server()).full.fingerprint == catalog.full.fingerprint
+    assert catalog.view(None) is catalog.full
+
+
+def test_http_tools_etag_and_per_contract_views(server):
+    with TestClient(_http_app(server)) as client:
+        first = client.get("/tools")
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        body = first.json()
+        assert body["ok"] is True
+        assert etag == f'"{body["result"]["fingerprint"]}"'
+        assert any(tool["name"] == "runtime.probe" for tool in body["result"]["tools"])
+
+        assert client.get("/tools", headers={"If-None-Match": etag}).status_code == 304
+        assert client.get("/tools", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+        contract = {
+            "host_profile": "codex_stdio",
+            "runtime_profile": "none",
+            "capabilities": [],
+            "tool_allowlist": ["echo", "runtime.probe", "workspace.list_files"],
+        }
+        client.post("/contract/create", json=contract, headers={SESSION_HEADER: "a"})
+        client.post("/contract/create", json=contract, headers={SESSION_HEADER: "b"})
+
+        scoped = client.get("/tools", headers={SESSION_HEADER: "a"})
+        names = {tool["name"] for tool in scoped.json()["result"]["tools"]}
+        # Allowlisted and capability-free, plus the always-allowed tools.
+        assert "workspace.list_files" in names and "system.health" in names
+        assert "runtime.probe" not in names and "scene.list_objects" not in names
+        assert scoped.headers["etag"] != etag
+        headers = {SESSION_HEADER: "b", "If-None-Match": scoped.headers["etag"]}
+        assert client.get("/tools", headers=headers).status_code == 304
+
+    catalog = get_tool_catalog(server)
+    assert len(catalog._views) == 1
+
+
+def test_tools_catalog_tool_honours_if_none_match(server):
+    with TestClient(_http_app(server)) as client:
+        listing = client.post("/call", json={"name": "system.tools_catalog", "params": {}}).json()
+        fingerprint = listing["result"]["fingerprint"]
+        again = client.post(
+            "/call", json={"name": "system.tools_catalog", "params": {"if_none_match": fingerprint}}
+        ).json()
+        assert again["result"] == {"fingerprint": fingerprint, "not_modified": True}
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import copy
+import random
+
+import pytest
+
+from mvp import fingerprint
+from mvp.fingerprint import MerkleTree, object_fingerprint, object_fingerprints, quantize
+from mvp.runtime import InMemoryRuntimeAdapter, RuntimeUnavailableError
+from mvp.scene_cache import SceneSnapshotCache, build_snapshot
+
+
+def _scene(count: int) -> list[dict]:
+    return [
+        {
+            "name": f"Obj_{i:05d}",
+            "type": "MESH",
+            "collections": [f"Collection_{i % 7}"],
+            "transform": {
+                "location": [i * 0.1, -i * 0.25, 1.0],
+                "rotation": [0, 0, 0.5],
+                "scale": [1, 1, 1],
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def test_canonical_hash_ignores_representation_noise():
+    base = {"name": "Cube", "transform": {"location": [1.0, 2.0, 3.0]}, "visible": True}
+    noisy = {"visible": 1, "transform": {"location": [1, 2.0000001, 3.0]}, "name": "Cube"}
+    assert object_fingerprint(base) == object_fingerprint(noisy)
+    moved = {**base, "transform": {"location": [1.0, 2.0, 3.00001]}}
+    assert object_fingerprint(base) != object_fingerprint(moved)
+    # Non-quantizable transforms use the generic encoding and never collide with quantized ones.
+    assert object_fingerprint({"transform": {"location": [1e13]}}) != object_fingerprint(
+        {"transform": {"location": [1e7]}}
+    )
+    nan = {"name": "Bad", "transform": {"location": [float("nan"), 0.0, 0.0]}}
+    assert object_fingerprint(nan) == object_fingerprint(copy.deepcopy(nan))
+
+
+def test_batch_and_vectorized_quantization_match_scalar_path(monkeypatch):
+    scene = _scene(200) + [{"name": "Odd", "transform": {"location": ["x"]}}]
+    expected = [object_fingerprint(obj) for obj in scene]
+    assert object_fingerprints(scene) == expected
+
+    numpy = pytest.importorskip("numpy")
+    values = [random.uniform(-1e6, 1e6) for _ in range(1000)] + [0.5e-6, 1.5e-6, -2.5e-6]
+    monkeypatch.setattr(fingerprint, "numpy", None)
+    scalar = quantize(values)
+    monkeypatch.setattr(fingerprint, "numpy", numpy)
+    assert quantize(values) == scalar
+
+
+def test_merkle_updates_match_full_rebuilds():
+    rng = random.Random(7)
+    leaves = {f"k{i}": f"{i:064x}" for i in range(100)}
+    tree = MerkleTree.build(leaves)
+    for step in range(200):
+        changes: dict[str, str | None] = {}
+        for _ in range(rng.randint(1, 4)):
+            key = f"k{rng.randint(0, 400)}"
+            changes[key] = None if rng.random() < 0.3 else f"{step:032x}{rng.getrandbits(64):032x}"
+        tree = tree.update(changes)
+        for key, leaf in changes.items():
+            if leaf is None:
+                leaves.pop(key, None)
+            else:
+                leaves[key] = leaf
+        assert tree.size == len(leaves)
+        assert tree.root == MerkleTree.build(leaves).root
+    assert tree.leaves() == leaves
+
+
+def test_incremental_snapshot_fingerprint_equals_cold_build():
+    scene = _scene(500)
+    first = build_snapshot(scene)
+    changed = copy.deepcopy(scene)
+    changed[42]["transform"]["location"][0] += 1.0
+    del changed[7]
+    changed.append({"name": "Added", "type": "EMPTY", "transform": {"location": [0, 0, 0]}})
+
+    incremental = build_snapshot(changed, previous=first)
+    assert incremental.fingerprint == build_snapshot(changed).fingerprint != first.fingerprint
+    assert incremental.hashes_by_name()["Obj_00001"] == first.hashes_by_name()["Obj_00001"]
+    assert build_snapshot(copy.deepcopy(scene), previous=first).fingerprint == first.fingerprint
+
+    duplicated = scene + [dict(scene[0], type="LIGHT")]
+    snapshot = build_snapshot(duplicated, previous=first)
+    assert snapshot.merkle is None
+    assert snapshot.fingerprint == build_snapshot(duplicated).fingerprint != first.fingerprint
+    assert build_snapshot(scene, previous=snapshot).fingerprint == first.fingerprint
+
+
+@pytest.mark.anyio
+async def test_fingerprint_includes_the_runtime_blender_version():
+    scene = _scene(3)
+    assert build_snapshot(scene).fingerprint != build_snapshot(
+        scene, blender_version="4.2.0"
+    ).fingerprint
+
+    class _Runtime(InMemoryRuntimeAdapter):
+        blender_version = "4.2.0"
+        probes = 0
+        down = False
+
+        def probe(self) -> dict:
+            self.probes += 1
+            return {"name": "blender", "blender_version": self.blender_version}
+
+        def list_scene_objects(self) -> list[dict]:
+            if self.down:
+                raise RuntimeUnavailableError("restarting")
+            return scene
+
+    runtime, cache = _Runtime(), SceneSnapshotCache(max_age=0)
+    first = await cache.get(runtime)
+    assert first.fingerprint == build_snapshot(scene, blender_version="4.2.0").fingerprint
+    await cache.get(runtime)
+    assert runtime.probes == 1
+
+    # An upgrade restarts the runtime; the core re-probes once it is reachable again.
+    runtime.down, runtime.blender_version = True, "4.3.0"
+    with pytest.raises(RuntimeUnavailableError):
+        await cache.get(runtime)
+    runtime.down = False
+    upgraded = await cache.get(runtime)
+    assert upgraded.fingerprint == build_snapshot(scene, blender_version="4.3.0").fingerprint
+    assert runtime.probes == 2
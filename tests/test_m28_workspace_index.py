@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import anyio
+import pytest
+from starlette.testclient import TestClient
+
+from mvp import workspace
+from mvp.http_transport import _call_tool_http
+from mvp.server import _http_app, build_server
+from mvp.sessions import SessionStore, set_session_store
+from mvp.workspace import WorkspaceIndex, _Inotify
+
+
+def _tree(root: Path) -> None:
+    for path in (
+        "a.txt",
+        "src/main.py",
+        "src/util/io.py",
+        "assets/tex/wood.PNG",
+        ".git/HEAD",
+        "src/__pycache__/m.pyc",
+    ):
+        target = root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(path)
+    (root / "link.txt").symlink_to(root / "a.txt")
+
+
+def test_server_imports_without_posix_only_os_flags():
+    # Windows has no os.O_NONBLOCK; the inotify binding must not need it at import time.
+    code = "import os; del os.O_NONBLOCK; import mvp.server"
+    subprocess.run([sys.executable, "-c", code], capture_output=True, check=True)
+
+
+async def _eventually(predicate, timeout: float = 5.0) -> None:
+    with anyio.fail_after(timeout):
+        while not predicate():
+            await anyio.sleep(0.02)
+
+
+@pytest.mark.anyio
+async def test_queries_filter_and_page_from_memory(tmp_path):
+    _tree(tmp_path)
+    index = WorkspaceIndex(tmp_path)
+    await index.ready()
+
+    def paths(**filters):
+        return [entry.path for entry in index.query(**filters)[0]]
+
+    assert paths() == ["a.txt", "assets/tex/wood.PNG", "src/main.py", "src/util/io.py"]
+    assert paths(max_depth=1) == ["a.txt", "src/main.py"]
+    assert paths(glob="*.py") == ["src/main.py", "src/util/io.py"]
+    assert paths(glob="src/u*") == ["src/util/io.py"]
+    assert paths(extensions=["png", ".TXT"]) == ["a.txt", "assets/tex/wood.PNG"]
+
+    page, cursor = index.query(limit=3)
+    assert [entry.path for entry in page] == ["a.txt", "assets/tex/wood.PNG", "src/main.py"]
+    rest, end = index.query(limit=3, cursor=cursor)
+    assert [entry.path for entry in rest] == ["src/util/io.py"] and end is None
+    with pytest.raises(ValueError):
+        index.query(cursor="not-a-cursor")
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("mode", ["inotify", "poll"])
+async def test_watcher_keeps_index_current(tmp_path, mode):
+    if mode == "inotify" and (probe := _Inotify.open()) is None:
+        pytest.skip("inotify unavailable")
+    elif mode == "inotify":
+        probe.close()
+    _tree(tmp_path)
+    index = WorkspaceIndex(tmp_path, mode=mode, poll_interval=0.05)
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(index.watch)
+        await _eventually(lambda: index.watching == mode and len(index) == 4)
+        contains = lambda path: path in index._entries  # noqa: E731
+
+        (tmp_path / "new.txt").write_text("x")
+        (tmp_path / "deep" / "er").mkdir(parents=True)
+        (tmp_path / "deep" / "er" / "f.blend").write_text("y")
+        os.remove(tmp_path / "a.txt")
+        await _eventually(
+            lambda: contains("new.txt") and contains("deep/er/f.blend") and not contains("a.txt")
+        )
+
+        os.rename(tmp_path / "src", tmp_path / "lib")
+        await _eventually(lambda: contains("lib/util/io.py") and not contains("src/main.py"))
+        (tmp_path / "lib" / "util" / "more.py").write_text("z")
+        await _eventually(lambda: contains("lib/util/more.py"))
+        assert index._paths == sorted(index._entries)
+        tg.cancel_scope.cancel()
+    assert index.watching is None
+
+
+@pytest.mark.anyio
+async def test_list_files_tool_pages_and_hashes_on_request(tmp_path, monkeypatch):
+    _tree(tmp_path)
+    set_session_store(SessionStore())
+    server = build_server(tmp_path)
+    contract = {"host_profile": "h", "runtime_profile": "none"}
+    await _call_tool_http(
+        server, "contract.create", {**contract, "tool_allowlist": ["workspace.list_files"]}
+    )
+    query = {"extensions": ["py"]}
+    listed = await _call_tool_http(server, "workspace.list_files", {**query, "limit": 1})
+    assert listed["result"]["files"] == ["src/main.py"]
+    assert "hashes" not in listed["result"]
+    cursor = listed["result"]["next_cursor"]
+    following = await _call_tool_http(server, "workspace.list_files", {**query, "cursor": cursor})
+    assert following["result"] == {"files": ["src/util/io.py"], "next_cursor": None}
+
+    reads = []
+    digest = workspace._file_digest
+    monkeypatch.setattr(workspace, "_file_digest", lambda path: reads.append(path) or digest(path))
+    for _ in range(2):
+        arguments = {"glob": "main.py", "with_hash": True}
+        hashed = await _call_tool_http(server, "workspace.list_files", arguments)
+        expected = hashlib.sha256(b"src/main.py").hexdigest()
+        assert hashed["result"]["hashes"] == {"src/main.py": expected}
+    assert len(reads) == 1  # cached until the file's size or mtime changes
+
+    bad = await _call_tool_http(server, "workspace.list_files", {"cursor": "???"})
+    assert bad["error"]["code"] == "invalid_request"
+    set_session_store(SessionStore())
+
+
+def test_server_lifespan_starts_the_workspace_watcher(tmp_path, monkeypatch):
+    _tree(tmp_path)
+    monkeypatch.setattr(workspace, "_indexes", {})
+    root = str(tmp_path.resolve())
+    with TestClient(_http_app(build_server(tmp_path))):
+        deadline = time.monotonic() + 5.0
+        while workspace.workspace_stats()[root]["watching"] is None and time.monotonic() < deadline:
+            time.sleep(0.02)
+        stats = workspace.workspace_stats()[root]
+        assert stats["watching"] in {"inotify", "poll"} and stats["files"] == 4
+    assert workspace.workspace_stats()[root]["watching"] is None
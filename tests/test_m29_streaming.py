@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from mcp import types
+from mcp.shared.memory import create_connected_server_and_client_session
+from starlette.testclient import TestClient
+
+from mvp.http_transport import _call_tool_http
+from mvp.runtime import InMemoryRuntimeAdapter, NullRuntimeAdapter, set_runtime
+from mvp.server import _http_app, build_server
+from mvp.sessions import SessionStore, set_session_store
+from mvp.streaming import get_stream_opener
+
+
+def _tree(root: Path, count: int) -> None:
+    for i in range(count):
+        (root / f"f{i:02d}.txt").write_text(str(i))
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("MVP_STREAM_CHUNK", "2")
+    _tree(tmp_path, 5)
+    set_session_store(SessionStore())
+    set_runtime(InMemoryRuntimeAdapter())
+    with TestClient(_http_app(build_server(tmp_path))) as test_client:
+        test_client.post(
+            "/contract/create",
+            json={"host_profile": "h", "runtime_profile": "r", "capabilities": ["DATA_ONLY"]},
+        )
+        yield test_client
+    set_runtime(NullRuntimeAdapter())
+    set_session_store(SessionStore())
+
+
+def _lines(client: TestClient, name: str, params: dict) -> list[dict]:
+    with client.stream("POST", "/call/stream", json={"name": name, "params": params}) as resp:
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line) for line in resp.iter_lines() if line]
+
+
+def test_http_streams_files_in_chunks_with_tail(client):
+    lines = _lines(client, "workspace.list_files", {"with_hash": True})
+    chunks, final = lines[:-1], lines[-1]
+    expected = [["f00.txt", "f01.txt"], ["f02.txt", "f03.txt"], ["f04.txt"]]
+    assert [chunk["files"] for chunk in chunks] == expected
+    assert all(set(chunk["hashes"]) == set(chunk["files"]) for chunk in chunks)
+    assert final == {
+        "ok": True,
+        "result": {"next_cursor": None, "stream": {"field": "files", "items": 5, "chunks": 3}},
+    }
+
+    limited = _lines(client, "workspace.list_files", {"limit": 3})
+    assert [chunk["files"] for chunk in limited[:-1]] == [["f00.txt", "f01.txt"], ["f02.txt"]]
+    rest = _lines(client, "workspace.list_files", {"cursor": limited[-1]["result"]["next_cursor"]})
+    assert [chunk["files"] for chunk in rest[:-1]] == [["f03.txt", "f04.txt"]]
+
+
+def test_http_streams_scene_objects_and_rejects_bad_calls(client):
+    lines = _lines(client, "scene.list_objects", {"limit": 1})
+    assert [obj["name"] for obj in lines[0]["objects"]] == ["Camera"]
+    assert lines[-1]["result"]["next_cursor"] and lines[-1]["result"]["fingerprint"]
+
+    rejected = client.post("/call/stream", json={"name": "echo", "params": {"text": "x"}}).json()
+    assert rejected["error"]["code"] == "invalid_request"
+    bad_limit = {"name": "workspace.list_files", "params": {"limit": "many"}}
+    invalid = client.post("/call/stream", json=bad_limit).json()
+    assert invalid["error"]["code"] == "invalid_request"
+    not_object = {"name": "workspace.list_files", "params": [1, 2]}
+    invalid = client.post("/call/stream", json=not_object)
+    assert invalid.status_code == 400
+    assert invalid.json()["error"]["code"] == "invalid_request"
+
+    set_session_store(SessionStore())
+    denied = client.post("/call/stream", json={"name": "workspace.list_files", "params": {}}).json()
+    assert denied["error"]["code"] == "contract_required"
+
+
+@pytest.mark.anyio
+async def test_mcp_stream_sends_chunks_as_progress_notifications(tmp_path, monkeypatch):
+    monkeypatch.setenv("MVP_STREAM_CHUNK", "2")
+    _tree(tmp_path, 3)
+    set_session_store(SessionStore())
+    notes: list[types.ProgressNotificationParams] = []
+
+    async def on_message(message) -> None:
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root, types.ProgressNotification
+        ):
+            notes.append(message.root.params)
+
+    async def on_progress(*_) -> None:
+        pass
+
+    try:
+        async with create_connected_server_and_client_session(
+            build_server(tmp_path), message_handler=on_message
+        ) as mcp:
+            await mcp.call_tool("contract.create", {"host_profile": "h", "runtime_profile": "none"})
+            untokened = await mcp.call_tool("workspace.list_files", {"stream": True})
+            assert untokened.structuredContent["error"]["code"] == "invalid_request"
+
+            result = await mcp.call_tool(
+                "workspace.list_files", {"stream": True}, progress_callback=on_progress
+            )
+            stream = result.structuredContent["result"]["stream"]
+            assert stream == {"field": "files", "items": 3, "chunks": 2}
+    finally:
+        set_session_store(SessionStore())
+    assert [note.model_extra["files"] for note in notes] == [["f00.txt", "f01.txt"], ["f02.txt"]]
+    assert [note.progress for note in notes] == [2, 3]
+
+
+@pytest.mark.anyio
+async def test_stream_opener_rejects_non_object_arguments(tmp_path):
+    set_session_store(SessionStore())
+    server = build_server(tmp_path)
+    try:
+        contract = {"host_profile": "h", "runtime_profile": "r"}
+        await _call_tool_http(server, "contract.create", contract)
+        opened = await get_stream_opener(server)("workspace.list_files", [1, 2])
+        assert opened.structuredContent["error"]["code"] == "invalid_request"
+    finally:
+        set_session_store(SessionStore())
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from mvp.contracts import SessionContract
+from mvp.http_transport import _call_tool_http
+from mvp.runtime import InMemoryRuntimeAdapter, NullRuntimeAdapter, set_runtime
+from mvp.scene_cache import SceneSnapshotCache
+from mvp.server import build_server
+from mvp.sessions import Session, SessionStore, set_session_store
+from mvp.state import SqliteStateBackend, default_state_path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _contract(**kwargs) -> SessionContract:
+    return SessionContract.create(host_profile="h", runtime_profile="none", **kwargs)
+
+
+def test_default_state_path_is_per_instance(monkeypatch):
+    monkeypatch.delenv("MVP_STATE_PATH", raising=False)
+    monkeypatch.setenv("MVP_HTTP_PORT", "8765")
+    first = default_state_path()
+    assert default_state_path() == first  # every worker of one instance agrees
+    monkeypatch.setenv("MVP_HTTP_PORT", "8766")
+    assert default_state_path() != first
+    monkeypatch.setenv("MVP_STATE_PATH", "/srv/mvp/state.sqlite3")
+    assert default_state_path() == "/srv/mvp/state.sqlite3"
+
+
+def test_sessions_are_shared_through_the_backend(tmp_path):
+    clock = _Clock()
+    backend = SqliteStateBackend(str(tmp_path / "state.sqlite3"), clock=clock)
+    worker_a = SessionStore(backend=backend, ttl=60)
+    worker_b = SessionStore(backend=SqliteStateBackend(backend.path, clock=clock), ttl=60)
+
+    worker_a.put(Session("s1", _contract(tool_allowlist=["echo"])))
+    restored = worker_b.get("s1")
+    assert restored is not None and restored.bound is False
+    assert restored.contract.tool_allowlist == ["echo"]
+    assert worker_b.get("s1") is restored  # unchanged record: the local copy is reused
+
+    replaced = _contract(tool_allowlist=["system.health"])
+    worker_a.put(Session("s1", replaced))
+    assert worker_b.get("s1").contract.contract_id == replaced.contract_id
+
+    default = _contract()
+    worker_b.put(Session(default.contract_id, default), make_default=True)
+    assert worker_a.get().contract.contract_id == default.contract_id
+
+    worker_a.remove("s1")
+    assert worker_b.get("s1") is None
+    clock.now += 61
+    assert worker_a.get() is None and worker_b.get(default.contract_id) is None
+
+
+class _CountingBackend(SqliteStateBackend):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads = 0
+
+    def get(self, ns: str, key: str) -> bytes | None:
+        self.reads += 1
+        return super().get(ns, key)
+
+
+@pytest.mark.anyio
+async def test_a_call_reads_the_backend_once(tmp_path):
+    clock = _Clock()
+    backend = _CountingBackend(str(tmp_path / "state.sqlite3"), clock=clock)
+    set_session_store(SessionStore(backend=backend, clock=clock))
+    set_runtime(InMemoryRuntimeAdapter())
+    server = build_server()
+    contract = {"host_profile": "h", "runtime_profile": "r", "capabilities": ["DATA_ONLY"]}
+    try:
+        await _call_tool_http(server, "contract.create", contract, "agent-1")
+        await _call_tool_http(server, "contract.create", contract)
+        for session_id in ("agent-1", None):
+            backend.reads = 0
+            probed = await _call_tool_http(server, "runtime.probe", {}, session_id)
+            assert probed["ok"] and backend.reads == 1
+
+        clock.now += 2  # the default-session pointer is re-read once it is stale
+        backend.reads = 0
+        assert (await _call_tool_http(server, "runtime.probe", {}))["ok"]
+        assert backend.reads == 2
+    finally:
+        set_runtime(NullRuntimeAdapter())
+        set_session_store(SessionStore())
+
+
+@pytest.mark.anyio
+async def test_any_worker_serves_any_session(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    worker_a = SessionStore(backend=SqliteStateBackend(path))
+    worker_b = SessionStore(backend=SqliteStateBackend(path))
+    server_a, server_b = build_server(), build_server()
+    try:
+        set_session_store(worker_a)
+        created = await _call_tool_http(
+            server_a,
+            "contract.create",
+            {"host_profile": "h", "runtime_profile": "none", "tool_allowlist": ["echo"]},
+            "agent-1",
+        )
+        assert created["ok"]
+
+        set_session_store(worker_b)
+        echoed = await _call_tool_http(server_b, "echo", {"text": "hi"}, "agent-1")
+        assert echoed["result"] == "hi"
+        denied = await _call_tool_http(server_b, "workspace.list_files", {}, "agent-1")
+        assert denied["error"]["code"] == "tool_not_allowed"
+        unknown = await _call_tool_http(server_b, "workspace.list_files", {}, "agent-2")
+        assert unknown["error"]["code"] == "contract_required"
+    finally:
+        set_session_store(SessionStore())
+
+
+class _EtagAdapter:
+    base_url = "http://runtime.test"
+
+    def __init__(self):
+        self.requests: list[str | None] = []
+
+    async def list_scene_objects_conditional(self, etag):
+        self.requests.append(etag)
+        if etag == '"v1"':
+            return None, etag
+        return [{"name": "Cube", "type": "MESH"}, {"name": "Camera", "type": "CAMERA"}], '"v1"'
+
+
+@pytest.mark.anyio
+async def test_cold_worker_revalidates_shared_snapshot(tmp_path):
+    backend = SqliteStateBackend(str(tmp_path / "state.sqlite3"))
+    first, second = SceneSnapshotCache(max_age=0), SceneSnapshotCache(max_age=0)
+    first.share(backend, _EtagAdapter.base_url)
+    second.share(backend, _EtagAdapter.base_url)
+    adapter = _EtagAdapter()
+
+    fetched = await first.get(adapter)
+    restored = await second.get(adapter)
+    assert adapter.requests == [None, '"v1"']  # the second worker only sent a conditional request
+    assert restored.fingerprint == fetched.fingerprint
+    assert restored.hashes_by_name() == fetched.hashes_by_name()
+    assert second.stats()["misses"] == 0
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_http_workers_share_sessions(tmp_path):
+    port = _free_port()
+    env = {
+        **os.environ,
+        "MVP_TRANSPORT": "http",
+        "MVP_HTTP_PORT": str(port),
+        "MVP_HTTP_WORKERS": "2",
+        "MVP_STATE_PATH": str(tmp_path / "state.sqlite3"),
+    }
+    env.pop("MVP_STATE_BACKEND", None)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "mvp.server"],
+        cwd=str(PROJECT_ROOT),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(f"{base}/health").status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            assert time.monotonic() < deadline and proc.poll() is None, "HTTP workers did not start"
+            time.sleep(0.1)
+
+        headers = {"X-MVP-Session": "shared"}
+        contract = {"host_profile": "h", "runtime_profile": "none"}
+        created = httpx.post(f"{base}/contract/create", json=contract, headers=headers)
+        assert created.json()["ok"]
+        # Fresh connections are spread across the workers by the kernel.
+        for _ in range(20):
+            call = {"name": "workspace.list_files", "params": {"limit": 1}}
+            gated = httpx.post(f"{base}/call", json=call, headers=headers)
+            assert gated.json()["ok"], gated.json()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+from mcp.client.session import ClientSession
+from mcp.client.stdio import StdioServerParameters, stdio_client
+
+from mvp.http_transport import _call_tool_http
+from mvp.runtime import AsyncExternalHttpRuntimeAdapter, close_runtime
+from mvp.server import build_server
+from mvp.sessions import SessionStore, set_session_store
+from mvp.state import SqliteStateBackend
+from mvp.tools import _session_runtime
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.anyio
+async def test_restart_restores_contracts_profiles_and_bindings(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.sqlite3")
+    monkeypatch.setenv("MVP_RUNTIME_URL", "http://127.0.0.1:9999")
+    before = SessionStore(backend=SqliteStateBackend(path))
+    set_session_store(before)
+    server = build_server()
+    try:
+        created = await _call_tool_http(
+            server,
+            "contract.create",
+            {
+                "host_profile": "codex_stdio",
+                "runtime_profile": "mcpblender_http",
+                "capabilities": ["DATA_ONLY"],
+            },
+            "agent-1",
+        )
+        contract = {"host_profile": "h", "runtime_profile": "none"}
+        await _call_tool_http(server, "contract.create", contract)
+        original = before.get("agent-1").contract
+        for session in before:
+            await close_runtime(session.runtime)
+        before.backend.close()
+
+        monkeypatch.setenv("MVP_RUNTIME_URL", "http://127.0.0.1:1")  # the stored binding wins
+        after = SessionStore(backend=SqliteStateBackend(path))
+        assert after.restore() == 2
+        restored = after.get("agent-1")
+        assert restored.contract == original
+        assert restored.resolved["runtime"]["name"] == "mcpblender_http"
+        adapter = _session_runtime(restored)
+        assert isinstance(adapter, AsyncExternalHttpRuntimeAdapter)
+        assert adapter.base_url == "http://127.0.0.1:9999"
+        await close_runtime(adapter)
+        assert after.get().contract.runtime_profile == "none"
+
+        set_session_store(after)
+        active = await _call_tool_http(server, "contract.get_active", {}, "agent-1")
+        assert active["result"]["session_id"] == "agent-1"
+        assert active["result"]["contract_id"] == created["result"]["contract_id"]
+    finally:
+        set_session_store(SessionStore())
+
+
+def test_compaction_purges_expired_records(tmp_path):
+    clock = _Clock()
+    path = str(tmp_path / "state.sqlite3")
+    backend = SqliteStateBackend(path, clock=clock)
+    store = SessionStore(backend=backend, ttl=10)
+    for i in range(50):
+        backend.put("session", f"old-{i}", b"{}", ttl=5)
+    backend.put("session", "live", b"{}", ttl=60)
+    backend.put("default", "", b"old-0")
+
+    clock.now += 6
+    assert [key for key, _ in backend.items("session")] == ["live"]
+    assert store.compact() == 50
+    assert backend.get("default", "") is None
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT count(*) FROM state").fetchone() == (1,)
+
+
+@pytest.mark.anyio
+async def test_stdio_server_keeps_sessions_across_restarts(tmp_path):
+    env = {**os.environ, "MVP_STATE_PATH": str(tmp_path / "state.sqlite3")}
+    env.pop("MVP_STATE_BACKEND", None)
+    params = StdioServerParameters(
+        command=sys.executable, args=["-m", "mvp.server"], cwd=str(PROJECT_ROOT), env=env
+    )
+
+    async with stdio_client(params) as streams, ClientSession(*streams) as client:
+        await client.initialize()
+        created = await client.call_tool(
+            "contract.create",
+            {
+                "host_profile": "codex_stdio",
+                "runtime_profile": "none",
+                "tool_allowlist": ["workspace.list_files"],
+            },
+        )
+        session_id = created.structuredContent["result"]["session_id"]
+
+    async with stdio_client(params) as streams, ClientSession(*streams) as client:
+        await client.initialize()
+        listed = await client.call_tool("workspace.list_files", {"limit": 1})
+        assert listed.structuredContent["ok"] is True
+        active = await client.call_tool("contract.get_active", {})
+        assert active.structuredContent["result"]["session_id"] == session_id
+        assert active.structuredContent["result"]["resolved"]["host"]["name"] == "codex_stdio"
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import anyio
+import pytest
+from starlette.testclient import TestClient
+
+from mvp import http_transport
+from mvp.runtime import InMemoryRuntimeAdapter, NullRuntimeAdapter, set_runtime
+from mvp.server import _http_app, build_server
+from mvp.sessions import SessionStore, set_session_store
+
+CONTRACT = {"host_profile": "h", "runtime_profile": "r", "capabilities": ["DATA_ONLY"]}
+
+
+class _SlowProbeRuntime(InMemoryRuntimeAdapter):
+    async def probe(self) -> dict:
+        await anyio.sleep(0.3)
+        return {"name": "slow"}
+
+
+def _invalid(message: str) -> dict:
+    return {
+        "ok": False,
+        "error": {
+            "code": "invalid_request",
+            "message": message,
+            "details": None,
+            "hint": None,
+            "retryable": False,
+        },
+    }
+
+
+@pytest.fixture()
+def runtime(monkeypatch):
+    monkeypatch.setenv("MVP_WS_SCENE_POLL", "0.02")
+    monkeypatch.setenv("MVP_SCENE_CACHE_MAX_AGE", "0")
+    adapter = _SlowProbeRuntime()
+    set_session_store(SessionStore())
+    set_runtime(adapter)
+    yield adapter
+    set_runtime(NullRuntimeAdapter())
+    set_session_store(SessionStore())
+
+
+def test_calls_are_multiplexed_and_answered_out_of_order(runtime):
+    app = _http_app(build_server())
+    with TestClient(app) as client, client.websocket_connect("/ws?session=ws-1") as ws:
+        ws.send_json({"id": "c", "name": "contract.create", "params": CONTRACT})
+        assert ws.receive_json()["result"]["session_id"] == "ws-1"
+
+        ws.send_json({"id": 1, "name": "runtime.probe", "params": {}})
+        for i in range(2, 6):
+            ws.send_json({"id": i, "name": "echo", "params": {"text": str(i)}})
+        replies = [ws.receive_json() for _ in range(5)]
+        assert [reply["id"] for reply in replies][-1] == 1  # the slow call finishes last
+        assert {reply["id"]: reply["result"] for reply in replies}[1] == {"name": "slow"}
+
+        listing = {"name": "workspace.list_files", "params": {"limit": 2}, "stream": True}
+        ws.send_json({"id": 7, **listing})
+        chunk, final = ws.receive_json(), ws.receive_json()
+        assert chunk["id"] == final["id"] == 7 and len(chunk["chunk"]["files"]) == 2
+        assert final["result"]["stream"]["items"] == 2 and final["result"]["next_cursor"]
+
+        ws.send_text("not json")
+        assert ws.receive_json()["error"]["code"] == "invalid_request"
+        ws.send_json({"id": 8, "params": {}})
+        assert ws.receive_json() == {"id": 8, **_invalid("Missing tool name")}
+        ws.send_json({"id": [1], "subscribe": "scene"})
+        invalid_id = _invalid("Frame ids must be strings or integers")
+        assert ws.receive_json() == {"id": None, **invalid_id}
+        ws.send_json({"id": 9, "unsubscribe": {"a": 1}})
+        assert ws.receive_json() == {"id": 9, **_invalid("Unknown subscription")}
+        ws.send_json({"id": 10, "name": "echo", "params": {"text": "still open"}})
+        assert ws.receive_json() == {"id": 10, "ok": True, "result": "still open"}
+        ws.send_json({"id": 11, "name": "workspace.list_files", "params": [1], "stream": True})
+        assert ws.receive_json() == {"id": 11, **_invalid("Params must be a JSON object")}
+
+    app = _http_app(build_server())
+    with TestClient(app) as client, client.websocket_connect("/ws?session=other") as ws:
+        ws.send_json({"id": 1, "name": "runtime.probe", "params": {}})
+        assert ws.receive_json()["error"]["code"] == "contract_required"
+
+
+def test_unexpected_call_error_is_reported_without_closing_the_connection(runtime, monkeypatch):
+    async def broken_opener(name: str, arguments: dict):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(http_transport, "get_stream_opener", lambda server: broken_opener)
+    app = _http_app(build_server())
+    with TestClient(app) as client, client.websocket_connect("/ws?session=ws-3") as ws:
+        ws.send_json({"id": 1, "name": "workspace.list_files", "params": {}, "stream": True})
+        reply = ws.receive_json()
+        assert reply["id"] == 1 and reply["error"]["code"] == "internal_error"
+        assert reply["error"]["message"] == "boom"
+        ws.send_json({"id": 2, "name": "echo", "params": {"text": "alive"}})
+        assert ws.receive_json() == {"id": 2, "ok": True, "result": "alive"}
+
+
+def test_scene_subscription_pushes_changes(runtime):
+    with TestClient(_http_app(build_server())) as client, client.websocket_connect(
+        "/ws", headers={"X-MVP-Session": "ws-2"}
+    ) as ws:
+        ws.send_json({"id": "sub", "subscribe": "scene"})
+        assert ws.receive_json()["error"]["code"] == "contract_required"
+
+        ws.send_json({"id": "c", "name": "contract.create", "params": CONTRACT})
+        ws.receive_json()
+        ws.send_json({"id": "fp", "name": "scene.list_objects", "params": {}})
+        fingerprint = ws.receive_json()["result"]["fingerprint"]
+
+        ws.send_json({"id": "sub", "subscribe": "scene", "since": fingerprint})
+        ack = {"subscription": "sub", "topic": "scene", "fingerprint": fingerprint}
+        assert ws.receive_json()["result"] == ack
+
+        runtime._objects.append({"id": "obj-lamp", "name": "Lamp", "type": "LIGHT"})
+        event = ws.receive_json()
+        assert event["event"] == "scene.changed" and event["subscription"] == "sub"
+        assert [obj["name"] for obj in event["result"]["added"]] == ["Lamp"]
+        assert event["result"]["from"] == fingerprint and event["result"]["reset"] is False
+
+        ws.send_json({"id": "u", "unsubscribe": "sub"})
+        assert ws.receive_json()["result"] == {"unsubscribed": "sub"}
+        runtime._objects.pop()
+        ws.send_json({"id": "e", "name": "echo", "params": {"text": "after"}})
+        assert ws.receive_json() == {"id": "e", "ok": True, "result": "after"}
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import anyio
+import pytest
+
+from mvp.runtime import AsyncExternalHttpRuntimeAdapter, RuntimeUnavailableError
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _KeepAliveRuntimeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports: set[int] = set()
+
+    def log_message(self, *_):
+        pass
+
+    def _send_json(self, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.client_ports.add(self.client_address[1])
+        match self.path:
+            case "/runtime/probe":
+                probe = {"name": "mock-runtime", "version": "0.0.0"}
+                self._send_json({"ok": True, "result": probe})
+            case "/scene/objects":
+                self._send_json({"ok": True, "result": {"objects": [{"name": "Cube"}]}})
+            case _:
+                self.send_error(404)
+
+
+@pytest.fixture()
+def keepalive_runtime():
+    port = _free_port()
+    _KeepAliveRuntimeHandler.client_ports = set()
+    server = ThreadingHTTPServer(("127.0.0.1", port), _KeepAliveRuntimeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{port}"
+    server.shutdown()
+
+
+@pytest.mark.anyio
+async def test_async_adapter_shares_pooled_connections(keepalive_runtime):
+    adapter = AsyncExternalHttpRuntimeAdapter(keepalive_runtime, max_connections=4)
+    results: list[dict] = []
+
+    async def probe():
+        results.append(await adapter.probe())
+
+    for _ in range(5):
+        async with anyio.create_task_group() as tg:
+            for _ in range(20):
+                tg.start_soon(probe)
+    assert len(results) == 100
+    assert all(result["name"] == "mock-runtime" for result in results)
+    assert len(_KeepAliveRuntimeHandler.client_ports) <= 4
+
+    objects = await adapter.list_scene_objects()
+    assert objects == [{"name": "Cube"}]
+    await adapter.aclose()
+
+
+@pytest.mark.anyio
+async def test_async_adapter_unavailable_runtime():
+    adapter = AsyncExternalHttpRuntimeAdapter(f"http://127.0.0.1:{_free_port()}", timeout=1.0)
+    with pytest.raises(RuntimeUnavailableError):
+        await adapter.probe()
+    await adapter.aclose()